@@ -0,0 +1,175 @@
+"""
+XBee loopback benchmarks. Runs without hardware on Linux/macOS.
+
+Measures:
+  - encode:       XBee._encode_data frames/sec
+  - parse:        FrameParser + frame dispatch frames/sec on a clean mixed stream and a corrupted stream
+  - round_trip:   transmit_data(retrieveStatus=True) -> 0x89 latency percentiles through a pty and EchoResponder
+  - read_config:  read_config(AT_Command_List.txt) wall time through a pty and EchoResponder
+  - replay:       XBee.replay_capture frames/sec on a recorded capture file (with --capture)
+
+Usage:
+  python benchmarks/bench_xbee.py [--output results.json] [--quick] [--capture session.xbcap]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+from xbee import XBee
+from xbee.utils import EchoResponder, FrameParser
+
+DESTINATION = "0013A200424366C7"
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AT_Command_List.txt")
+
+
+def _frame(frame_data: bytes) -> bytes:
+    return bytes((0x7E, len(frame_data) >> 8, len(frame_data) & 0xFF)) + frame_data + bytes((0xFF - (sum(frame_data) & 0xFF),))
+
+
+def _mixed_stream(count: int, rng: random.Random) -> bytes:
+    """0x81/0x90 telemetry with some 0x89/0x88 responses mixed in."""
+    frames = []
+    for i in range(count):
+        kind = i % 10
+        payload = bytes(rng.randrange(256) for _ in range(rng.randrange(20, 100)))
+        if kind < 5:
+            frames.append(_frame(b"\x90" + bytes.fromhex(DESTINATION) + b"\xff\xfe\x01" + payload))
+        elif kind < 8:
+            frames.append(_frame(b"\x81\x00\x01\x28\x00" + payload))
+        elif kind == 8:
+            frames.append(_frame(bytes((0x89, i % 255 + 1, 0x00))))
+        else:
+            frames.append(_frame(bytes((0x88, i % 255 + 1)) + b"SH\x00\x00\x13\xa2\x00"))
+    return b"".join(frames)
+
+
+def _corrupt(stream: bytes, rng: random.Random, rate: float = 0.001) -> bytes:
+    """Flip random bytes and insert noise (including stray 0x7E)."""
+    data = bytearray(stream)
+    for _ in range(int(len(data) * rate)):
+        data[rng.randrange(len(data))] ^= 0xFF
+    for _ in range(int(len(data) * rate)):
+        data[rng.randrange(len(data)):0] = bytes((0x7E, rng.randrange(256)))
+    return bytes(data)
+
+
+def _percentiles(samples: list[float], lost: int = 0) -> dict:
+    """Latency percentiles in milliseconds (None without samples) and the number of lost requests."""
+    samples = sorted(samples)
+
+    def at(p):
+        return samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1e3 if samples else None
+
+    return {"count": len(samples), "lost": lost, "p50_ms": at(50), "p90_ms": at(90), "p99_ms": at(99),
+            "max_ms": samples[-1] * 1e3 if samples else None}
+
+
+def bench_encode(count: int) -> dict:
+    xbee = XBee(log_level=logging.WARNING)
+    payload = b"T" * 60
+    start = time.perf_counter()
+    for _ in range(count):
+        xbee._encode_data(payload, DESTINATION)
+    elapsed = time.perf_counter() - start
+    return {"frames": count, "seconds": elapsed, "frames_per_sec": count / elapsed}
+
+
+def bench_parse(count: int, corrupted: bool, chunk_size: int = 4096) -> dict:
+    rng = random.Random(1)
+    stream = _mixed_stream(count, rng)
+    if corrupted:
+        stream = _corrupt(stream, rng)
+
+    xbee = XBee(log_level=logging.WARNING)
+    parser = FrameParser()
+    parsed = 0
+    start = time.perf_counter()
+    for offset in range(0, len(stream), chunk_size):
+        for frame_data in parser.feed(stream[offset:offset + chunk_size]):
+            xbee._handle_frame(frame_data)
+            parsed += 1
+    elapsed = time.perf_counter() - start
+    return {"frames_sent": count, "frames_parsed": parsed, "bytes": len(stream), "seconds": elapsed,
+            "frames_per_sec": parsed / elapsed, "checksum_errors": parser.checksum_errors, "skipped_bytes": parser.skipped_bytes}
+
+
+def bench_round_trip(count: int) -> dict:
+    responder = EchoResponder()
+    xbee = XBee(responder.start(), log_level=logging.WARNING)
+    xbee.open()
+    try:
+        latencies = []
+        lost = 0
+        for _ in range(count):
+            start = time.perf_counter()
+            status = xbee.transmit_data("telemetry", DESTINATION, retrieveStatus=True)
+            if status is None:
+                lost += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+    finally:
+        xbee.close()
+        responder.stop()
+    return _percentiles(latencies, lost)
+
+
+def bench_read_config() -> dict:
+    responder = EchoResponder(at_values={"SH": b"\x00\x13\xa2\x00", "SL": b"\x42\x43\x66\xc7", "VR": b"\x20\x0f"})
+    xbee = XBee(responder.start(), log_level=logging.WARNING)
+    xbee.open()
+    try:
+        start = time.perf_counter()
+        xbee.read_config(CONFIG_FILE)
+        elapsed = time.perf_counter() - start
+    finally:
+        xbee.close()
+        responder.stop()
+    return {"commands": len(XBee._parse_config_file(CONFIG_FILE)), "seconds": elapsed}
+
+
+def bench_replay(filename: str) -> dict:
+    xbee = XBee(log_level=logging.WARNING)
+    start = time.perf_counter()
+    frames = xbee.replay_capture(filename)
+    elapsed = time.perf_counter() - start
+    return {"file": filename, "frames": frames, "seconds": elapsed, "frames_per_sec": frames / elapsed if elapsed else None,
+            "checksum_errors": xbee.parser.checksum_errors, "skipped_bytes": xbee.parser.skipped_bytes}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--output", help="Write results to this JSON file (default: stdout)")
+    arg_parser.add_argument("--quick", action="store_true", help="Fewer iterations")
+    arg_parser.add_argument("--capture", help="Also replay this capture file (XBee capture_file) through the receive path")
+    args = arg_parser.parse_args()
+
+    scale = 1 if args.quick else 10
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "encode": bench_encode(10000 * scale),
+        "parse_mixed": bench_parse(5000 * scale, corrupted=False),
+        "parse_corrupted": bench_parse(5000 * scale, corrupted=True),
+        "round_trip": bench_round_trip(200 * scale),
+        "read_config": bench_read_config(),
+    }
+    if args.capture:
+        results["replay"] = bench_replay(args.capture)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
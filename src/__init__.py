@@ -1,8 +1,8 @@
 from .xbee import frames
 from .xbee.frames import *
-from .xbee import XBee, XBeeEmulator
+from .xbee import XBee, XBeeEmulator, AsyncXBee, AsyncXBeeEmulator, XBeeManager
 
 
 __all__ = []
 __all__ += frames.__all__
-__all__ += ["XBee", "XBeeEmulator"]
\ No newline at end of file
+__all__ += ["XBee", "XBeeEmulator", "AsyncXBee", "AsyncXBeeEmulator", "XBeeManager"]
\ No newline at end of file
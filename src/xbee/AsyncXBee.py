@@ -0,0 +1,397 @@
+import asyncio
+import math
+import time
+import serial   # Pyserial, used to communicate over serial ports
+
+from xbee.XBee import XBee
+from xbee.frames import x81, x88, x89, x90
+from xbee.utils import PendingResponses, TransmitScheduler, ParameterCache, CaptureReader, ReliableSender, AwaitableQueue
+
+
+class AsyncXBee(XBee):
+    """
+    asyncio version of XBee.
+
+    No I/O thread is started. The serial port is read from an event loop reader callback, responses
+    complete asyncio Futures and received frames are placed on an asyncio.Queue, so any number of
+    coroutines can await transmits and AT commands without thread hops. Frames go through the same
+    TransmitScheduler as XBee (priority classes, transmit_rate) and are written from the event loop.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loop: asyncio.AbstractEventLoop = None
+        self._rx_queue = AwaitableQueue(self.x81x90_queue)   # Same size limit and drop policy as XBee
+        self._frame_ids: asyncio.Semaphore = None  # Frame IDs free for requests waiting on a response
+        self._fragments_lock: asyncio.Lock = None   # One fragmented message reserves its frame IDs at a time
+        self._reliable_window: asyncio.Semaphore = None    # transmit_reliable() calls in flight
+        self._drain_handle = None   # Scheduled write of the transmit queue
+
+    async def open(self) -> bool:
+        """Opens the serial port and registers it with the running event loop.
+
+        Returns:
+          True if success, False if failure (There is already an open port, close the port before opening another one).
+        Raises:
+          SerialException if there is an error opening the serial port
+        """
+        self.logger.write("Attempting to open serial XBee connection.")
+
+        if self.ser is not None:
+            self.logger.write(f"A serial connection is already open. ser: {self.ser}")
+            return False
+
+        self._loop = asyncio.get_running_loop()
+        self._rx_queue = AwaitableQueue(self.x81x90_queue)
+        self.pending = PendingResponses(future_factory=self._loop.create_future)
+        self._frame_ids = asyncio.Semaphore(0xFF)
+        self._fragments_lock = asyncio.Lock()
+        self._reliable_window = asyncio.Semaphore(self.reliable_window)
+
+        try:
+            self.ser = serial.Serial(self.port, self.baudrate, timeout=0) # Open the serial port
+            self.logger.write("Serial port opened.")
+
+            self.ser.reset_input_buffer()   # Clear junk
+            self.ser.reset_output_buffer()
+            self.parser.reset()
+            self._start_log_sink()
+            self._start_capture()
+            await asyncio.sleep(self.open_delay)
+
+            self._loop.add_reader(self.ser.fileno(), self._on_readable)
+        except serial.SerialException as e:
+            self.logger.write(f"Error opening serial port: {e}")
+            self.ser = None
+            raise
+
+        if self.detect_api_mode_on_open:
+            await self.detect_api_mode()
+
+        if self.config_file is not None:
+            await self.load_config(self.config_file)   # Optionally read AT config
+
+        if self.desired_config:
+            await self.apply_config(self.desired_config)
+
+        return True
+
+    async def close(self) -> bool:
+        """Close serial port.
+
+        Returns:
+          True if success, False if failure (port already closed).
+        """
+        if self.ser is None:
+            self.logger.write("Serial port is already closed.")
+            return False
+
+        self.logger.write("Attempting to close serial XBee connection.")
+        if self._drain_handle is not None:
+            self._drain_handle.cancel()
+            self._drain_handle = None
+        self._write_queued()    # Frames held back by the rate limit stay queued
+        try:
+            self._loop.remove_reader(self.ser.fileno())
+        finally:
+            self.ser.close()
+            self.ser = None
+            self._stop_capture()
+            self._stop_log_sink()
+            self._rx_queue.close()     # Wake frames() iterators
+        self.logger.write("Serial port closed.")
+        return True
+
+    def _on_readable(self):
+        """Event loop reader callback. Parses and dispatches every complete frame."""
+        try:
+            self._retrieve_data()
+        except serial.SerialException as e:
+            self.logger.write(f"Serial read failed: {e}", self.logger.ERROR)
+            self._loop.remove_reader(self.ser.fileno())
+
+    def _wake_io_thread(self):
+        """A frame was queued: write the transmit queue on the next event loop iteration (after write_linger)."""
+        if self._drain_handle is None and self._loop is not None:
+            if self.write_linger > 0:
+                self._drain_handle = self._loop.call_later(self.write_linger, self._drain)
+            else:
+                self._drain_handle = self._loop.call_soon(self._drain)
+
+    def _drain(self):
+        """Write the queued frames the rate limit lets through, and come back when the next one is due."""
+        self._drain_handle = None
+        if self.ser is None:
+            return
+        self._write_queued()
+        delay = self.transmit_queue.delay()
+        if delay is not None:
+            self._drain_handle = self._loop.call_later(delay, self._drain)
+
+    def _deliver_rx(self, frame):
+        self._rx_queue.put(frame)
+
+    async def transmit(self, data: str, address: str = "0000000000000000", retrieve_status: bool = True,
+                       priority: int = TransmitScheduler.NORMAL) -> x89 | None:
+        """Transmit data.
+
+        Args:
+          data: String data to transmit.
+          address: Address of destination XBee module. "0000000000000000" if no value is provided.
+          retrieve_status: Wait for the transmit status.
+          priority: Transmit queue class, TransmitScheduler.COMMAND, NORMAL or BULK.
+
+        Returns:
+          0x89 transmit status, None if no status was received (or not requested).
+        """
+        if self.ser is None:
+            raise serial.SerialException("Error: Serial port is not open")
+
+        if self.fragmenter is not None:
+            return await self._transmit_fragments(data, address, retrieve_status, priority)
+
+        if len(data) >= 100:
+            self.logger.write(f"Error: Data should not exceed 100 bytes. Current size: {len(data)} bytes")
+            raise Exception(f"Error: Data should not exceed 100 bytes. Current size: {len(data)} bytes")
+
+        if not retrieve_status:
+            self._queue_transmit(self._encode_data(data, address), priority)
+            return None
+
+        frame_id, future = await self._reserve(self.status_timeout)
+        start = time.monotonic()
+        self._queue_transmit(self._encode_data(data, address, frame_id), priority)
+        return self._timed_status(await self._wait_response(frame_id, future, self.status_timeout), start)
+
+    async def transmit_reliable(self, data, address: str = "0000000000000000", priority: int = TransmitScheduler.NORMAL,
+                                retries: int = 3, backoff: float = 0.02) -> x89 | None:
+        """Transmit data, retransmitting on a failed or missing transmit status (see ReliableSender).
+
+        Up to reliable_window calls are in flight at once, the others wait for a free slot.
+
+        Args:
+          data: String data to transmit.
+          address: Address of destination XBee module. "0000000000000000" if no value is provided.
+          priority: Transmit queue class of every attempt.
+          retries: Max retransmissions.
+          backoff: Delay before the first retransmission, doubled for each further retransmission.
+
+        Returns:
+          Final 0x89 status (status 0 on success), None if no status was received after every retry.
+        """
+        if self.ser is None:
+            raise serial.SerialException("Error: Serial port is not open")
+
+        async with self._reliable_window:
+            return await ReliableSender.retry_async(lambda: self.transmit(data, address, priority=priority), retries, backoff)
+
+    async def _transmit_fragments(self, data, address: str, retrieve_status: bool, priority: int) -> x89 | None:
+        """Transmit data as numbered fragments. See XBee._transmit_fragments."""
+        fragments = self._split_fragments(data)
+        if not retrieve_status:
+            for header, chunk in fragments:
+                self._queue_transmit(self._encode_data(chunk, address, self._next_frame_id(), prefix=header), priority)
+            return None
+
+        timeout = self.status_timeout + self.transmit_queue.pacing(self._fragments_size(fragments))
+        start = time.monotonic()
+        requests = []
+        async with self._fragments_lock:    # Two messages holding part of the frame IDs would wait for each other
+            try:
+                for header, chunk in fragments:
+                    frame_id, future = await self._reserve(timeout)
+                    requests.append((frame_id, future))
+                    self._queue_transmit(self._encode_data(chunk, address, frame_id, prefix=header), priority)
+            except BaseException:
+                for frame_id, future in requests:
+                    self._release(frame_id, future)
+                raise
+        deadline = time.monotonic() + timeout
+        statuses = [await self._wait_response(frame_id, future, max(0.0, deadline - time.monotonic()))
+                    for frame_id, future in requests]
+        return self._timed_status(self._worst_status(statuses), start)
+
+    async def at_command(self, id: str, retry: int = 3, value: bytes = b"") -> x88 | None:
+        """Request and retrieve configuration detail of XBee device.
+
+        Args:
+          id: Identifier of AT command.
+          retry: Number of times to resend the request if no response is received.
+          value: Parameter value to set, empty to read the parameter.
+
+        Returns:
+          0x88 AT command response, None if no response was received.
+        """
+        if self.ser is None:
+            raise serial.SerialException("Error: Serial port is not open")
+
+        for attempt in range(retry + 1):
+            if attempt:
+                self._at_retries.inc()
+            frame_id, future = await self._reserve(self.timeout)
+            start = time.monotonic()
+            self._queue_transmit(self._encode_at_command(id, frame_id, value), TransmitScheduler.COMMAND, 0x08)
+            response = await self._wait_response(frame_id, future, self.timeout)
+            if response is not None:
+                self._at_latency.observe(time.monotonic() - start)
+                return response
+            self.logger.write(f"No response when running AT Command {id}")
+        self._at_timeouts.inc()
+        return None
+
+    async def _reserve(self, timeout: float):
+        """Reserve a frame ID for a request, waiting while all 255 are in use (see XBee._reserve_frame_id)."""
+        await self._frame_ids.acquire()
+        try:
+            return self._reserve_frame_id(timeout)
+        except BaseException:
+            self._frame_ids.release()
+            raise
+
+    def _release(self, frame_id: int, future: asyncio.Future):
+        """Forget a reserved request and make its frame ID available to the next waiting request."""
+        self.pending.discard(frame_id, future)
+        self._frame_ids.release()
+
+    async def request_at_commands(self, ids, retry: int = 3, window: int = 16, values: dict = None) -> dict:
+        """Same as XBee.request_at_commands, awaitable: up to window commands are outstanding at once.
+
+        Returns:
+          Dict of AT command identifier to 0x88 response (None if there was no response), in the order of ids.
+        """
+        if self.ser is None:
+            raise serial.SerialException("Error: Serial port is not open")
+
+        slots = asyncio.Semaphore(window)
+
+        async def request(id):
+            async with slots:
+                return await self.at_command(id, retry, values.get(id, b"") if values else b"")
+
+        ids = list(dict.fromkeys(ids))
+        responses = await asyncio.gather(*(request(id) for id in ids))
+        return dict(zip(ids, responses))
+
+    async def detect_api_mode(self) -> int | None:
+        """Same as XBee.detect_api_mode, awaitable."""
+        for api_mode in (self.api_mode, 3 - self.api_mode):
+            self.set_api_mode(api_mode)
+            response = await self.at_command("AP", retry=1)
+            if response is not None and response.status == 0 and len(response.data) > 0:
+                detected = response.data[-1]
+                if detected in (1, 2):
+                    self.set_api_mode(detected)
+                else:
+                    self.logger.write(f"Unsupported API mode AP={detected}, using AP={api_mode}", self.logger.ERROR)
+                self.logger.write(f"Detected API mode: AP={self.api_mode}")
+                return self.api_mode
+        self.logger.write("Unable to detect API mode (no response to AP)", self.logger.ERROR)
+        return None
+
+    async def _wait_response(self, frame_id: int, future: asyncio.Future, timeout: float):
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._release(frame_id, future)
+
+    async def frames(self):
+        """Iterate over received 0x81/0x90 frames until the port is closed.
+
+        Yields:
+          x81 or x90 frames.
+        """
+        while self.ser is not None:
+            frame = await self._rx_queue.get()
+            if frame is None:
+                return
+            yield frame
+
+    async def retrieve_data(self) -> x81 | x90 | None:
+        """
+        Retrieves one frame of data (0x81/0x90 - Rx Packet)
+
+        Returns:
+          Received frame, None if no frame arrived within timeout.
+        """
+        try:
+            return await asyncio.wait_for(self._rx_queue.get(), self.timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def transmit_data(self, data: str, address: str = "0000000000000000", retrieveStatus: bool = False,
+                            priority: int = TransmitScheduler.NORMAL) -> x89 | None:
+        """Same as XBee.transmit_data, awaitable."""
+        return await self.transmit(data, address, retrieve_status=retrieveStatus, priority=priority)
+
+    async def request_at_command_data(self, id, retry = 3, value: bytes = b"") -> x88 | None:
+        """Same as XBee.request_at_command_data, awaitable."""
+        return await self.at_command(id, retry, value)
+
+    async def replay_capture(self, filename: str, realtime: bool = False, speed: float = 1.0) -> int:
+        """Same as XBee.replay_capture, awaitable: a realtime replay waits without blocking the event loop."""
+        frames = 0
+        with CaptureReader(filename) as reader:
+            for delay, data in reader.paced(speed if realtime else math.inf):
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                frames += len(self._process_received(data))
+            data = None     # Release the memory-mapped chunk before the reader closes
+        self.logger.write(f"Replayed {filename} ({frames} frames)")
+        return frames
+
+    async def read_config(self, filename) -> dict:
+        """
+        Reads AT Commands from a file and requests them concurrently (see request_at_commands).
+
+        Args:
+          filename: Filename of file with a list of AT commands to execute.
+        Returns:
+          Dict of AT command identifier to response value (bytes), None if there was no response.
+        """
+        at_command_ids = self._parse_config_file(filename)
+        start_time = self._loop.time()
+        responses = await self.request_at_commands(at_command_ids)
+        self.logger.write(f"Retrieved config in: {self._loop.time() - start_time}s")
+        return {at_command_id: None if response is None else response.data for at_command_id, response in responses.items()}
+
+    async def load_config(self, filename) -> dict:
+        """Same as XBee.load_config, awaitable."""
+        if self.parameter_cache is None:
+            self.config = await self.read_config(filename)
+            return self.config
+
+        start_time = self._loop.time()
+        at_command_ids = self._parse_config_file(filename)
+        probe = await self._read_parameters(ParameterCache.KEY_PARAMETERS + self.parameter_cache.fingerprint)
+        cached = self._cached_config(at_command_ids, probe)
+        if cached is not None:
+            self.config = cached
+            self.logger.write(f"Config served from parameter cache in: {self._loop.time() - start_time}s")
+            return self.config
+
+        self.config = await self.read_config(filename)
+        self.config.update(probe)
+        self._save_snapshot()
+        return self.config
+
+    async def apply_config(self, desired: dict, write: bool = True) -> dict:
+        """Same as XBee.apply_config, awaitable."""
+        desired, unknown = self._desired_parameters(desired)
+        if unknown:
+            self.config.update(await self._read_parameters(unknown))
+
+        changed = self._changed_parameters(desired)
+        if not changed:
+            return changed
+
+        self._check_set(await self.request_at_commands(list(changed), values=changed))
+        for id in self._commit_commands(write):
+            self._check_set({id: await self.at_command(id)}, "Command failed:")
+        self._config_applied(changed)
+        return changed
+
+    async def _read_parameters(self, ids) -> dict:
+        """Same as XBee._read_parameters, awaitable."""
+        return self._parameter_values(await self.request_at_commands(list(ids)))
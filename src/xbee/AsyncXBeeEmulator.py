@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+from xbee.XBeeEmulator import XBeeEmulator
+from xbee.frames import x81, x88, x89, x90
+from xbee.utils import TransmitScheduler, ReliableSender, AwaitableQueue
+
+
+class AsyncXBeeEmulator(XBeeEmulator):
+    """
+    asyncio version of XBeeEmulator with the same API as AsyncXBee.
+
+    MQTT messages arrive on paho's network thread and are handed to the event loop with call_soon_threadsafe.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loop: asyncio.AbstractEventLoop = None
+        self._rx_queue = AwaitableQueue(self.x81x90_queue)   # Same size limit and drop policy as XBee
+        self._reliable_window: asyncio.Semaphore = None    # transmit_reliable() calls in flight
+
+    async def open(self) -> bool:
+        if self.ser is not None:
+            self.logger.write(f"Already open. ser={self.ser}")
+            return False
+
+        self._loop = asyncio.get_running_loop()
+        self._rx_queue = AwaitableQueue(self.x81x90_queue)
+        self._reliable_window = asyncio.Semaphore(self.reliable_window)
+        return super().open()
+
+    async def close(self) -> bool:
+        if not super().close():
+            return False
+        self._rx_queue.close()     # Wake frames() iterators
+        return True
+
+    def _deliver_rx(self, frame):
+        # Called from the MQTT network thread
+        if self.ser is None:
+            return
+        self._loop.call_soon_threadsafe(self._rx_queue.put, frame)
+
+    async def transmit(self, data: str, address: str = "0000000000000000", retrieve_status: bool = True,
+                       priority: int = TransmitScheduler.NORMAL) -> x89 | None:
+        """Transmit data. See AsyncXBee.transmit (priority is accepted for compatibility, messages are published immediately)."""
+        # Publishing only queues the packet in the MQTT client, it does not block
+        if not retrieve_status:
+            return XBeeEmulator.transmit_data(self, data, address, retrieveStatus=False)
+
+        # Wait for the simulated airtime and the acknowledgement without blocking the event loop
+        if self.ser is None:
+            raise Exception("Error: connection is not open (ser is None).")
+        start = time.monotonic()
+        current_frame_id, status, done_at, ack = self._transmit(data, address, retrieveStatus=True)
+        await asyncio.sleep(max(0.0, done_at - time.monotonic()))
+        if ack is None or status != 0x00:
+            return self._emulated_status(x89(0x89, current_frame_id, status), start)
+        try:
+            acked_at = await asyncio.wait_for(asyncio.wrap_future(ack), self.ack_timeout)
+        except Exception:
+            acked_at = None     # Timed out or reclaimed
+        finally:
+            self.pending.discard(current_frame_id, ack)
+        return self._emulated_status(self._ack_result(current_frame_id, acked_at, start), start)
+
+    async def transmit_reliable(self, data, address: str = "0000000000000000", priority: int = TransmitScheduler.NORMAL,
+                                retries: int = 3, backoff: float = 0.02) -> x89 | None:
+        """Transmit data, retransmitting when the receiver does not acknowledge it. See AsyncXBee.transmit_reliable."""
+        if self.ser is None:
+            raise Exception("Error: connection is not open (ser is None).")
+
+        async with self._reliable_window:
+            return await ReliableSender.retry_async(lambda: self.transmit(data, address, priority=priority), retries, backoff)
+
+    async def at_command(self, id: str, retry: int = 3, value: bytes = b"") -> x88 | None:
+        """AT commands are not emulated."""
+        self.logger.write(f"AT Command {id} is not supported by the emulator", self.logger.WARNING)
+        return None
+
+    async def frames(self):
+        """Iterate over received 0x81/0x90 frames until the emulator is closed.
+
+        Yields:
+          x81 or x90 frames.
+        """
+        while self.ser is not None:
+            frame = await self._rx_queue.get()
+            if frame is None:
+                return
+            yield frame
+
+    async def retrieve_data(self) -> x81 | x90 | None:
+        """
+        Retrieves one frame of data (0x81/0x90 - Rx Packet)
+
+        Returns:
+          Received frame, None if no frame arrived within timeout.
+        """
+        try:
+            return await asyncio.wait_for(self._rx_queue.get(), self.timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def transmit_data(self, data: str, address: str = "0000000000000000", retrieveStatus: bool = False,
+                            priority: int = TransmitScheduler.NORMAL) -> x89 | None:
+        """Same as XBeeEmulator.transmit_data, awaitable."""
+        return await self.transmit(data, address, retrieve_status=retrieveStatus, priority=priority)
+
+    async def request_at_command_data(self, id, retry = 3, value: bytes = b"") -> x88 | None:
+        """Same as XBee.request_at_command_data, awaitable."""
+        return await self.at_command(id, retry, value)
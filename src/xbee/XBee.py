@@ -1,17 +1,43 @@
+import logging  # Log level constants
+import os
 import queue
 import re   # Used to parse AT command lines from the config file
+import selectors    # Used to sleep until the serial port or transmit queue needs attention
 import serial   # Pyserial, used to cimmunicate over serial ports
 import threading
 import time     # Used for timeouts, sleep, and measuring performance
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait as wait_futures
 
 # from Communication.interfaces.Serial import Serial  # Custom interface/base class for serial communication
 from serial_io import ISerial
-from xbee.frames import x81, x88, x89, x90 # Frame parser for classes for each Xbee frame type
+from xbee.frames import x81, x88, x89, x8A, x90 # Frame parser for classes for each Xbee frame type
+from xbee.utils.FrameParser import FrameParser  # Incremental API frame parser
+from xbee.utils.FrameEncoder import FrameEncoder    # API frame encoder with cached header templates
+from xbee.utils.FrameDispatcher import FrameDispatcher  # Subscribers of received frames
+from xbee.utils.PendingResponses import PendingResponses    # Frame ID -> response table
+from xbee.utils.Fragmenter import Fragmenter    # Fragmentation and reassembly of large payloads
+from xbee.utils.LogSink import LogSink, HexDump # Background log writer, lazily formatted hex dump
+from xbee.utils.ReliableSender import ReliableSender    # Windowed retransmission
+from xbee.utils.TransmitScheduler import TransmitScheduler  # Priority transmit queue
+from xbee.utils.BoundedQueue import BoundedQueue, LatestMailbox # Bounded receive queues
+from xbee.utils.ParameterCache import ParameterCache    # Radio parameter snapshots
+from xbee.utils.Capture import CaptureWriter, CaptureReader # Raw serial byte capture
+from xbee.utils.Metrics import Metrics  # Counters, gauges and histograms
 from logger import Logger    # Custom logging class
 
+# Metric label of each frame type / status byte, formatted once
+_BYTE_LABELS = tuple(f"0x{value:02X}" for value in range(256))
+
 class XBee(ISerial):
     # Configure serial port
-    def __init__(self, port: str = None, baudrate: int = 115200, status: bool = False, pan_id:int = 3332, mac_address: str = "", logger: Logger = None, config_file: str = None):
+    def __init__(self, port: str = None, baudrate: int = 115200, status: bool = False, pan_id:int = 3332, mac_address: str = "", logger: Logger = None, config_file: str = None,
+                 max_write_bytes: int = 4096, write_linger: float = 0.0, fragmentation: bool = False,
+                 log_level: int = logging.DEBUG, log_async: bool = False, api_mode: int | None = 1, reliable_window: int = 8,
+                 transmit_rate: float = None, transmit_burst: int = 512,
+                 rx_queue_size: int = 0, rx_queue_policy: str = BoundedQueue.DROP_OLDEST, rx_latest_per_source: bool = False,
+                 open_delay: float = 0.5, parameter_cache: str = None, desired_config: dict = None,
+                 capture_file: str = None):
         """Initialize serial connection
 
         Args:
@@ -19,6 +45,28 @@ class XBee(ISerial):
           baudrate: Baudrate of serial device (/port)
           status: Automatically receive status packets after a transmission.
           logger: Logger instance
+          max_write_bytes: Max number of bytes of queued frames combined into a single serial write.
+          write_linger: Max seconds to wait for more frames before flushing a write (0 flushes immediately).
+          fragmentation: Split payloads larger than one packet into fragments and reassemble received fragments.
+            Must be enabled on both ends.
+          log_level: Frame level messages below this level (logging.DEBUG, logging.INFO, ...) are not formatted or logged.
+          log_async: Write frame level messages from a background thread (bounded queue, dropped when full).
+          api_mode: API mode of the XBee module, 1 (API) or 2 (API with escaped characters).
+            None detects the mode with the AP command when the port is opened.
+          reliable_window: Max messages in flight with transmit_reliable().
+          transmit_rate: Max bytes per second written to the module (token bucket), None for no limit.
+            Set it at or below the radio's RF data rate so the module's serial buffer cannot overflow.
+          transmit_burst: Bytes that can be written at once after the link was idle.
+          rx_queue_size: Max number of received 0x81/0x90 frames waiting for retrieve_data(), 0 for no limit.
+          rx_queue_policy: What happens to a frame received while the queue is full: BoundedQueue.DROP_OLDEST,
+            DROP_NEWEST or BLOCK (the I/O thread waits for retrieve_data(), which also delays transmits and statuses).
+          rx_latest_per_source: Only keep the newest frame of each source address (rx_queue_size limits the number of sources).
+          open_delay: Seconds to wait after opening the port before sending anything.
+          parameter_cache: Directory of parameter snapshots. With config_file set, open() reads the parameters from
+            the snapshot of the module (if its fingerprint parameters match) instead of querying each of them.
+          desired_config: AT command identifier -> value (bytes, int or str) written on open() if different
+            (see apply_config).
+          capture_file: Append the raw bytes read and written while the port is open to this file (see CaptureWriter).
         """
         self.port = port    # Serial port to use
         self.baudrate = baudrate     # Communication speed  
@@ -26,23 +74,82 @@ class XBee(ISerial):
         self.status = status     # If True, it will try to read back status frames (0x89)
         
         self.logger = logger or Logger()
+        self.log_level = log_level
+        self.log_async = log_async
+        self.log_sink: LogSink = LogSink() if log_async else None   # Stopped by close(), started again by open()
+        self._log_writers = {}
 
         if logger is None:  
             self.logger.write("LOGGER CREATED By XBee.py")
 
         self.timeout = 0.1 # Allow programmer to configure timeout? # Max time to wait for responses
         self.status_timeout = 0.2
+        self.poll_interval = 0.01 # Port read timeout used when the port cannot be selected on (Windows)
         self.frame_id = 0x01    # Frame ID (used to track commands)
+        self._frame_id_lock = threading.Lock()
+        self.pending = PendingResponses()   # Outstanding 0x88/0x89 responses indexed by frame ID
 
         self.config_file = config_file # Add AT_Config.py file  # Path to config file with AT commands 
+        self.config: dict = {}  # Last known parameter values, AT command identifier -> bytes
+        self.open_delay = open_delay
+        self.parameter_cache: ParameterCache = ParameterCache(parameter_cache) if parameter_cache is not None else None
+        self.desired_config = desired_config
 
-        # Retrieve Queues
-        self.x81x90_queue: queue.Queue = queue.Queue()
-        self.x88_queue: queue.Queue = queue.Queue() # If working properly, this queue should never have more than 1 element
-        self.x89_queue: queue.Queue = queue.Queue()
+        # Raw byte capture, see replay_capture()
+        self.capture_file = capture_file
+        self.capture: CaptureWriter = None
 
-        # Transmit Queue
-        self.transmit_queue: queue.Queue = queue.Queue()
+        # Retrieve Queues
+        if rx_latest_per_source:
+            self.x81x90_queue: queue.Queue = LatestMailbox(self._frame_source, rx_queue_size)
+        else:
+            self.x81x90_queue: queue.Queue = BoundedQueue(rx_queue_size, rx_queue_policy)
+        # Responses nobody was waiting for (e.g. arriving after a timeout), only the latest ones are kept
+        self.x88_queue: queue.Queue = BoundedQueue(64) # If working properly, this queue should never have more than 1 element
+        self.x89_queue: queue.Queue = BoundedQueue(64)
+
+        # Transmit Queue (priority classes, see TransmitScheduler)
+        self.transmit_queue: TransmitScheduler = TransmitScheduler(rate=transmit_rate, burst=transmit_burst)
+        self.max_write_bytes = max_write_bytes
+        self.write_linger = write_linger
+        self._write_carry = None    # Frame taken from the queue that did not fit in the last write
+        self.flush_frame_counts: Counter = Counter()   # Number of frames carried per write -> number of writes
+
+        # Receive parser (keeps partial frames between reads) and transmit encoder (caches frame headers per destination)
+        self.api_mode = api_mode or 1
+        self.detect_api_mode_on_open = api_mode is None
+        self.parser = FrameParser(escaped=self.api_mode == 2)
+        self.encoder = FrameEncoder(escaped=self.api_mode == 2)
+
+        # Frame type -> parser (frame data -> frame object). Add frame types with register_frame_parser()
+        self.frame_parsers = {
+            0x81: self._0x81,
+            0x88: self._0x88,
+            0x89: self._0x89,
+            0x8A: self._0x8A,
+            0x90: self._0x90,
+        }
+        # Subscriber callbacks for received frames
+        self.dispatcher = FrameDispatcher(on_error=self._on_subscriber_error)
+
+        # Splits/reassembles payloads larger than one packet, None if fragmentation is disabled
+        self.fragmenter: Fragmenter = Fragmenter() if fragmentation else None
+
+        # Windowed delivery with retransmission, started by the first transmit_reliable()
+        self.reliable_window = reliable_window
+        self.reliable_sender: ReliableSender = None
+
+        # I/O thread (or the XBeeManager serving this radio from its own thread)
+        self.manager = None
+        self.manager_name: str = None
+        self._io_thread: threading.Thread = None
+        self._io_running = False
+        self._wakeup_r = None   # Pipe used to wake the I/O thread when a frame is queued
+        self._wakeup_w = None
+
+        # Counters, gauges and latency histograms (see metrics.snapshot() and metrics.prometheus())
+        self.metrics = Metrics()
+        self._register_metrics()
 
         # self._transmitting = False # Flag: are we currently sending?
         # self._receiving = False    # Flag: are we currently receiving?d1b2fd40841964d904a7927082
@@ -58,24 +165,6 @@ class XBee(ISerial):
         Raises:
           SerialException if there is an error opening the serial port
         """
-
-        # Add try except blocks?
-        def poll_and_write_serial():
-            while self.ser is not None:
-                # Check if there is a message to transmit
-                if not self.transmit_queue.empty():
-                    data = self.transmit_queue.get()
-                    self.ser.write(data)
-                # Check serial port for incomming data
-                else:
-                    self._retrieve_data()
-            else:
-                # Normal exit of loop
-                return 0
-            
-
-
-
         self.logger.write("Attempting to open serial XBee connection.")
 
         if self.ser is not None:
@@ -89,13 +178,21 @@ class XBee(ISerial):
 
             self.ser.reset_input_buffer()   # Clear junk
             self.ser.reset_output_buffer()
-            time.sleep(0.5)
+            self.parser.reset()
+            self._start_log_sink()
+            self._start_capture()
+            time.sleep(self.open_delay)
 
-            t1 = threading.Thread(target=poll_and_write_serial)
-            t1.start()
+            self._start_io_thread()
+
+            if self.detect_api_mode_on_open:
+                self.detect_api_mode()
         
             if self.config_file is not None:
-                self.read_config(self.config_file)   # Optionally apply AT config
+                self.load_config(self.config_file)   # Optionally apply AT config
+
+            if self.desired_config:
+                self.apply_config(self.desired_config)
         
         except serial.SerialException as e:
             self.logger.write((f"Error opening serial port: {e}"))
@@ -115,7 +212,13 @@ class XBee(ISerial):
             self.logger.write("Attempting to close serial XBee connection.")
 
             try:
+                if self.reliable_sender is not None:
+                    self.reliable_sender.close()
+                    self.reliable_sender = None
+                self._stop_io_thread()
                 self.ser.close()    # Close the serial connection
+                self._stop_capture()
+                self._stop_log_sink()
                 
                 self.logger.write("Serial port closed.")
 
@@ -127,30 +230,268 @@ class XBee(ISerial):
         self.logger.write("Serial port is already closed.")
         return False
 
-    def transmit_data(self, data: str, address: str = "0000000000000000", retrieveStatus: bool = False) -> x89 | bool:
+    def _start_log_sink(self):
+        if self.log_async and self.log_sink is None:
+            self.log_sink = LogSink()
+
+    def _stop_log_sink(self):
+        """Write the queued log records and stop the sink thread (later records are written synchronously)."""
+        if self.log_sink is not None:
+            self.log_sink.close()
+            self.log_sink = None
+
+    def _start_capture(self):
+        if self.capture_file is not None and self.capture is None:
+            self.capture = CaptureWriter(self.capture_file)
+
+    def _stop_capture(self):
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
+
+    def _start_io_thread(self):
+        """Start the thread that writes queued frames and reads incoming data."""
+        if self.manager is not None:
+            self.manager._attach(self)
+            return
+        self._io_running = True
+        if os.name == "posix":
+            self._wakeup_r, self._wakeup_w = os.pipe()
+            os.set_blocking(self._wakeup_r, False)
+            os.set_blocking(self._wakeup_w, False)
+
+        self._io_thread = threading.Thread(target=self._poll_and_write_serial, daemon=True)
+        self._io_thread.start()
+
+    def _stop_io_thread(self):
+        """Stop the I/O thread and wait for it to exit."""
+        if self.manager is not None:
+            self.manager._detach(self)
+            return
+        self._io_running = False
+        if self._io_thread is None:
+            return
+        self._wake_io_thread()
+        if self._io_thread is not threading.current_thread():
+            self._io_thread.join()
+        self._io_thread = None
+
+        if self._wakeup_r is not None:
+            os.close(self._wakeup_r)
+            os.close(self._wakeup_w)
+            self._wakeup_r = self._wakeup_w = None
+
+    def _wake_io_thread(self):
+        """Interrupt the I/O thread's select() (e.g. a frame was queued)."""
+        if self.manager is not None:
+            self.manager.wake()
+            return
+        if self._wakeup_w is None:
+            return
+        try:
+            os.write(self._wakeup_w, b"\x00")
+        except (BlockingIOError, OSError):
+            # Pipe already full (a wakeup is pending) or closed
+            pass
+
+    def _log(self, level: int, message: str, *args):
+        """
+        Log a frame level message. Nothing is formatted if level is below log_level,
+        and with log_async the message is formatted and written on the log sink thread.
+
+        Args:
+          level: logging.DEBUG, logging.INFO, logging.WARNING or logging.ERROR
+          message: %-style format string
+          args: Format arguments (formatted only when the message is written)
+        """
+        if level < self.log_level:
+            return
+        write = self._log_writers.get(level)
+        if write is None:
+            write = self._log_writers[level] = self._logger_writer(level)
+        if self.log_sink is not None:
+            self.log_sink.put(write, message, args)
+        else:
+            write(message % args if args else message)
+
+    def _logger_writer(self, level: int):
+        """Return a callable writing one formatted message to self.logger at level."""
+        logger_level = getattr(self.logger, logging.getLevelName(level), None)
+        if level == logging.INFO or logger_level is None:
+            return self.logger.write
+        return lambda text: self.logger.write(text, logger_level)
+
+    def _register_metrics(self):
+        metrics = self.metrics
+        self._rx_frames = metrics.counter("rx_frames", "Received frames by frame type.", label="frame_type")
+        self._tx_frames = metrics.counter("tx_frames", "Frames queued for transmission by frame type.", label="frame_type")
+        self._rx_bytes = metrics.counter("rx_bytes", "Bytes read from the serial port.")
+        self._tx_bytes = metrics.counter("tx_bytes", "Bytes written to the serial port.")
+        metrics.counter("checksum_errors", "Frames ignored because of a checksum mismatch.",
+                        function=lambda: self.parser.checksum_errors)
+        metrics.counter("skipped_bytes", "Bytes passed while searching for a start delimiter.",
+                        function=lambda: self.parser.skipped_bytes)
+        self._unhandled_frames = metrics.counter("unhandled_frames", "Received frames of a type without a parser.", label="frame_type")
+        metrics.counter("dropped_frames", "Received frames dropped by a full receive queue.", label="queue",
+                        function=self.dropped_frames)
+        self._tx_status = metrics.counter("tx_status", "Transmit status (0x89) frames by delivery status.", label="status")
+        self._at_retries = metrics.counter("at_retries", "AT commands sent again after no response.")
+        self._at_timeouts = metrics.counter("at_timeouts", "AT commands without a response after every retry.")
+        metrics.counter("expired_responses", "Pending requests reclaimed without a response.",
+                        function=lambda: self.pending.expired)
+        metrics.gauge("rx_queue_depth", "Received 0x81/0x90 frames waiting for retrieve_data().",
+                      function=lambda: self.x81x90_queue.qsize())
+        metrics.gauge("transmit_queue_depth", "Frames waiting to be written by priority class.", label="priority",
+                      function=lambda: dict(enumerate(self.transmit_queue.depths())))
+        metrics.gauge("pending_responses", "Requests waiting for a 0x88/0x89 response.",
+                      function=lambda: len(self.pending))
+        self._transmit_latency = metrics.histogram("transmit_status_seconds", "Time from transmit to transmit status.")
+        self._at_latency = metrics.histogram("at_command_seconds", "Time from sending an AT command to its response.")
+
+    def _queue_transmit(self, frame, priority: int = TransmitScheduler.NORMAL, frame_type: int = 0x00, frames: int = 1):
+        """Queue an encoded frame (or frames of one type back to back) for the I/O thread and wake it up."""
+        self.transmit_queue.put(frame, priority=priority)
+        self._tx_frames.inc(frames, _BYTE_LABELS[frame_type])
+        self._wake_io_thread()
+
+    def _poll_and_write_serial(self):
+        """
+        I/O thread. Sleeps until the serial port is readable or a frame is queued, so an idle link costs no CPU.
+
+        Ports without a selectable file descriptor (e.g. Windows COM ports) fall back to a blocking read
+        with a short port timeout.
+        """
+        fileno = None
+        if self._wakeup_r is not None:
+            try:
+                fileno = self.ser.fileno()
+            except (AttributeError, OSError, ValueError):
+                fileno = None
+
+        try:
+            if fileno is None:
+                self.ser.timeout = self.poll_interval
+                while self._io_running:
+                    self._write_queued()
+                    self._retrieve_data()
+                return 0
+
+            with selectors.DefaultSelector() as selector:
+                selector.register(fileno, selectors.EVENT_READ, "serial")
+                selector.register(self._wakeup_r, selectors.EVENT_READ, "wakeup")
+
+                while self._io_running:
+                    # Check if there is a message to transmit
+                    self._write_queued()
+
+                    # Block until there is incoming data, a new frame to transmit or the rate limit releases a queued frame
+                    for key, _ in selector.select(self.transmit_queue.delay()):
+                        if key.data == "wakeup":
+                            try:
+                                while os.read(self._wakeup_r, 512):
+                                    pass
+                            except BlockingIOError:
+                                pass
+                        elif self._io_running:
+                            # Check serial port for incomming data
+                            self._retrieve_data()
+        except (serial.SerialException, OSError) as e:
+            if self._io_running:
+                self.logger.write(f"Serial I/O thread stopped: {e}", self.logger.ERROR)
+        # Normal exit of loop
+        return 0
+
+    def _write_queued(self):
+        """Write every frame currently in the transmit queue, combining frames into as few writes as possible."""
+        while True:
+            buffer, frames = self._collect_queued()
+            if not frames:
+                return
+            self.ser.write(buffer)
+            if self.capture is not None:
+                self.capture.write(CaptureWriter.TX, buffer)
+            self.flush_frame_counts[frames] += 1
+            self._tx_bytes.inc(len(buffer))
+
+    def _collect_queued(self):
+        """
+        Drain queued frames into one contiguous buffer of at most max_write_bytes
+        (a single frame larger than the cap is still sent on its own).
+
+        Returns:
+          (buffer, number of frames in buffer)
+        """
+        buffer = bytearray()
+        frames = 0
+        deadline = None
+
+        while True:
+            # 1) Next frame: left over from the last write, already queued, or arriving within the linger time
+            data = self._write_carry
+            self._write_carry = None
+            if data is None:
+                try:
+                    if deadline is None:
+                        data = self.transmit_queue.get_nowait()
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        data = self.transmit_queue.get(True, remaining)
+                except queue.Empty:
+                    if frames == 0 or self.write_linger <= 0 or deadline is not None:
+                        break
+                    deadline = time.monotonic() + self.write_linger
+                    continue
+
+            # 2) Keep the frame for the next write if it does not fit
+            if frames and len(buffer) + len(data) > self.max_write_bytes:
+                self._write_carry = data
+                break
+
+            buffer += data
+            frames += 1
+            if len(buffer) >= self.max_write_bytes:
+                break
+
+        return buffer, frames
+
+    def transmit_data(self, data: str, address: str = "0000000000000000", retrieveStatus: bool = False,
+                      priority: int = TransmitScheduler.NORMAL) -> x89 | bool:
         """Transmit data.
         Args:
           data: String data to transmit.
           address: Address of destination XBee module. "0000000000000000" if no value is provided.
+          priority: Transmit queue class, TransmitScheduler.COMMAND, NORMAL or BULK.
 
         Returns:
           True if success, False if failure.
+          With fragmentation enabled, the first failed fragment status (the last one if all succeeded) is returned,
+          None if a fragment got no status.
         """
 
         # Check if a serial port is open
         if self.ser is None:
             raise serial.SerialException("Error: Serial port is not open")
+
+        if self.fragmenter is not None:
+            return self._transmit_fragments(data, address, retrieveStatus, priority)
         
         if len(data) >= 100:
             self.logger.write(f"Error: Data should not exceed 100 bytes. Current size: {len(data)} bytes")
             raise Exception(f"Error: Data should not exceed 100 bytes. Current size: {len(data)} bytes")
 
         # self._transmitting = True
-        current_frame_id = self.frame_id
-        self.logger.write(f"Transmitting data: {data} to {address}")
+        # Register for the status before queueing so a fast 0x89 cannot be missed
+        if retrieveStatus:
+            current_frame_id, future = self._reserve_frame_id(self.status_timeout)
+        else:
+            current_frame_id = self._next_frame_id()
+        self._log(logging.DEBUG, "Transmitting data: %s to %s", data, address)
+        start = time.monotonic()
 
-        encoded_data = self._encode_data(data, address)
-        self.transmit_queue.put(encoded_data) # Append encoded packet to transmit queue
+        encoded_data = self._encode_data(data, address, current_frame_id)
+        self._queue_transmit(encoded_data, priority) # Append encoded packet to transmit queue
         
         # self.ser.write(self._encode_data(data, address))
         # self._transmitting = False
@@ -158,133 +499,338 @@ class XBee(ISerial):
         # If retrieve status is true
         if(retrieveStatus): # If caller wants TX status...
             # self._receiving = True
-            return self._retrieve_transmit_status(current_frame_id) # Wait for a 0x89 frame
+            return self._timed_status(self._retrieve_transmit_status(current_frame_id, future), start) # Wait for a 0x89 frame
         
         return None
 
 
-    def _retrieve_data(self):
+    def transmit_reliable(self, data, address: str = "0000000000000000", priority: int = TransmitScheduler.NORMAL) -> Future:
+        """Transmit data without waiting, retransmitting on a failed or missing transmit status.
+
+        Up to reliable_window messages are in flight at once (see ReliableSender).
+
+        Args:
+          data: String data to transmit (less than 100 bytes).
+          address: Address of destination XBee module. "0000000000000000" if no value is provided.
+          priority: Transmit queue class, TransmitScheduler.COMMAND, NORMAL or BULK.
+
+        Returns:
+          Future completed with the final 0x89 frame (status 0 on success), or None if no status was received.
+        """
+        if self.ser is None:
+            raise serial.SerialException("Error: Serial port is not open")
+
+        if self.reliable_sender is None:
+            self.reliable_sender = ReliableSender(self, window=self.reliable_window)
+        self._log(logging.DEBUG, "Transmitting data (reliable): %s to %s", data, address)
+        return self.reliable_sender.send(data, address, priority)
+
+    def _send_attempt(self, data, address: str, priority: int, timeout: float):
+        """Send one transmit request for ReliableSender without waiting for its status.
+
+        Args:
+          timeout: Seconds before an unanswered status entry is reclaimed.
+
+        Returns:
+          (frame_id, future completed with the 0x89 frame)
+        """
+        frame_id, future = self._reserve_frame_id(timeout)
+        try:
+            frame = self._encode_data(data, address, frame_id)
+        except Exception:
+            self.pending.discard(frame_id, future)
+            raise
+        self._queue_transmit(frame, priority)
+        return frame_id, future
+
+    def transmit_many(self, data_list, address: str = "0000000000000000", priority: int = TransmitScheduler.NORMAL):
+        """Transmit several payloads to the same destination with a single serial write.
+
+        Args:
+          data_list: List of String data to transmit (each less than 100 bytes).
+          address: Address of destination XBee module. "0000000000000000" if no value is provided.
+          priority: Transmit queue class, TransmitScheduler.COMMAND, NORMAL or BULK.
+        """
+        if self.ser is None:
+            raise serial.SerialException("Error: Serial port is not open")
+
+        for data in data_list:
+            if len(data) >= 100:
+                self.logger.write(f"Error: Data should not exceed 100 bytes. Current size: {len(data)} bytes")
+                raise Exception(f"Error: Data should not exceed 100 bytes. Current size: {len(data)} bytes")
+
+        self._log(logging.DEBUG, "Transmitting %d messages to %s", len(data_list), address)
+        self._queue_transmit(self._encode_many(data_list, address), priority, frames=len(data_list))
+
+    def _transmit_fragments(self, data, address: str, retrieveStatus: bool, priority: int) -> x89 | None:
+        """Transmit data as numbered fragments (see Fragmenter). Every fragment requests a transmit status."""
+        fragments = self._split_fragments(data)
+        self._log(logging.DEBUG, "Transmitting %d bytes as %d fragments to %s", len(data), len(fragments), address)
+        if not retrieveStatus:
+            for header, chunk in fragments:
+                self._queue_transmit(self._encode_data(chunk, address, self._next_frame_id(), prefix=header), priority)
+            return None
+
+        # The statuses arrive once the rate limit let every fragment through
+        timeout = self.status_timeout + self.transmit_queue.pacing(self._fragments_size(fragments))
+        start = time.monotonic()
+        requests = []
+        try:
+            for header, chunk in fragments:
+                frame_id, future = self._reserve_frame_id(timeout)
+                requests.append((frame_id, future))
+                frame = self._encode_data(chunk, address, frame_id, prefix=header)
+                self._queue_transmit(frame, priority)
+        except Exception:
+            for frame_id, future in requests:
+                self.pending.discard(frame_id, future)
+            raise
+        deadline = time.monotonic() + timeout
+        statuses = [self.pending.wait(frame_id, future, max(0.0, deadline - time.monotonic())) for frame_id, future in requests]
+        return self._timed_status(self._worst_status(statuses), start)
+
+    def _timed_status(self, status: x89 | None, start: float) -> x89 | None:
+        """Record the latency of a transmit status that arrived (started at time.monotonic() start)."""
+        if status is not None:
+            self._transmit_latency.observe(time.monotonic() - start)
+        return status
+
+    def _split_fragments(self, data) -> list:
+        """Split data into (header, chunk) fragments (see Fragmenter.fragments).
+
+        Raises:
+          Exception if data does not fit in 255 fragments.
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        try:
+            return list(self.fragmenter.fragments(data))
+        except ValueError as e:
+            self.logger.write(str(e), self.logger.ERROR)
+            raise Exception(e)
+
+    def _fragments_size(self, fragments) -> int:
+        """Encoded size of fragments, used to allow for the rate limit when waiting for their statuses."""
+        overhead = len(self._encode_data(b"", "0000000000000000", 0x00))
+        return sum(overhead + len(header) + len(chunk) for header, chunk in fragments)
+
+    @staticmethod
+    def _worst_status(statuses) -> x89 | None:
+        """Status of a fragmented message: None if a fragment has no status, else the first failed one (or the last)."""
+        if not statuses or None in statuses:
+            return None
+        for status in statuses:
+            if status.status != 0x00:
+                return status
+        return statuses[-1]
+
+    def _reassemble(self, frame):
+        """Feed a received 0x81/0x90 frame to the fragmenter.
+
+        Returns:
+          The frame (or a new frame carrying the whole message), None while the message is incomplete.
         """
-        Read incoming data in API mode:
+        if frame.frame_type == 0x81:
+            source = frame.source_address
+        else:
+            source = frame.address_64
+        payload = frame.payload
+        if isinstance(payload, str) or not self.fragmenter.is_fragment(payload):
+            return frame
+
+        message = self.fragmenter.add(bytes(source), payload)
+        if message is None:
+            return None
+        if frame.frame_type == 0x81:
+            return x81(frame.frame_type, frame.source_address, frame.rssi, frame.options, message)
+        return x90(frame.frame_type, frame.address_64, frame.address_16, frame.receive_options, message)
+
+    def _retrieve_data(self) -> list:
+        """
+        Read all bytes waiting on the serial port and parse every complete frame in API mode:
         - Start delimiter (0x7E)
         - 2-byte Length
         - Frame Data (length bytes)
         - 1-byte Checksum
 
+        Partial frames are kept by the parser until the rest of the frame arrives.
+
         Returns:
-        - 0x81: (frame_type, source_address, rssi, options, data)
-        - 0x88: (frame_type, frame_id, at_command, command_status, command_data)
-        - 0x89: (frame_type, frame_id, status)
+          List of parsed frames (empty if no complete frame was received):
+          - 0x81: (frame_type, source_address, rssi, options, data)
+          - 0x88: (frame_type, frame_id, at_command, command_status, command_data)
+          - 0x89: (frame_type, frame_id, status)
+          - 0x90: (frame_type, address_64, address_16, receive_options, received_data)
         """
 
         # Check if a serial port is open
         if self.ser is None:
             raise serial.SerialException("Error: Serial port is not open")
 
-        # 1) Read one byte
-        start_delim = self.ser.read(1)
-        if not start_delim:
-            # No data at all
-            # print("NO START DELIM")
-            return None
-    
-        self.logger.write("Receiving data:")
+        # 1) Read everything the port is holding in a single call
+        #    (with a port timeout this blocks for up to the timeout waiting for the first byte)
+        chunk = self.ser.read(self.ser.in_waiting or 1)
+        if not chunk:
+            return []
+        self._rx_bytes.inc(len(chunk))
+        if self.capture is not None:
+            self.capture.write(CaptureWriter.RX, chunk)
+        return self._process_received(chunk)
+
+    def _process_received(self, chunk) -> list:
+        """Parse and dispatch received bytes. Returns the parsed frames."""
+        # 2) Extract complete frames (checksum verified, resynced on 0x7E)
+        skipped = self.parser.skipped_bytes
+        checksum_errors = self.parser.checksum_errors
+        frames_data = self.parser.feed(chunk)
+
+        if self.parser.skipped_bytes != skipped:
+            self._log(logging.WARNING, "Pass %d byte(s) while searching for start delimiter", self.parser.skipped_bytes - skipped)
+        if self.parser.checksum_errors != checksum_errors:
+            self._log(logging.WARNING, "Checksum mismatch - ignoring %d frame(s).", self.parser.checksum_errors - checksum_errors)
+
+        # 3) Parse each frame
+        frames = []
+        for frame_data in frames_data:
+            frame = self._handle_frame(frame_data)
+            if frame is not None:
+                frames.append(frame)
+        return frames
+
+    def replay_capture(self, filename: str, realtime: bool = False, speed: float = 1.0) -> int:
+        """
+        Feed the bytes received in a capture file (see capture_file) to the frame parser, as if they were
+        read from the serial port. The port does not need to be open (transmitted bytes are not replayed).
 
-        # 2) Check if it's 0x7E
-        if start_delim[0] != 0x7E:
-            # Not the start delimiter -> leftover byte from a second frame?
-            print(f"Pass {start_delim[0]:02x}")
-            self.logger.write(f"Pass {start_delim[0]:02x}", self.logger.WARNING)
-            return None
+        Args:
+          filename: Capture file.
+          realtime: Replay at the recorded pace (divided by speed), otherwise as fast as possible.
+          speed: Replay speed factor when realtime is set.
+
+        Returns:
+          Number of frames parsed.
+        """
+        frames = 0
+
+        def feed(chunk):
+            nonlocal frames
+            frames += len(self._process_received(chunk))
+
+        with CaptureReader(filename) as reader:
+            replayed = reader.replay(feed, realtime, speed)
+        self.logger.write(f"Replayed {replayed} bytes ({frames} frames) from {filename}")
+        return frames
+
+    def _handle_frame(self, frame_data: bytes):
+        """
+        Parse one frame with the parser registered for its frame type and dispatch it.
+
+        Args:
+          frame_data: Received bytes (between length and checksum fields)
+
+        Returns:
+          Parsed frame, None if the frame type is not handled.
+        """
+        self._log(logging.DEBUG, "Decoded frame data: %s", HexDump(frame_data))
 
-        # 3) Read the next 2 bytes for length
-        length_bytes = self.ser.read(2)
-        if len(length_bytes) < 2:
-            # Not enough data
-            self.logger.write(f"Pass. Unable to read length bytes", self.logger.WARNING)
+        # The first byte of frame_data is the frame_type
+        frame_type = frame_data[0]
+        parser = self.frame_parsers.get(frame_type)
+        if parser is None:
+            # For all other frame types, just ignore or print a debug
+            self._log(logging.ERROR, "Pass. Unhandled frame type 0x%02X: %s", frame_type, HexDump(frame_data))
+            self._unhandled_frames.inc(1, _BYTE_LABELS[frame_type])
             return None
 
-        length = (length_bytes[0] << 8) + length_bytes[1]
-        # print("\nLength bytes:", f"{length_bytes[0]:02x}", f"{length_bytes[1]:02x}")
-        # print("Length:", length)
-
-        # 4) Read 'length' bytes of frame data
-        frame_data = b''
-        frame_data += self.ser.read(length)
-        timeout_start = time.time()
-        while len(frame_data) < length and time.time() < timeout_start + self.timeout:
-            time.sleep(0.001)
-            chunk = self.ser.read(length - len(frame_data))
-            frame_data += chunk
-
-
-        # print("Data Between Length & Checksum Fields:")
-        # replacing the line bellow with logger.write
-        # print(" ".join(f"{b:02x}" for b in frame_data))
-        self.logger.write("Decoded frame data: "+ " ".join(f"{b:02x}" for b in frame_data))
-
-        # 5) Read the 1-byte checksum
-        checksum_raw = self.ser.read(1)
-        # print("DEBUG: checksum_raw =", checksum_raw)
-
-        if len(checksum_raw) < 1:
-            # replacing print with logger write
-            # print("DEBUG: No checksum byte read!")
-            self.logger.write(f"DEBUG: No checksum byte read!", self.logger.WARNING)
-            # Did not get the checksum byte
+        frame = parser(frame_data)
+        if frame is None:
             return None
+        return self._dispatch_frame(frame)
 
-        expected_checksum = checksum_raw[0]
+    def _dispatch_frame(self, frame):
+        """
+        Place a parsed frame on its queue (or complete the request waiting for it) and notify subscribers.
 
-        # 6) Calculate & print checksums
-        calculated_checksum = 0xFF - (sum(frame_data) & 0xFF)
-        # Replace these print() with logger.write
-        #print("Received Checksum:", f"{expected_checksum:02x}")
-        #print("Calculated Checksum:", f"{calculated_checksum:02x}")
-        
-        self.logger.write(f"Received Checksum: {expected_checksum:02x}", self.logger.DEBUG)
-        self.logger.write(f"Calculated Checksum: {calculated_checksum:02x}", self.logger.DEBUG)
-        
-        # 7) Compare checksums
-        if expected_checksum != calculated_checksum:
-            # Replacing with logger.write too
-            # print("Checksum mismatch - ignoring frame.")
-            self.logger.write("Checksum mismatch - ignoring frame.", self.logger.WARNING)
-            self.logger.write(f"Checksum mismatch - ignoring frame: {frame_data} expected: {expected_checksum} received: {calculated_checksum}", self.logger.WARNING)
-            return None
+        Returns:
+          The frame, None if it was consumed (e.g. a fragment of an incomplete message).
+        """
+        frame_type = frame.frame_type
+        self._rx_frames.inc(1, _BYTE_LABELS[frame_type])
+        if frame_type == 0x81 or frame_type == 0x90:
+            self._log(logging.DEBUG, "Adding frame to 0x%02X (Rx Packet) queue", frame_type)
+            if self.fragmenter is not None:
+                frame = self._reassemble(frame)
+                if frame is None:
+                    return None
+            self._deliver_rx(frame)
 
-        # 8) Now parse the frame
-        #    The first byte of frame_data is the frame_type
-        frame_type = frame_data[0]
-        if frame_type == 0x81:
-            self.logger.write("Adding frame to 0x81 (Rx Packet) queue")
-            frame: x81 = self._0x81(frame_data)
-            self.x81x90_queue.put(frame)
-            return frame
-        
         elif frame_type == 0x88:
-            self.logger.write("Adding frame to 0x88 (AT Command Response) queue")
-            frame: x88 = self._0x88(frame_data)
-            self.x88_queue.put(frame)
-            return frame
-        
+            self._log(logging.DEBUG, "Adding frame to 0x88 (AT Command Response) queue")
+            # Complete the waiting request, otherwise keep the frame for anyone reading the queue
+            if not self.pending.resolve(frame.frame_id, frame):
+                self.x88_queue.put(frame)
+
         elif frame_type == 0x89:
-            self.logger.write("Adding frame to 0x89 (Tx Status) queue")
-            frame: x89 = self._0x89(frame_data)
-            self.x89_queue.put(frame)
-            return frame
-        
-        elif frame_type == 0x90:
-            self.logger.write("Adding frame to 0x90 (Tx Status) queue")
-            frame: x90 = self._0x90(frame_data)
-            self.x81x90_queue.put(frame)
-            return frame
-        
-        else:
-            # For all other frame types, just ignore or print a debug
-            self.logger.write(f"Pass. Unhandled frame type: {frame_data}", self.logger.ERROR)
-            print(f"Got frame type: 0x{frame_type:02X}, ignoring.")
-            return None
+            self._log(logging.DEBUG, "Adding frame to 0x89 (Tx Status) queue")
+            self._tx_status.inc(1, _BYTE_LABELS[frame.status])
+            if not self.pending.resolve(frame.frame_id, frame):
+                self.x89_queue.put(frame)
+
+        if self.dispatcher:
+            self.dispatcher.publish(frame, self._frame_source(frame))
+        return frame
+
+    @staticmethod
+    def _frame_source(frame) -> bytes | None:
+        """Source address of a received frame, None if the frame type has none."""
+        if frame.frame_type == 0x81:
+            return bytes(frame.source_address)
+        if frame.frame_type == 0x90:
+            return bytes(frame.address_64)
+        return None
+
+    def register_frame_parser(self, frame_type: int, parser):
+        """Handle an additional frame type (e.g. 0x97 Remote AT Command Response).
+
+        Args:
+          frame_type: API frame type.
+          parser: Called with the frame data (bytes between length and checksum fields), returns the frame object.
+            The frame object must have a frame_type attribute. Return None to drop the frame.
+        """
+        self.frame_parsers[frame_type] = parser
+
+    def subscribe(self, callback, frame_types=None, source_address=None, executor=None) -> int:
+        """Call callback for each received frame, instead of polling retrieve_data().
+
+        Args:
+          callback: Called with each matching frame.
+          frame_types: Frame type or list of frame types (e.g. 0x90). Every type if None.
+          source_address: Only frames from this source address (hex str or bytes). Every source if None.
+          executor: concurrent.futures.Executor to run the callback. Runs on the I/O thread if None,
+            so the callback must return quickly.
+
+        Returns:
+          Handle to pass to unsubscribe().
+        """
+        return self.dispatcher.subscribe(callback, frame_types, source_address, executor)
+
+    def unsubscribe(self, handle: int) -> bool:
+        """Remove a subscription created by subscribe()."""
+        return self.dispatcher.unsubscribe(handle)
+
+    def _on_subscriber_error(self, callback, e):
+        self.logger.write(f"Frame subscriber {callback} raised: {e}", self.logger.ERROR)
+
+    def _deliver_rx(self, frame):
+        """Hand a received 0x81/0x90 frame to the reader (called from the I/O thread)."""
+        if self.manager is not None:
+            self.manager._deliver_rx(self, frame)
+            return
+        self.x81x90_queue.put(frame)
+
+    def dropped_frames(self) -> dict:
+        """Number of received frames dropped by each full receive queue (or replaced by a newer frame from the same source)."""
+        return {"x81x90": self.x81x90_queue.dropped, "x88": self.x88_queue.dropped, "x89": self.x89_queue.dropped}
 
     def retrieve_data(self) -> x81 | x90:
         """
@@ -302,86 +848,165 @@ class XBee(ISerial):
         else:
             return data
         
-    def _retrieve_at_command_response(self) -> x88:
+    def _retrieve_at_command_response(self, frame_id, future) -> x88:
         """
-        Retrieves one AT response frame (0x88 - Rx Packet)
+        Retrieves the AT response frame (0x88 - Rx Packet) matching frame_id
+
+        Args:
+          frame_id: Frame ID of the AT command request.
+          future: Future returned when the frame ID was reserved.
 
         Returns:
         - 0x88: (frame_type, frame_id, at_command, status, data)
         - None: If there is no data.
         """
-        
-        try:
-            data = self.x88_queue.get(True, self.timeout)
-        except:
-            return None
-        else:
-            return data
-    def _retrieve_transmit_status(self, frame_id) -> x89:
+        return self.pending.wait(frame_id, future, self.timeout)
+
+    def _retrieve_transmit_status(self, frame_id, future) -> x89:
         """
-        Retrieves one transmit status frame (0x89 - Tx Status)
+        Retrieves the transmit status frame (0x89 - Tx Status) matching frame_id
+
+        Args:
+          frame_id: Frame ID of the transmit request.
+          future: Future returned when the frame ID was reserved.
 
         Returns:
         - 0x89: (frame_type, frame_id, status)
         - None: If there is no data.
         """
+        return self.pending.wait(frame_id, future, self.status_timeout)
 
-        try:
+    def _next_frame_id(self) -> int:
+        """Return the next frame ID (1-255) that has no outstanding response."""
+        with self._frame_id_lock:
+            return self._allocate_frame_id()
 
-            data: x89 = self.x89_queue.get(True, self.status_timeout)
-            
-            # Not a good solution but it should work.
-            if data.frame_id != frame_id:
-                data: x89 = self.x89_queue.get(True, self.status_timeout)
-        except:
-            return None
-        else:
-            return data
+    def _reserve_frame_id(self, timeout: float):
+        """Allocate a frame ID and register a pending response for it.
+
+        Args:
+          timeout: Seconds before an unanswered entry is reclaimed.
+
+        Returns:
+          (frame_id, future). The future is completed by the reader thread with the response frame.
+        """
+        with self._frame_id_lock:
+            frame_id = self._allocate_frame_id()
+            return frame_id, self.pending.register(frame_id, timeout)
+
+    def _allocate_frame_id(self) -> int:
+        for _attempt in range(2):
+            for _ in range(0xFF):
+                frame_id = self.frame_id
+                self.frame_id = self.frame_id % 0xFF + 0x01
+                if frame_id not in self.pending:
+                    return frame_id
+            # Every ID is in use, reclaim expired entries and try once more
+            self.pending.reap()
+        raise Exception("Error: No free frame ID, 255 responses are outstanding")
     
 
     # NOTE** Might need to check data length
-    def _encode_data(self, data, address = "0000000000000000"):
+    def _encode_data(self, data, address = "0000000000000000", frame_id: int = None, prefix: bytes = b""):
         """Encode String data.
 
         Args: 
           data: String data to encode.
           address: Address of destination XBee module. "0000000000000000" if no value is provided.
+          frame_id: Frame ID to use. The next free frame ID if no value is provided.
+          prefix: Bytes sent before data in the same payload (e.g. a fragment header).
         Returns:
           Framed String data.
         """
-        frame = bytearray()
-        frame.append(0x7E)  # Start delimiter (1 byte)
-        frame.append(((len(data) + 11) // 256))  # Length (2 bytes)
-        frame.append((len(data) + 11) % 256)
-        frame.append(0x00)  # Frame type (1 byte)
-        frame.append(self.frame_id)  # Frame ID (1 bytes)
-        self.frame_id = self.frame_id % 0xff + 0x01
+        if frame_id is None:
+            frame_id = self._next_frame_id()
+
+        frame = self.encoder.encode(self._payload_bytes(data), address, frame_id, prefix)
+
+        # print("Encoded data: " + ''.join('{:02x} '.format(x) for x in frame))
+        self._log(logging.DEBUG, "Encoded data: %s", HexDump(frame))
+
+        return frame
 
-        for i in range(8):  # 64-bit address (8 bytes)
-            frame.append(int(address[2 * i : 2 * i + 2], 16))
+    def _encode_many(self, data_list, address = "0000000000000000") -> bytearray:
+        """Encode several payloads for the same destination into one buffer.
 
-        frame.append(0x00)  # Options (1 byte)
+        Args:
+          data_list: Iterable of String or bytes data.
+          address: Address of destination XBee module.
+        Returns:
+          Framed data, back to back.
+        """
+        buffer = self.encoder.encode_many((self._payload_bytes(data), address, self._next_frame_id()) for data in data_list)
+        self._log(logging.DEBUG, "Encoded data: %s", HexDump(buffer))
+        return buffer
+
+    @staticmethod
+    def _payload_bytes(data):
         if isinstance(data, str):
-            frame.extend(data.encode('utf-8'))
-        elif isinstance(data, (bytes, bytearray)):
-            frame.extend(data)
-        else:
-            raise TypeError("data must be str, bytes, or bytearray")
-        # else:
-        #     decoded_message = data.decode()
-        # if isByteString:
-        #     frame.extend(data)
-        # FF - number of bytes between length & checksum field
+            return data.encode('utf-8')
+        elif isinstance(data, (bytes, bytearray, memoryview)):
+            return data
+        raise TypeError("data must be str, bytes, or bytearray")
+    
+    def _encode_at_command(self, id: str, frame_id: int, value: bytes = b"") -> bytearray:
+        """Encode an AT command request (0x08 - AT Command).
+
+        Args:
+          id: Identifier of AT command (e.g. "SH")
+          frame_id: Frame ID of the request.
+          value: Parameter value to set, empty to read the parameter.
+        Returns:
+          Framed AT command.
+        """
+        length = 4 + len(value)
+        frame = bytearray()
+        frame.append(0x7E) # Start delimiter (1 byte)
+        frame.append(length >> 8) # Length (2 bytes)
+        frame.append(length & 0xFF) # Length
+        frame.append(0x08) # Frame Type (1 byte)
+        frame.append(frame_id) # Frame ID (1 byte)
+        frame.extend(id.encode('utf-8')) # AT command (2 bytes)
+        frame.extend(value) # Parameter value (optional)
         checksum = 0xFF - (sum(frame[3:]) & 0xFF)
         frame.append(checksum)  # Checksum (1 byte)
+        return self.encoder.escape_frame(frame)
 
-        # print(frame)
-        # print("Encoded data: " + ''.join('{:02x} '.format(x) for x in frame))
-        self.logger.write("Encoded data: " + ''.join('{:02x} '.format(x) for x in frame))
+    def set_api_mode(self, api_mode: int):
+        """Switch the frame parser and encoder to API mode 1 (API) or 2 (API with escaped characters).
 
-        return frame
-    
-    def request_at_command_data(self, id, retry = 3) -> x88:
+        This does not change the XBee module's AP setting.
+        """
+        if api_mode not in (1, 2):
+            raise ValueError(f"Unsupported API mode {api_mode}, use 1 or 2")
+        self.api_mode = api_mode
+        self.encoder.escaped = api_mode == 2
+        # Same parser (its counters keep counting), switched by the thread that feeds it
+        self.parser.set_escaped(api_mode == 2)
+
+    def detect_api_mode(self) -> int | None:
+        """
+        Read the module's API mode with the AP command and configure the parser and encoder to match.
+        The current mode is tried first, then the other one.
+
+        Returns:
+          Detected API mode (1 or 2), None if the module did not respond in either mode.
+        """
+        for api_mode in (self.api_mode, 3 - self.api_mode):
+            self.set_api_mode(api_mode)
+            response: x88 = self.request_at_command_data("AP", retry=1)
+            if response is not None and response.status == 0 and len(response.data) > 0:
+                detected = response.data[-1]
+                if detected in (1, 2):
+                    self.set_api_mode(detected)
+                else:
+                    self.logger.write(f"Unsupported API mode AP={detected}, using AP={api_mode}", self.logger.ERROR)
+                self.logger.write(f"Detected API mode: AP={self.api_mode}")
+                return self.api_mode
+        self.logger.write("Unable to detect API mode (no response to AP)", self.logger.ERROR)
+        return None
+
+    def request_at_command_data(self, id, retry = 3, value: bytes = b"") -> x88:
 
         # Check if a serial port is open
         if self.ser is None:
@@ -390,24 +1015,14 @@ class XBee(ISerial):
         if id == None:
             return None
         
-        current_frame_id = self.frame_id
-        self.frame_id = self.frame_id % 0xff + 0x01
-
-        frame = bytearray()
-        frame.append(0x7E) # Start delimiter (1 byte)
-        frame.append(0x00) # Length (2 bytes)
-        frame.append(0x04) # Length
-        frame.append(0x08) # Frame Type (1 byte)
-        frame.append(current_frame_id) # Frame ID (1 byte)
-        frame.extend(id.encode('utf-8')) # AT command (2 bytes)
-        checksum = 0xFF - (sum(frame[3:]) & 0xFF)
-        frame.append(checksum)  # Checksum (1 byte)
+        current_frame_id, future = self._reserve_frame_id(self.timeout)
+        frame = self._encode_at_command(id, current_frame_id, value)
 
-        print("Sending: " + ''.join('{:02x} '.format(x) for x in frame))
-        self.logger.write("Sending: " + ''.join('{:02x} '.format(x) for x in frame))
+        self._log(logging.DEBUG, "Sending: %s", HexDump(frame))
 
         # self.ser.write(frame)
-        self.transmit_queue.put(frame)
+        start = time.monotonic()
+        self._queue_transmit(frame, TransmitScheduler.COMMAND, 0x08)
 
         # timeout_start = time.time()
         # while time.time() < timeout_start + self.timeout:
@@ -417,23 +1032,88 @@ class XBee(ISerial):
         #     if response is not None and response.frame_type == 0x88:
         #         self.logger.write(f"Response: {response}")
         #         return response
-        response: x88 = self._retrieve_at_command_response()
+        response: x88 = self._retrieve_at_command_response(current_frame_id, future)
         
         # Correct response received
-        if response is not None and response.frame_id == current_frame_id:
+        if response is not None:
+            self._at_latency.observe(time.monotonic() - start)
             return response
 
-        # No response or incorrect response received
-        if ((response is None) or (response is not None and response.frame_id != current_frame_id)) and retry > 0:
-            # Clear queue just in case
-            with self.x88_queue.mutex:
-                self.x88_queue.queue.clear()
+        # No response received
+        if retry > 0:
             self.logger.write(f"No response when running At Command {id}. Retries remaining: {retry}")
-            return self.request_at_command_data(id, (retry - 1))
+            self._at_retries.inc()
+            return self.request_at_command_data(id, (retry - 1), value)
 
         self.logger.write(f"No response when running AT Command {id}")
+        self._at_timeouts.inc()
         return None
 
+    def request_at_commands(self, ids, retry: int = 3, window: int = 16, values: dict = None) -> dict:
+        """Request several AT commands without waiting for each response before sending the next.
+
+        Up to window commands are outstanding at once, each with its own frame ID. Responses are collected
+        as they arrive and only the commands without a response are sent again.
+
+        Args:
+          ids: AT command identifiers (e.g. ["SH", "SL", "VR"]).
+          retry: Max number of times an unanswered command is sent again.
+          window: Max number of commands waiting for a response at once.
+          values: AT command identifier -> parameter value (bytes) for commands that set a value.
+
+        Returns:
+          Dict of AT command identifier to 0x88 response (None if there was no response), in the order of ids.
+        """
+        if self.ser is None:
+            raise serial.SerialException("Error: Serial port is not open")
+
+        responses = dict.fromkeys(ids)
+        attempts = dict.fromkeys(responses, 0)
+        waiting = deque(responses)
+        in_flight = {}  # future -> (AT command identifier, frame ID, deadline)
+
+        while waiting or in_flight:
+            # 1) Keep the window full
+            while waiting and len(in_flight) < window:
+                id = waiting.popleft()
+                current_frame_id, future = self._reserve_frame_id(self.timeout)
+                frame = self._encode_at_command(id, current_frame_id, values.get(id, b"") if values else b"")
+                self._log(logging.DEBUG, "Sending: %s", HexDump(frame))
+                self._queue_transmit(frame, TransmitScheduler.COMMAND, 0x08)
+                attempts[id] += 1
+                in_flight[future] = (id, current_frame_id, time.monotonic() + self.timeout)
+
+            # 2) Collect responses until the oldest outstanding command times out
+            timeout = max(0.0, min(deadline for _, _, deadline in in_flight.values()) - time.monotonic())
+            done, _ = wait_futures(in_flight, timeout, FIRST_COMPLETED)
+            for future in done:
+                id, current_frame_id, deadline = in_flight.pop(future)
+                if not future.cancelled() and future.exception() is None:
+                    responses[id] = future.result()
+                    self._at_latency.observe(time.monotonic() - (deadline - self.timeout))
+                elif attempts[id] <= retry:
+                    self._at_retries.inc()
+                    waiting.append(id)
+                else:
+                    self._at_timeouts.inc()
+
+            # 3) Send unanswered commands again
+            now = time.monotonic()
+            for future, (id, current_frame_id, deadline) in list(in_flight.items()):
+                if deadline > now:
+                    continue
+                del in_flight[future]
+                self.pending.discard(current_frame_id, future)
+                if attempts[id] <= retry:
+                    self.logger.write(f"No response when running At Command {id}. Retries remaining: {retry - attempts[id] + 1}")
+                    self._at_retries.inc()
+                    waiting.append(id)
+                else:
+                    self.logger.write(f"No response when running AT Command {id}")
+                    self._at_timeouts.inc()
+
+        return responses
+
     def _0x81(self, frame_data) -> x81:
         """Handle XBee Frame Type 81 (Frame Receive: 16-bit Address)
 
@@ -441,37 +1121,17 @@ class XBee(ISerial):
           frame_data: Received bytes (between length and checksum fields)
 
         Returns:
-          Decoded message & Received Signal Strength Indicator (RSSI), None if there is an error decoding message
-          Returns 0x81 class (frame_type, frame_id, payload, rssi, ...)
+          Returns 0x81 class (frame_type, source_address, rssi, options, data).
+          The payload is decoded on first access of data.
         """
+        view = memoryview(frame_data)
         frame_type = frame_data[0]
-        source_address = frame_data[1:3]
+        source_address = view[1:3]
         rssi = -frame_data[3]
         options = frame_data[4]
-        data = frame_data[5:]
-        try:
-            if isinstance(data, str):
-                decoded_message = data
-            elif isinstance(data, (bytes, bytearray)):
-                decoded_message = data.decode('utf-8')
-            else:
-                raise TypeError("data must be a str, bytes, or bytearray")
-            # self.logger.write(f"Received payload. RSSI: {rssi}, Decoded message: {decoded_message}")
-            
-            #print(f"RSSI (Signal Strength : {rssi} dBm)")
-            #print("Decoded message:", decoded_message)
-               
-            # frame = x81(frame_type, source_address, rssi, options, decoded_message)
-            # self.logger.write(f"[Frame Receive: 16-bit Address] Frame Type: {frame.frame_type}, Source Address: {frame.source_address}, RSSI: {frame.rssi}, Options: {frame.options}, Data: {frame_data}")
-            # return frame
-        except UnicodeDecodeError: 
-            decoded_message = data
-            # self.logger.write(f"Error decoding payload. RSSI: {rssi}, Decoded message: {decoded_message}")
-            # print("Error decoding payload")
-            # return None
-        self.logger.write(f"Received payload. RSSI: {rssi}, Decoded message: {decoded_message}")
-        frame = x81(frame_type, source_address, rssi, options, decoded_message)
-        self.logger.write(f"[Frame Receive: 16-bit Address] Frame Type: {frame.frame_type}, Source Address: {frame.source_address}, RSSI: {frame.rssi}, Options: {frame.options}, Data: {frame_data}")
+        frame = x81(frame_type, source_address, rssi, options, view[5:])
+        self._log(logging.DEBUG, "[Frame Receive: 16-bit Address] Frame Type: %d, Source Address: %s, RSSI: %d, Options: %d, Data: %s",
+                  frame_type, HexDump(source_address), rssi, options, HexDump(frame_data))
         return frame
         
     def _0x88(self, frame_data) -> x88:
@@ -483,15 +1143,15 @@ class XBee(ISerial):
         Returns:
           Returns 0x88 class (frame_type, frame_id, at_command, command_status_ command_data)
         """
-        # print(" ".join(f"{b:02x}" for b in frame_data))
-        # print(frame_data)
+        view = memoryview(frame_data)
         frame_type = frame_data[0]
         frame_id = frame_data[1]
-        at_command = frame_data[2:4]
+        at_command = view[2:4]
         command_status = frame_data[4]
-        command_data = frame_data[5:]
+        command_data = view[5:]
         frame = x88(frame_type, frame_id, at_command, command_status, command_data)
-        self.logger.write(f"[AT Command Response] Frame Type: {frame.frame_type}, Frame ID: {frame.frame_id}, AT Command: {frame.at_command}, Command Status: {frame.status}, Command Data: {frame.data}")
+        self._log(logging.DEBUG, "[AT Command Response] Frame Type: %d, Frame ID: %d, AT Command: %s, Command Status: %d, Command Data: %s",
+                  frame_type, frame_id, HexDump(at_command), command_status, HexDump(command_data))
         return frame
 
     def _0x89(self, frame_data) -> x89:
@@ -508,78 +1168,218 @@ class XBee(ISerial):
         delivery_status = frame_data[2]
         frame: x89 = x89(frame_type, frame_id, delivery_status)
 
-        self.logger.write(f"[Transmit status] Frame Type: {frame.frame_type}, Frame ID: {frame.frame_id}, Status: {frame.status}")
+        self._log(logging.DEBUG, "[Transmit status] Frame Type: %d, Frame ID: %d, Status: %d", frame_type, frame_id, delivery_status)
         return frame
     
+    def _0x8A(self, frame_data) -> x8A:
+        """Handle XBee Frame Type 8A (Modem Status)
+
+        Args:
+          frame_data: Received bytes (between length and checksum fields)
+
+        Returns:
+          Returns 0x8A class (frame_type, status)
+        """
+        frame_type = frame_data[0]
+        status = frame_data[1]
+        frame: x8A = x8A(frame_type, status)
+
+        self._log(logging.INFO, "[Modem status] Frame Type: %d, Status: 0x%02X", frame_type, status)
+        return frame
+
     def _0x90(self, frame_data) -> x90:
-        """Handle XBee Frame Type 90 (Transmit Status)
+        """Handle XBee Frame Type 90 (Receive Packet)
 
         Args:
           frame_data: Received bytes (between length and checksum fields)
 
         Returns:
-          Returns 0x90 class (frame_type, frame_id, delivery_status)
+          Returns 0x90 class (frame_type, address_64, address_16, receive_options, received_data)
         """
+        view = memoryview(frame_data)
         frame_type = frame_data[0]
-        address_64 = frame_data[1:9]
-        address_16 = frame_data[9:11]
+        address_64 = view[1:9]
+        address_16 = view[9:11]
         receive_options = frame_data[11]
-        received_data = frame_data[12:]
+        received_data = view[12:]
         frame: x90 = x90(frame_type, address_64, address_16, receive_options, received_data)
 
-        self.logger.write(f"[Transmit status] Frame Type: {frame.frame_type}, Received Data: {received_data}")
+        self._log(logging.DEBUG, "[Receive Packet] Frame Type: %d, Received Data: %s", frame_type, HexDump(received_data))
         return frame
     
-    def read_config(self, filename):
+    @staticmethod
+    def _parse_config_file(filename) -> list[str]:
+        """
+        Reads the AT command identifiers listed in a config file.
+
+        Lines look like "* SH - Serial Number High". Empty lines and (sub)category lines starting with # are skipped.
+
+        Args:
+          filename: Filename of file with a list of AT commands.
+        Returns:
+          List of AT command identifiers in file order.
+        """
+        with open(filename, 'r') as file:
+            lines = file.readlines()
+
+        at_command_ids = []
+        for line in lines:
+            # Match AT Commands (handling special characters like % and ?)
+            match = re.match(r"\*\s+([%A-Za-z0-9?]+)\s+-\s+(.+)", line.strip())
+            if match:
+                at_command_ids.append(match.group(1))
+        return at_command_ids
+
+    def read_config(self, filename) -> dict:
         """
-        Reads AT Commands from a file and logs their execution.
+        Reads AT Commands from a file and requests them pipelined (see request_at_commands).
 
         Args:
           filename: Filename of file with a list of AT commands to execute.
+        Returns:
+          Dict of AT command identifier to response value (bytes), None if there was no response.
         """
 
         # Check if a serial port is open
         if self.ser is None:
             raise serial.SerialException("Error: Serial port is not open")
 
-        with open(filename, 'r') as file:
-            lines = file.readlines()
-        
-        current_category = ""
+        at_command_ids = self._parse_config_file(filename)
         start_time = time.time()
-
-        for line in lines:
-            line = line.strip()
-            
-            # Skip empty lines and comments
-            if not line or line.startswith("#"):
-                if line.startswith("#"):
-                    current_category = line[1:].strip()
-                    # print(f"\n{current_category}")
-                    self.logger.write(f"\n{current_category}")
-                continue
-            
-            # Subcategories (##)
-            if line.startswith("##"):
-                current_category = line[2:].strip()
-                # print(f"\n{current_category}")
-                self.logger.write(f"\n{current_category}")
-                continue
-            
-            # Match AT Commands (handling special characters like % and ?)
-            match = re.match(r"\*\s+([%A-Za-z0-9?]+)\s+-\s+(.+)", line)
-            if match:
-                at_command_id, command_name = match.groups()
-                self.logger.write(f"Requesting: {at_command_id}")
-                response = self.request_at_command_data(at_command_id)
-                
-                if response:
-                    # if at_command_id
-                    log_entry = f"{response}"
-                    # print(f"Response: {log_entry}")
-                    # self.logger.write(f"Response: {log_entry}")
-                # else:
-                    # print("No response")
-                    # self.logger.write("No Response")
+        responses = self.request_at_commands(at_command_ids)
         end_time = time.time()
         self.logger.write(f"Retrieved config in: {end_time - start_time}s")
+        return {at_command_id: None if response is None else response.data for at_command_id, response in responses.items()}
+
+    def load_config(self, filename) -> dict:
+        """
+        Read the parameters listed in a config file into self.config, from the parameter cache when possible.
+
+        With a parameter cache, only SH, SL, VR and the cache's fingerprint parameters are read from the module.
+        The other values come from the module's snapshot if the fingerprint matches, otherwise every parameter
+        is read (read_config) and a new snapshot is saved.
+
+        Args:
+          filename: Filename of file with a list of AT commands.
+        Returns:
+          Dict of AT command identifier to value (bytes), None if there was no response.
+        """
+        if self.parameter_cache is None:
+            self.config = self.read_config(filename)
+            return self.config
+
+        start_time = time.time()
+        at_command_ids = self._parse_config_file(filename)
+        probe = self._read_parameters(ParameterCache.KEY_PARAMETERS + self.parameter_cache.fingerprint)
+        cached = self._cached_config(at_command_ids, probe)
+        if cached is not None:
+            self.config = cached
+            self.logger.write(f"Config served from parameter cache in: {time.time() - start_time}s")
+            return self.config
+
+        self.config = self.read_config(filename)
+        self.config.update(probe)
+        self._save_snapshot()
+        return self.config
+
+    def apply_config(self, desired: dict, write: bool = True) -> dict:
+        """
+        Set the parameters that differ from the desired values, then apply them (AC) and save them to
+        non-volatile memory (WR) once.
+
+        Args:
+          desired: AT command identifier -> value (bytes, int or str).
+          write: Send WR after the changes.
+        Returns:
+          Dict of AT command identifier -> value (bytes) of the parameters that were changed.
+        Raises:
+          Exception if the module rejected a parameter.
+        """
+        desired, unknown = self._desired_parameters(desired)
+        if unknown:
+            self.config.update(self._read_parameters(unknown))
+
+        changed = self._changed_parameters(desired)
+        if not changed:
+            return changed
+
+        self._check_set(self.request_at_commands(list(changed), values=changed))
+        for id in self._commit_commands(write):
+            self._check_set({id: self.request_at_command_data(id)}, "Command failed:")
+        self._config_applied(changed)
+        return changed
+
+    def _read_parameters(self, ids) -> dict:
+        """Read parameters (pipelined). Returns AT command identifier -> value (bytes), None if not read."""
+        return self._parameter_values(self.request_at_commands(list(ids)))
+
+    # Steps of load_config/apply_config shared with AsyncXBee, which awaits the AT commands in between
+    def _cached_config(self, at_command_ids, probe: dict) -> dict | None:
+        """
+        Config from the module's snapshot, if the snapshot is still fresh (the fingerprint parameters read
+        into probe match) and holds every parameter of at_command_ids. None if the parameters must be read.
+        """
+        key = ParameterCache.key(probe)
+        snapshot = self.parameter_cache.load(key) if key is not None else None
+        if snapshot is None or not self.parameter_cache.matches(snapshot, probe) or not all(id in snapshot for id in at_command_ids):
+            return None
+        config = {id: snapshot[id] for id in at_command_ids}
+        config.update(probe)
+        return config
+
+    def _save_snapshot(self):
+        """Save self.config as the snapshot of the module (if it identifies the module and a cache is set)."""
+        if self.parameter_cache is None:
+            return
+        key = ParameterCache.key(self.config)
+        if key is not None:
+            self.parameter_cache.save(key, self.config)
+
+    def _desired_parameters(self, desired: dict):
+        """Returns (desired values as bytes, identifiers whose current value must be read first)."""
+        desired = {id: self._parameter_bytes(value) for id, value in desired.items()}
+        return desired, [id for id in desired if self.config.get(id) is None]
+
+    def _changed_parameters(self, desired: dict) -> dict:
+        """Desired values (bytes) that differ from self.config, logged."""
+        changed = {id: value for id, value in desired.items() if not self._same_parameter(self.config.get(id), value)}
+        if changed:
+            self.logger.write(f"Setting parameters: {', '.join(changed)}")
+        else:
+            self.logger.write("Config already up to date")
+        return changed
+
+    @staticmethod
+    def _commit_commands(write: bool) -> tuple:
+        """Commands sent one after the other once parameters are set: apply (AC), then save (WR)."""
+        return ("AC", "WR") if write else ("AC",)
+
+    @staticmethod
+    def _check_set(responses: dict, message: str = "Unable to set parameters"):
+        """Raise unless every AT command of responses (identifier -> x88 or None) succeeded."""
+        failed = [id for id, response in responses.items() if response is None or response.status != 0]
+        if failed:
+            raise Exception(f"Error: {message} {', '.join(failed)}")
+
+    def _config_applied(self, changed: dict):
+        self.config.update(changed)
+        self._save_snapshot()
+
+    @staticmethod
+    def _parameter_values(responses: dict) -> dict:
+        return {id: response.data if response is not None and response.status == 0 else None for id, response in responses.items()}
+
+    @staticmethod
+    def _parameter_bytes(value) -> bytes:
+        if isinstance(value, int):
+            return value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big")
+        if isinstance(value, str):
+            return value.encode("utf-8")
+        return bytes(value)
+
+    @staticmethod
+    def _same_parameter(current: bytes | None, value: bytes) -> bool:
+        """Compare values numerically, the module pads numeric parameters with leading zeros."""
+        if current is None:
+            return False
+        return current == value or (len(current) != len(value) and int.from_bytes(current, "big") == int.from_bytes(value, "big"))
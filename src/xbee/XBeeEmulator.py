@@ -1,7 +1,10 @@
 import os
+import time
+from concurrent.futures import Future
 from dotenv import load_dotenv
 from xbee import XBee
-from xbee.utils import MqttClient, FakeSerial
+from xbee.XBee import _BYTE_LABELS
+from xbee.utils import MqttClient, FakeSerial, TransmitScheduler, PanBus, LinkModel, MqttGateway
 from xbee.frames import x81, x89, x90
 from logger import Logger
 
@@ -13,21 +16,30 @@ def _mac64_hex_to_bytes(mac: str) -> bytes:
         raise ValueError(f"mac_address must be 16 hex chars (got {mac!r})")
     return bytes.fromhex(mac)
 
+# Envelope flags
+_BROADCAST = 0x01
+_ACK = 0x02             # Acknowledgement of the sender's unicast frame_id (no payload)
+_ACK_REQUEST = 0x04     # The receiver must answer with an _ACK envelope
+
 def _build_envelope(src64_hex: str, payload: bytes, frame_id: int, broadcast: bool) -> bytes:
     """
     Envelope format:
         version (1 byte) = 1
-        flags   (1 byte) bit0=broadcast
+        flags   (1 byte) bit0=broadcast, bit1=acknowledgement, bit2=acknowledgement requested
         frame_id (1 byte)
         src64   (8 bytes)
         payload (N bytes)
     """
     version = 1
-    flags = 0x01 if broadcast else 0x00
+    flags = _BROADCAST if broadcast else 0x00
     src64 = _mac64_hex_to_bytes(src64_hex)
     return bytes([version, flags, frame_id & 0xFF]) + src64 + payload
 
 def _parse_envelope(packet: bytes):
+    """
+    Returns:
+      (flags, frame_id, src64, payload). src64 and payload are memoryviews into packet (not copied).
+    """
     if not packet or len(packet) < 11:
         raise ValueError("packet too short")
     version = packet[0]
@@ -35,22 +47,44 @@ def _parse_envelope(packet: bytes):
         raise ValueError(f"unsupported version {version}")
     flags = packet[1]
     frame_id = packet[2]
-    src64 = packet[3:11]      # 8 bytes
-    payload = packet[11:]
-    broadcast = bool(flags & 0x01)
-    return broadcast, frame_id, src64, payload
+    view = memoryview(packet)
+    src64 = view[3:11]      # 8 bytes
+    payload = view[11:]
+    return flags, frame_id, src64, payload
 
 
-class XBeeEmulator(XBee):
-    def __init__(self, *args, logger: Logger = None, pan_id: int = 3332, mac_address: str = "", **kwargs):
+# Destination addresses sent as broadcasts
+_BROADCAST_ADDRESSES = frozenset(("0000000000000000", "000000000000FFFF", "FFFFFFFFFFFFFFFF"))
 
-        load_dotenv()
-        try:
-            self.host = os.getenv("host")
-            self.mqtt_port = int(os.getenv("port"))
-            self.keepalive = int(os.getenv("keepalive"))
-        except KeyError:
-            raise RuntimeError("XBeeEmulator requires a .env file, see https://github.com/ngcp-project/xbee-python/blob/main/docs/xbee_emulator.md")
+
+class XBeeEmulator(XBee):
+    def __init__(self, *args, logger: Logger = None, pan_id: int = 3332, mac_address: str = "", transport: PanBus | MqttGateway = None,
+                 link_model: LinkModel = None, receive_packet_type: str = None, ack_timeout: float | None = 1.0,
+                 qos: int = 0, **kwargs):
+        """
+        Args:
+          transport: None to exchange frames through the MQTT broker configured in the .env file (one connection per emulator),
+            a PanBus to exchange frames with the emulators attached to it in this process (no .env needed),
+            or an MqttGateway to share one broker connection between many emulators.
+          link_model: LinkModel shared by the emulators of this process to simulate airtime, contention, RSSI
+            and loss. None delivers every frame instantly with a fixed RSSI.
+          receive_packet_type: "81" or "90", frame type of received data. The receivepacket .env setting if None
+            (0x90 if it is not set).
+          ack_timeout: Seconds to wait for the receiver's acknowledgement of a unicast sent with retrieveStatus
+            before reporting no ACK (0x01). None to report success as soon as the frame is published.
+          qos: MQTT QoS of published envelopes and of the subscriptions (1 to have the broker confirm
+            and retry deliveries).
+        """
+        if transport is None:
+            load_dotenv()
+            try:
+                self.host = os.getenv("host")
+                self.mqtt_port = int(os.getenv("port"))
+                self.keepalive = int(os.getenv("keepalive"))
+            except (KeyError, TypeError, ValueError):
+                raise RuntimeError("XBeeEmulator requires a .env file, see https://github.com/ngcp-project/xbee-python/blob/main/docs/xbee_emulator.md")
+        else:
+            self.host = self.mqtt_port = self.keepalive = None
 
         self.pan_id = pan_id
         self.mac_address = (mac_address or "").upper()
@@ -58,20 +92,43 @@ class XBeeEmulator(XBee):
         self.logger = logger or Logger()
 
         super().__init__(*args, logger=self.logger, pan_id=pan_id, mac_address=mac_address, **kwargs)
-        self.client = MqttClient(str(pan_id), self.mac_address, on_rf=self._on_mqtt, use_tls=True)
+        if transport is None:
+            self.client = MqttClient(str(pan_id), self.mac_address, on_rf=self._on_mqtt, use_tls=True)
+        else:
+            self.client = transport.client(pan_id, self.mac_address, on_rf=self._on_mqtt)
         self.client.set_username_pw(self.mac_address, self.mac_address)
 
+        self.link_model = link_model
+        self.ack_timeout = ack_timeout
+        if ack_timeout is not None:
+            self.status_timeout = ack_timeout   # Status timeout of transmit_reliable() attempts
+        self.qos = qos
+        self._ack_sources: dict = {}    # Frame ID -> destination address (bytes) expected to acknowledge it
         self._running = False
 
+        # Computed once, used for every message
+        try:
+            self._mac_bytes = _mac64_hex_to_bytes(self.mac_address)
+        except ValueError:
+            self._mac_bytes = None  # Reported on the first transmit
+        if receive_packet_type is None:
+            receive_packet_type = os.getenv("receivepacket") or "90"
+        receive_packet_type = receive_packet_type.strip().lower().removeprefix("0x").removeprefix("x")
+        if receive_packet_type not in ("81", "90"):
+            self.logger.write(f"Error: Unknown receive packet type {receive_packet_type!r}. Please use 81 or 90. Using 90", self.logger.ERROR)
+            receive_packet_type = "90"
+        self.receive_packet_type = int(receive_packet_type, 16)
+
     def open(self) -> bool:
         if self.ser is not None:
             self.logger.write(f"Already open. ser={self.ser}")
             return False
 
         self.client.connect(self.host, self.mqtt_port, self.keepalive)
-        self.client.subscribe_rf()
+        self.client.subscribe_rf(qos=self.qos)
 
         self.ser = FakeSerial(logger=self.logger)
+        self._start_log_sink()
         self._running = True
         self.logger.write("XBeeEmulator open (MQTT connected; FakeSerial active).")
         return True
@@ -81,6 +138,9 @@ class XBeeEmulator(XBee):
             self.logger.write("Already closed.")
             return False
 
+        if self.reliable_sender is not None:
+            self.reliable_sender.close()
+            self.reliable_sender = None
         try:
             self.client.disconnect()
         finally:
@@ -90,79 +150,226 @@ class XBeeEmulator(XBee):
                 pass
             self.ser = None
             self._running = False
+            self._stop_log_sink()
 
         self.logger.write("XBeeEmulator closed.")
         return True
 
-    def transmit_data(self, data: str, address: str = "0000000000000000", retrieveStatus: bool = False) -> x89 | None:
+    def transmit_data(self, data: str, address: str = "0000000000000000", retrieveStatus: bool = False,
+                      priority: int = TransmitScheduler.NORMAL) -> x89 | None:
+        # priority is accepted for compatibility with XBee.transmit_data, messages are published immediately
         if self.ser is None:
             raise Exception("Error: connection is not open (ser is None).")
 
-        current_frame_id = self.frame_id
-        self.frame_id = self.frame_id % 0xFF + 0x01
+        start = time.monotonic()
+        current_frame_id, status, done_at, ack = self._transmit(data, address, retrieveStatus)
+
+        if retrieveStatus and current_frame_id != 0:
+            if ack is not None:
+                return self._emulated_status(self._acknowledged_status(current_frame_id, status, ack, start, done_at), start)
+            delay = done_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)   # The status arrives when the transmission ends
+            return self._emulated_status(x89(0x89, current_frame_id, status), start)
+        return None
+
+    def _emulated_status(self, status: x89, start: float) -> x89:
+        """Count an emulated transmit status (not dispatched like a received 0x89) and record its latency."""
+        self._tx_status.inc(1, _BYTE_LABELS[status.status])
+        return self._timed_status(status, start)
+
+    def _transmit(self, data, address: str, retrieveStatus: bool = False):
+        """
+        Build and send an envelope.
 
+        Args:
+          retrieveStatus: Request an acknowledgement from the receiver of a unicast (if ack_timeout is set).
+
+        Returns:
+          (frame ID, 0x89 status, time.monotonic() when the transmission ends,
+           Future completed with the acknowledgement's arrival time or None if no acknowledgement was requested)
+        """
+        dst64 = (address or "").upper()
+        ack = None
+        if retrieveStatus and self.ack_timeout is not None and dst64 not in _BROADCAST_ADDRESSES:
+            # Registered before sending, the acknowledgement may arrive before publish returns
+            current_frame_id, ack = self._reserve_frame_id(self.ack_timeout)
+        else:
+            current_frame_id = self._next_frame_id()
+        try:
+            dst64, broadcast, packet, payload_length = self._envelope(data, dst64, current_frame_id, ack is not None)
+            if ack is not None:
+                self._ack_sources[current_frame_id] = _mac64_hex_to_bytes(dst64)
+        except Exception:
+            if ack is not None:
+                self.pending.discard(current_frame_id, ack)
+            raise
+        status, done_at = self._send(dst64, packet, payload_length, broadcast)
+        if status != 0x00 and ack is not None:
+            self.pending.discard(current_frame_id, ack)
+        return current_frame_id, status, done_at, ack
+
+    def _acknowledged_status(self, frame_id: int, status: int, ack, start: float, done_at: float) -> x89:
+        """Wait for the receiver's acknowledgement. See _transmit."""
+        if status != 0x00:
+            delay = done_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)   # The failure is reported when the last attempt ends
+            return x89(0x89, frame_id, status)
+        acked_at = self.pending.wait(frame_id, ack, max(0.0, done_at - time.monotonic()) + self.ack_timeout)
+        return self._ack_result(frame_id, acked_at, start)
+
+    @staticmethod
+    def _ack_result(frame_id: int, acked_at: float | None, start: float) -> x89:
+        if acked_at is None:
+            return x89(0x89, frame_id, LinkModel.NO_ACK)
+        return x89(0x89, frame_id, 0x00, acked_at - start)
+
+    def _envelope(self, data, address: str, frame_id: int, ack_request: bool = False):
+        """
+        Returns:
+          (destination address, broadcast, envelope, payload length)
+        """
         dst64 = (address or "").upper()
-        broadcast = (dst64 == "0000000000000000" or dst64 == "FFFFFFFFFFFFFFFF")
+        broadcast = dst64 in _BROADCAST_ADDRESSES
 
         if isinstance(data, str):
             payload_bytes = data.encode("utf-8")
-        elif isinstance(data, (bytes, bytearray)):
-            payload_bytes = bytes(data)
+        elif isinstance(data, (bytes, bytearray, memoryview)):
+            payload_bytes = data
         else:
             raise TypeError("data must be str/bytes/bytearray")
 
-        packet = _build_envelope(self.mac_address, payload_bytes, current_frame_id, broadcast)
-
-        try:
-            if broadcast:
-                self.client.publish_broadcast(packet)
-            else:
-                self.client.publish_unicast(dst64, packet)
+        if self._mac_bytes is None:
+            _mac64_hex_to_bytes(self.mac_address)   # Raises ValueError
+        # Same layout as _build_envelope, with the source address converted once
+        flags = _BROADCAST if broadcast else (_ACK_REQUEST if ack_request else 0x00)
+        packet = b"".join((bytes((1, flags, frame_id & 0xFF)), self._mac_bytes, payload_bytes))
+        return dst64, broadcast, packet, len(payload_bytes)
 
-            if retrieveStatus and current_frame_id != 0:
-                return x89(0x89, current_frame_id, 0x00)  # success
-            return None
+    def transmit_many(self, data_list, address: str = "0000000000000000", priority: int = TransmitScheduler.NORMAL):
+        """Transmit several payloads to the same destination, published as one batch. See XBee.transmit_many."""
+        if self.ser is None:
+            raise Exception("Error: connection is not open (ser is None).")
 
+        envelopes = [self._envelope(data, address, self._next_frame_id()) for data in data_list]
+        if self.link_model is not None:
+            for dst64, broadcast, packet, payload_length in envelopes:
+                self._send(dst64, packet, payload_length, broadcast)
+            return
+        self._tx_frames.inc(len(envelopes), _BYTE_LABELS[0x00])
+        self._tx_bytes.inc(sum(len(packet) for _, _, packet, _ in envelopes))
+        try:
+            self.client.publish_many([(None if broadcast else dst64, packet) for dst64, broadcast, packet, _ in envelopes],
+                                     qos=self.qos)
         except Exception as e:
             self.logger.write(f"Emulator transmit failed: {e}", self.logger.ERROR)
-            if retrieveStatus and current_frame_id != 0:
-                return x89(0x89, current_frame_id, 0x21)  # generic failure
-            return None
+
+    def _send(self, dst64: str, packet: bytes, payload_length: int, broadcast: bool):
+        """
+        Publish an envelope, through the link model if there is one.
+
+        Returns:
+          (0x89 status, time.monotonic() when the transmission ends)
+        """
+        def publish():
+            try:
+                if broadcast:
+                    self.client.publish_broadcast(packet, qos=self.qos)
+                else:
+                    self.client.publish_unicast(dst64, packet, qos=self.qos)
+                return 0x00
+            except Exception as e:
+                self.logger.write(f"Emulator transmit failed: {e}", self.logger.ERROR)
+                return 0x21  # generic failure
+
+        self._tx_frames.inc(1, _BYTE_LABELS[0x00])
+        self._tx_bytes.inc(len(packet))
+        if self.link_model is None:
+            return publish(), time.monotonic()
+
+        status, done_at = self.link_model.transmit(self.pan_id, self.mac_address, dst64, payload_length, broadcast)
+        if status == 0x00:
+            # Receivers get the frame when its transmission ends
+            self.link_model.schedule(done_at, publish)
+        return status, done_at
+
+    def _send_attempt(self, data, address: str, priority: int, timeout: float):
+        """
+        Send one transmit_reliable() attempt. The returned future is completed with the emulated 0x89 when
+        the transmission ends (link model) or when the receiver's acknowledgement arrives.
+
+        Returns:
+          (frame_id, future completed with the 0x89 frame)
+        """
+        start = time.monotonic()
+        frame_id, status, done_at, ack = self._transmit(data, address, retrieveStatus=True)
+        status_future = Future()
+
+        def complete(frame: x89):
+            if not status_future.done():
+                status_future.set_result(self._emulated_status(frame, start))
+
+        def acknowledged(ack_future: Future):
+            acked_at = None if ack_future.cancelled() or ack_future.exception() is not None else ack_future.result()
+            self.pending.discard(frame_id, ack_future)
+            complete(self._ack_result(frame_id, acked_at, start))
+
+        if ack is not None and status == 0x00:
+            ack.add_done_callback(acknowledged)
+        elif self.link_model is not None and done_at > time.monotonic():
+            self.link_model.schedule(done_at, lambda: complete(x89(0x89, frame_id, status)))
+        else:
+            complete(x89(0x89, frame_id, status))
+        return frame_id, status_future
 
     def _on_mqtt(self, topic: str, payload: bytes):
         """
         Convert MQTT payload -> x81 OR x90 -> enqueue into the same queue XBee.retrieve_data() uses.
         """
         try:
-            _broadcast, _frame_id, src64_bytes, rf_payload = _parse_envelope(payload)
+            self._rx_bytes.inc(len(payload))
+            flags, frame_id, src64_bytes, rf_payload = _parse_envelope(payload)
 
             # Ignore broadcasts from self
-            if src64_bytes.hex().upper() == self.mac_address.upper():
+            if src64_bytes == self._mac_bytes:
                 return
 
+            if flags & _ACK:
+                # Only the radio the frame was sent to may complete it (the frame ID may have been reused)
+                if self._ack_sources.get(frame_id) == src64_bytes:
+                    self.pending.resolve(frame_id, time.monotonic())
+                return
+            _broadcast = bool(flags & _BROADCAST)
+
             source_address = src64_bytes[-2:]
 
             rssi = -40
+            if self.link_model is not None:
+                rssi_dbm = self.link_model.rssi(src64_bytes.hex(), self.mac_address)
+                # Unicast losses are decided by the sender (retries/no ACK), broadcasts are lost per receiver
+                if _broadcast and not self.link_model.received(rssi_dbm):
+                    return
+                rssi = round(rssi_dbm)
             options = 0x00
 
-            try:
-                decoded = rf_payload.decode("utf-8")
-            except UnicodeDecodeError:
-                decoded = rf_payload.decode("latin1")
-
-            receive_packet_type = os.getenv("receivepacket")
-            frame = None
-            if receive_packet_type == "81":
-                frame = x81(0x81, source_address, rssi, options, decoded)
-
-            elif receive_packet_type == "90":
-                frame = x90(0x90, source_address, "0000", options, decoded)
+            if self.receive_packet_type == 0x81:
+                # Decoded on first access of .data
+                frame = x81(0x81, source_address, rssi, options, rf_payload)
             else:
-                print("Error: Unknown receive packet type. Please use x81 or x90. Please add the relevant receive packet type to the .env file")
-            self.x81x90_queue.put(frame)
+                try:
+                    data = str(rf_payload, "utf-8")
+                except UnicodeDecodeError:
+                    data = bytes(rf_payload)
+                frame = x90(0x90, source_address, "0000", options, data)
+            self._dispatch_frame(frame)
+
+            if flags & _ACK_REQUEST and not _broadcast:
+                self.client.publish_unicast(src64_bytes.hex().upper(), bytes((1, _ACK, frame_id)) + self._mac_bytes,
+                                            qos=self.qos)
 
         except Exception as e:
             self.logger.write(f"MQTT RX parse failed: {e}", self.logger.ERROR)
 
     def _retrieve_data(self):
-        return None
\ No newline at end of file
+        return []
\ No newline at end of file
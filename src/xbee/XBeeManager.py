@@ -0,0 +1,354 @@
+import math
+import queue
+import selectors
+import socket
+import threading
+import time
+
+import serial   # Pyserial, used for SerialException
+
+from xbee.XBee import XBee
+from xbee.frames import x89
+from xbee.utils import TransmitScheduler
+from logger import Logger    # Custom logging class
+
+
+class _Link:
+    """Recent link quality between one radio and one remote address."""
+    __slots__ = ("rssi", "delivery", "seen")
+
+    def __init__(self):
+        self.rssi = None        # Average RSSI in dBm (negative, higher is better), None if not reported
+        self.delivery = 1.0     # Average transmit success (0 - 1)
+        self.seen = 0.0         # time.monotonic() of the last frame or status
+
+
+class XBeeManager:
+    """
+    Drives several XBee (and XBeeEmulator) instances from a single I/O thread.
+
+    Every managed serial port is registered with one selector, so idle radios cost no CPU and adding
+    radios does not add threads. Frames received by any radio are delivered to one queue, tagged with
+    the radio's name, and transmit() sends through the radio with the best recent link to the destination.
+
+    Example:
+        manager = XBeeManager()
+        manager.add("north", XBee("/dev/ttyUSB0"))
+        manager.add("south", XBee("/dev/ttyUSB1"))
+        manager.open()
+        name, frame = manager.retrieve_data()
+    """
+    RSSI_WEIGHT = 0.2       # Weight of a new sample in the link averages
+    DELIVERY_WEIGHT = 0.2
+
+    def __init__(self, logger: Logger = None, rx_queue_size: int = 0, link_timeout: float = 10.0):
+        """
+        Args:
+          logger: Logger instance
+          rx_queue_size: Max number of received frames waiting for retrieve_data() (oldest dropped first), 0 for no limit.
+          link_timeout: Seconds after which a link without traffic is no longer used for routing.
+        """
+        self.logger = logger or Logger()
+        self.radios: dict = {}      # Name -> XBee
+        self.link_timeout = link_timeout
+
+        # Received 0x81/0x90 frames of every radio: (radio name, frame)
+        self.rx_queue: queue.Queue = queue.Queue(rx_queue_size)
+        self.dropped = 0
+        self._links: dict = {}      # Remote address (hex, 64-bit when known) -> {radio name -> _Link}
+        self._addresses: dict = {}  # 16-bit address (hex) -> 64-bit address (hex) of the same remote radio
+        self._links_lock = threading.Lock()
+
+        # I/O thread
+        self._io_thread: threading.Thread = None
+        self._io_running = False
+        self._selector: selectors.BaseSelector = None
+        self._wakeup_r: socket.socket = None    # Socket pair used to wake the I/O thread (selectable on every platform)
+        self._wakeup_w: socket.socket = None
+        self._changes: list = []    # (radio, attach) requests applied by the I/O thread
+        self._changes_lock = threading.Lock()
+        self._selected: list = []   # Radios registered with the selector
+        self._polled: list = []     # Radios whose port cannot be selected on (read with a zero timeout)
+
+    def add(self, name: str, radio: XBee):
+        """Manage a radio. Must be called before the radio is opened."""
+        if name in self.radios:
+            raise ValueError(f"A radio named {name!r} is already managed")
+        if radio.ser is not None:
+            raise ValueError(f"Radio {name!r} is already open, add it before opening it")
+        radio.manager = self
+        radio.manager_name = name
+        radio.metrics.labels.setdefault("radio", name)
+        self.radios[name] = radio
+
+    def remove(self, name: str) -> XBee:
+        """Stop managing a radio (closing it first)."""
+        radio = self.radios.pop(name)
+        radio.close()
+        radio.manager = None
+        return radio
+
+    def open(self):
+        """Start the I/O thread and open every radio."""
+        self._start_io_thread()
+        for radio in self.radios.values():
+            radio.open()
+
+    def close(self):
+        """Close every radio and stop the I/O thread."""
+        for radio in self.radios.values():
+            radio.close()
+        self._stop_io_thread()
+
+    def retrieve_data(self, timeout: float = 0.1):
+        """
+        Retrieves one frame received by any radio.
+
+        Returns:
+          (radio name, 0x81/0x90 frame), None if no frame was received within timeout.
+        """
+        try:
+            return self.rx_queue.get(True, timeout)
+        except queue.Empty:
+            return None
+
+    def transmit(self, data, address: str = "0000000000000000", retrieveStatus: bool = False,
+                 priority: int = TransmitScheduler.NORMAL):
+        """Transmit data through the radio with the best recent link to address (see best_radio).
+
+        Returns:
+          (radio name, transmit_data() result)
+        """
+        name = self.best_radio(address)
+        result = self.radios[name].transmit_data(data, address, retrieveStatus, priority)
+        if retrieveStatus:
+            self._update_delivery(name, address, result)
+        return name, result
+
+    def best_radio(self, address: str) -> str:
+        """
+        Name of the radio to reach address: the radio with the best recent delivery rate, then the best RSSI.
+
+        A radio without traffic to or from address within link_timeout ranks as if its transmits succeeded,
+        so it is tried as soon as the radios in use start failing. Ties go to the radio with a known link,
+        then to the first added radio.
+
+        0x81 frames (the only ones carrying an RSSI) identify their source by its 16-bit address. Once the
+        64-bit address of that source is known (see map_address), its RSSI also ranks radios for the 64-bit address.
+        """
+        if not self.radios:
+            raise Exception("Error: No radios are managed")
+        now = time.monotonic()
+        with self._links_lock:
+            links = self._links.get(self._resolve(address), {})
+            recent = {name: link for name, link in links.items() if now - link.seen <= self.link_timeout}
+
+        candidates = []
+        for index, name in enumerate(self.radios):
+            link = recent.get(name)
+            if link is None:
+                candidates.append((1.0, -math.inf, False, -index, name))
+            else:
+                candidates.append((link.delivery, link.rssi if link.rssi is not None else -math.inf, True, -index, name))
+        return max(candidates)[-1]
+
+    def map_address(self, address_16: str, address_64: str):
+        """
+        Record the 64-bit address of the remote radio using a 16-bit address (its MY parameter), so the
+        links seen through either address are ranked together. Learned automatically from received 0x90 frames.
+
+        Args:
+          address_16: 16-bit address (4 hex characters).
+          address_64: 64-bit address (16 hex characters).
+        """
+        address_16, address_64 = address_16.upper(), address_64.upper()
+        with self._links_lock:
+            if self._addresses.get(address_16) == address_64:
+                return
+            self._addresses[address_16] = address_64
+            # Merge the links recorded under the 16-bit address so far
+            merged = self._links.setdefault(address_64, {})
+            for name, link in self._links.pop(address_16, {}).items():
+                current = merged.get(name)
+                if current is None:
+                    merged[name] = link
+                    continue
+                if current.rssi is None:
+                    current.rssi = link.rssi
+                current.seen = max(current.seen, link.seen)
+
+    def links(self) -> dict:
+        """Recent link quality: remote address -> {radio name -> {"rssi", "delivery", "age"}}."""
+        now = time.monotonic()
+        with self._links_lock:
+            return {address: {name: {"rssi": link.rssi, "delivery": link.delivery, "age": now - link.seen}
+                              for name, link in links.items()}
+                    for address, links in self._links.items()}
+
+    # Radio hooks (see XBee._deliver_rx, XBee._start_io_thread)
+
+    def _deliver_rx(self, radio: XBee, frame):
+        """Called by a radio for each received 0x81/0x90 frame."""
+        if frame.frame_type == 0x90 and bytes(frame.address_16) != b"\xff\xfe":   # 0xFFFE: 16-bit address unknown
+            self.map_address(bytes(frame.address_16).hex(), bytes(frame.address_64).hex())
+
+        source = XBee._frame_source(frame)
+        if source is not None:
+            link = self._link(radio.manager_name, source.hex().upper())
+            link.seen = time.monotonic()
+            rssi = getattr(frame, "rssi", None)
+            if rssi is not None:
+                link.rssi = rssi if link.rssi is None else link.rssi + (rssi - link.rssi) * self.RSSI_WEIGHT
+
+        try:
+            self.rx_queue.put_nowait((radio.manager_name, frame))
+        except queue.Full:
+            try:
+                self.rx_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.dropped += 1
+            self.rx_queue.put_nowait((radio.manager_name, frame))
+
+    def _update_delivery(self, name: str, address: str, status: x89 | None):
+        link = self._link(name, address.upper())
+        success = 1.0 if status is not None and status.status == 0 else 0.0
+        link.delivery += (success - link.delivery) * self.DELIVERY_WEIGHT
+        link.seen = time.monotonic()
+
+    def _resolve(self, address: str) -> str:
+        """Key of the links of address: its 64-bit address when known. Called with _links_lock held."""
+        address = address.upper()
+        return self._addresses.get(address, address)
+
+    def _link(self, name: str, address: str) -> _Link:
+        with self._links_lock:
+            links = self._links.setdefault(self._resolve(address), {})
+            link = links.get(name)
+            if link is None:
+                link = links[name] = _Link()
+            return link
+
+    def _attach(self, radio: XBee):
+        """Start serving a radio's port from the I/O thread (called by radio.open())."""
+        self._change(radio, True)
+
+    def _detach(self, radio: XBee):
+        """Stop serving a radio's port (called by radio.close() before the port is closed)."""
+        self._change(radio, False)
+
+    def wake(self):
+        """Interrupt the I/O thread's select() (e.g. a frame was queued)."""
+        if self._wakeup_w is None:
+            return
+        try:
+            self._wakeup_w.send(b"\x00")
+        except (BlockingIOError, OSError):
+            # Socket buffer full (a wakeup is pending) or closed
+            pass
+
+    def _change(self, radio: XBee, attach: bool):
+        if not self._io_running:
+            raise Exception("Error: XBeeManager is not open")
+        done = threading.Event()
+        with self._changes_lock:
+            self._changes.append((radio, attach, done))
+        self.wake()
+        if self._io_thread is not threading.current_thread():
+            done.wait()
+
+    def _apply_changes(self):
+        with self._changes_lock:
+            changes, self._changes = self._changes, []
+        for radio, attach, done in changes:
+            if attach:
+                self._register(radio)
+            else:
+                self._unregister(radio)
+            done.set()
+
+    def _register(self, radio: XBee):
+        try:
+            fileno = radio.ser.fileno()
+        except (AttributeError, OSError, ValueError):
+            fileno = None
+        if fileno is None:
+            radio.ser.timeout = 0
+            self._polled.append(radio)
+        else:
+            self._selector.register(fileno, selectors.EVENT_READ, radio)
+            self._selected.append(radio)
+
+    def _unregister(self, radio: XBee):
+        if radio in self._selected:
+            self._selected.remove(radio)
+            for key in list(self._selector.get_map().values()):
+                if key.data is radio:
+                    self._selector.unregister(key.fileobj)
+        if radio in self._polled:
+            self._polled.remove(radio)
+
+    def _start_io_thread(self):
+        if self._io_running:
+            return
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+
+        self._io_running = True
+        self._io_thread = threading.Thread(target=self._run, name="XBeeManager", daemon=True)
+        self._io_thread.start()
+
+    def _stop_io_thread(self):
+        self._io_running = False
+        if self._io_thread is None:
+            return
+        self.wake()
+        self._io_thread.join()
+        self._io_thread = None
+
+        self._selector.close()
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+        self._selector = self._wakeup_r = self._wakeup_w = None
+        self._selected.clear()
+        self._polled.clear()
+
+    def _run(self):
+        """I/O thread. Writes queued frames of every radio and reads every radio that has incoming data."""
+        while self._io_running:
+            self._apply_changes()
+
+            # 1) Write queued frames, and find when the next rate limited frame is due
+            timeout = None
+            for radio in self._selected + self._polled:
+                self._serve(radio, radio._write_queued)
+                delay = radio.transmit_queue.delay()
+                if delay is not None and (timeout is None or delay < timeout):
+                    timeout = delay
+            if self._polled:
+                poll_interval = min(radio.poll_interval for radio in self._polled)
+                timeout = poll_interval if timeout is None else min(timeout, poll_interval)
+
+            # 2) Block until a port has incoming data, a frame is queued or a radio is attached/detached
+            for key, _ in self._selector.select(timeout):
+                if key.data is None:
+                    try:
+                        while self._wakeup_r.recv(512):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                else:
+                    self._serve(key.data, key.data._retrieve_data)
+            for radio in self._polled:
+                self._serve(radio, radio._retrieve_data)
+
+    def _serve(self, radio: XBee, action):
+        """Run a radio's read/write step. A radio whose port fails is detached, the others keep running."""
+        try:
+            action()
+        except (serial.SerialException, OSError) as e:
+            radio.logger.write(f"Serial I/O stopped for radio {radio.manager_name}: {e}", radio.logger.ERROR)
+            self._unregister(radio)
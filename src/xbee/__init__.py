@@ -1,6 +1,9 @@
 from .XBee import XBee
 # from .XBeeEmulator import XBeeEmulator
 from .XBeeEmulator import XBeeEmulator
+from .AsyncXBee import AsyncXBee
+from .AsyncXBeeEmulator import AsyncXBeeEmulator
+from .XBeeManager import XBeeManager
 
 __all__ = []
-__all__ += ["XBee", "XBeeEmulator"]
\ No newline at end of file
+__all__ += ["XBee", "XBeeEmulator", "AsyncXBee", "AsyncXBeeEmulator", "XBeeManager"]
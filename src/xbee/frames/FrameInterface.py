@@ -1,4 +1,32 @@
 class FrameInterface:
-    pass
-#     def __init__(self, frame_type):
-#         self.frame_type = frame_type
\ No newline at end of file
+    """
+    Base class for received frames.
+
+    Frames are immutable and use __slots__ (no per-instance __dict__). Address and payload fields
+    hold memoryviews over the received frame data, so parsing a frame does not copy it.
+    """
+    __slots__ = ("frame_type",)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _set(self, name, value):
+        # Only used while constructing the frame
+        object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={_format(getattr(self, name))}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+def _format(value):
+    if isinstance(value, memoryview):
+        return value.hex()
+    return repr(value)
+
+
+# Marks a lazily computed slot that has not been computed yet
+_UNSET = object()
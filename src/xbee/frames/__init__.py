@@ -1,6 +1,7 @@
 from .x81 import x81
 from .x88 import x88
 from .x89 import x89
+from .x8A import x8A
 from .x90 import x90
 
-__all__ = ["x81", "x88", "x89", "x90"]
\ No newline at end of file
+__all__ = ["x81", "x88", "x89", "x8A", "x90"]
@@ -1,8 +1,30 @@
-# from Communication.XBee.Frames import FrameInterface
-class x81():
-    def __init__(self, frame_type, source_address, rssi, options: int, data: str):
-        self.frame_type = frame_type
-        self.source_address = source_address
-        self.rssi = rssi
-        self.options = options
-        self.data = data
+from .FrameInterface import FrameInterface, _UNSET
+
+
+class x81(FrameInterface):
+    __slots__ = ("source_address", "rssi", "options", "payload", "_data")
+    _fields = ("frame_type", "source_address", "rssi", "options", "data")
+
+    def __init__(self, frame_type, source_address, rssi, options: int, data):
+        """
+        Args:
+          data: Received payload. A memoryview/bytes payload is decoded on first access of .data.
+        """
+        self._set("frame_type", frame_type)
+        self._set("source_address", source_address)
+        self._set("rssi", rssi)
+        self._set("options", options)
+        self._set("payload", data)
+        self._set("_data", data if isinstance(data, str) else _UNSET)
+
+    @property
+    def data(self) -> str | bytes:
+        """Payload decoded as UTF-8, raw bytes if it is not valid UTF-8 (decoded once, then cached)."""
+        data = self._data
+        if data is _UNSET:
+            try:
+                data = str(self.payload, 'utf-8')
+            except UnicodeDecodeError:
+                data = bytes(self.payload)
+            self._set("_data", data)
+        return data
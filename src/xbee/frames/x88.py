@@ -1,7 +1,23 @@
-class x88():
+from .FrameInterface import FrameInterface, _UNSET
+
+
+class x88(FrameInterface):
+    __slots__ = ("frame_id", "at_command", "status", "payload", "_data")
+    _fields = ("frame_type", "frame_id", "at_command", "status", "data")
+
     def __init__(self, frame_type, frame_id, at_command, status, data):
-        self.frame_type = frame_type
-        self.frame_id = frame_id
-        self.at_command = at_command
-        self.status = status
-        self.data = data
\ No newline at end of file
+        self._set("frame_type", frame_type)
+        self._set("frame_id", frame_id)
+        self._set("at_command", at_command)
+        self._set("status", status)
+        self._set("payload", data)
+        self._set("_data", data if not isinstance(data, memoryview) else _UNSET)
+
+    @property
+    def data(self) -> bytes:
+        """Command data as bytes (copied from the received frame once, then cached)."""
+        data = self._data
+        if data is _UNSET:
+            data = bytes(self.payload)
+            self._set("_data", data)
+        return data
@@ -1,5 +1,12 @@
-class x89():
-    def __init__(self, frame_type, frame_id, status):
-        self.frame_type = frame_type
-        self.frame_id = frame_id
-        self.status = status
\ No newline at end of file
+from .FrameInterface import FrameInterface
+
+
+class x89(FrameInterface):
+    __slots__ = ("frame_id", "status", "rtt")
+    _fields = ("frame_type", "frame_id", "status", "rtt")
+
+    def __init__(self, frame_type, frame_id, status, rtt: float = None):
+        self._set("frame_type", frame_type)
+        self._set("frame_id", frame_id)
+        self._set("status", status)
+        self._set("rtt", rtt)   # Seconds from transmit to acknowledgement (emulator only), None if not measured
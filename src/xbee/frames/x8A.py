@@ -0,0 +1,10 @@
+from .FrameInterface import FrameInterface
+
+
+class x8A(FrameInterface):
+    __slots__ = ("status",)
+    _fields = ("frame_type", "status")
+
+    def __init__(self, frame_type, status):
+        self._set("frame_type", frame_type)
+        self._set("status", status)
@@ -1,7 +1,23 @@
-class x90():
+from .FrameInterface import FrameInterface, _UNSET
+
+
+class x90(FrameInterface):
+    __slots__ = ("address_64", "address_16", "receive_options", "payload", "_received_data")
+    _fields = ("frame_type", "address_64", "address_16", "receive_options", "received_data")
+
     def __init__(self, frame_type, address_64, address_16, receive_options, received_data):
-        self.frame_type = frame_type
-        self.address_64 = address_64
-        self.address_16 = address_16
-        self.receive_options = receive_options
-        self.received_data = received_data
\ No newline at end of file
+        self._set("frame_type", frame_type)
+        self._set("address_64", address_64)
+        self._set("address_16", address_16)
+        self._set("receive_options", receive_options)
+        self._set("payload", received_data)
+        self._set("_received_data", received_data if not isinstance(received_data, memoryview) else _UNSET)
+
+    @property
+    def received_data(self) -> bytes | str:
+        """Received payload as bytes (copied from the received frame once, then cached)."""
+        received_data = self._received_data
+        if received_data is _UNSET:
+            received_data = bytes(self.payload)
+            self._set("_received_data", received_data)
+        return received_data
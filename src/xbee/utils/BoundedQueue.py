@@ -0,0 +1,135 @@
+import asyncio
+import queue
+from collections import OrderedDict
+
+
+class BoundedQueue(queue.Queue):
+    """
+    queue.Queue with a policy for puts into a full queue.
+
+      - "block":        put() waits for space (queue.Queue behavior, the producer is held back)
+      - "drop_oldest":  the oldest queued item is dropped to make room
+      - "drop_newest":  the new item is dropped
+
+    Dropped items are counted in dropped.
+    """
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+    def __init__(self, maxsize: int = 0, policy: str = DROP_OLDEST):
+        """
+        Args:
+          maxsize: Max number of queued items, 0 for no limit.
+          policy: BLOCK, DROP_OLDEST or DROP_NEWEST.
+        """
+        if policy not in (self.BLOCK, self.DROP_OLDEST, self.DROP_NEWEST):
+            raise ValueError(f"Unknown queue policy {policy!r}")
+        super().__init__(maxsize)
+        self.policy = policy
+        self.dropped = 0
+
+    def put(self, item, block: bool = True, timeout: float = None):
+        if self.policy == self.BLOCK:
+            return super().put(item, block, timeout)
+
+        with self.not_full:
+            if 0 < self.maxsize <= self._qsize():
+                self.dropped += 1
+                if self.policy == self.DROP_NEWEST:
+                    return
+                self._get()
+                self.unfinished_tasks -= 1
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+
+class LatestMailbox(queue.Queue):
+    """
+    Queue holding only the newest item per key (e.g. the latest telemetry frame of each source address).
+
+    A put() for a key that is already queued replaces the queued item in place, so sources are still
+    served in the order they first arrived. Replaced items are counted in dropped. When maxsize keys
+    are queued, the oldest key's item is dropped to make room for a new key.
+    """
+
+    def __init__(self, key, maxsize: int = 0):
+        """
+        Args:
+          key: Function returning the key of an item (e.g. its source address).
+          maxsize: Max number of keys queued at once, 0 for no limit.
+        """
+        self.key = key
+        super().__init__(maxsize)
+        self.dropped = 0
+
+    def put(self, item, block: bool = True, timeout: float = None):
+        """Never blocks. block and timeout are accepted for queue.Queue compatibility."""
+        key = self.key(item)
+        with self.not_full:
+            if key in self.queue:
+                self.queue[key] = item
+                self.dropped += 1
+                return
+            if 0 < self.maxsize <= self._qsize():
+                self._get()
+                self.unfinished_tasks -= 1
+                self.dropped += 1
+            self.queue[key] = item
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def peek(self, key):
+        """Queued item of a key without removing it, None if there is none."""
+        with self.mutex:
+            return self.queue.get(key)
+
+    # queue.Queue storage hooks
+    def _init(self, maxsize):
+        self.queue = OrderedDict()
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, item):
+        self.queue[self.key(item)] = item
+
+    def _get(self):
+        return self.queue.popitem(last=False)[1]
+
+
+class AwaitableQueue:
+    """
+    Awaitable reader of a BoundedQueue or LatestMailbox filled on the event loop, so asyncio versions of XBee
+    apply the same size limit and drop policy (the BLOCK policy cannot hold back an event loop callback).
+    """
+
+    def __init__(self, queue: BoundedQueue | LatestMailbox):
+        if getattr(queue, "policy", None) == BoundedQueue.BLOCK:
+            raise ValueError("The block policy is not supported on an event loop, use drop_oldest or drop_newest")
+        self.queue = queue
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def put(self, item):
+        """Queue an item (called on the event loop) and wake the waiting readers."""
+        self.queue.put(item)
+        self._ready.set()
+
+    def close(self):
+        """Wake every waiting reader: get() returns None once the queue is empty."""
+        self.closed = True
+        self._ready.set()
+
+    async def get(self):
+        """Wait for an item. Returns None once the queue is closed and empty."""
+        while True:
+            try:
+                return self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
@@ -0,0 +1,164 @@
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+# File header: magic, format version
+_MAGIC = b"XBEECAP"
+_VERSION = 1
+_FILE_HEADER = struct.Struct("<7sB")
+# Record header: monotonic timestamp (ns), direction, data length
+_RECORD_HEADER = struct.Struct("<QBI")
+
+
+class CaptureWriter:
+    """
+    Append-only binary log of the raw bytes read from and written to an XBee serial port.
+
+    File format (little endian):
+      header:  b"XBEECAP", version (1 byte)
+      records: monotonic timestamp in ns (8 bytes), direction (1 byte), length (4 bytes), data
+
+    Each time a capture is (re)opened a SESSION record (no data) is appended, timestamps are only
+    comparable within a session.
+    """
+    RX = 0
+    TX = 1
+    SESSION = 2
+
+    def __init__(self, path: str):
+        """
+        Args:
+          path: Capture file, appended to if it exists.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        # Counters
+        self.records = 0
+        self.bytes = 0
+
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(_FILE_HEADER.pack(_MAGIC, _VERSION))
+        self.write(self.SESSION, b"")
+
+    def write(self, direction: int, data):
+        """Append one record (thread-safe)."""
+        header = _RECORD_HEADER.pack(time.monotonic_ns(), direction, len(data))
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(header)
+            self._file.write(data)
+            self.records += 1
+            self.bytes += len(data)
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CaptureReader:
+    """
+    Reads a CaptureWriter file through a memory map, without copying the recorded data.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+          path: Capture file.
+        Raises:
+          ValueError if the file is not a capture file.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < _FILE_HEADER.size:
+                raise ValueError(f"{path} is not an XBee capture file")
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = _FILE_HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not an XBee capture file (version {_VERSION})")
+
+    def records(self):
+        """
+        Yields:
+          (timestamp in ns, direction, data as a memoryview into the file). A truncated last record is ignored.
+        """
+        view = memoryview(self._map)
+        try:
+            offset = _FILE_HEADER.size
+            end = len(view)
+            while offset + _RECORD_HEADER.size <= end:
+                timestamp, direction, length = _RECORD_HEADER.unpack_from(view, offset)
+                offset += _RECORD_HEADER.size
+                if offset + length > end:
+                    return
+                yield timestamp, direction, view[offset:offset + length]
+                offset += length
+        finally:
+            view.release()
+
+    def replay(self, feed, realtime: bool = False, speed: float = 1.0, direction: int = CaptureWriter.RX) -> int:
+        """Pass the recorded data of one direction to feed, as fast as possible or at the recorded pace.
+
+        Args:
+          feed: Called with each recorded chunk (memoryview, only valid during the call).
+          realtime: Wait between chunks as long as the recording did (divided by speed).
+          speed: Replay speed factor when realtime is set.
+          direction: CaptureWriter.RX or CaptureWriter.TX.
+
+        Returns:
+          Number of bytes replayed.
+        """
+        replayed = 0
+        for delay, data in self.paced(speed if realtime else math.inf, direction):
+            if delay > 0:
+                time.sleep(delay)
+            feed(data)
+            replayed += len(data)
+        return replayed
+
+    def paced(self, speed: float = 1.0, direction: int = CaptureWriter.RX):
+        """Recorded data of one direction with the time to wait before each chunk to keep the recorded pace.
+
+        Args:
+          speed: Replay speed factor (math.inf: no waiting).
+          direction: CaptureWriter.RX or CaptureWriter.TX.
+
+        Yields:
+          (seconds to wait from now, recorded chunk)
+        """
+        session_start = replay_start = None
+        for timestamp, record_direction, data in self.records():
+            if record_direction == CaptureWriter.SESSION:
+                session_start = replay_start = None
+                continue
+            if record_direction != direction:
+                continue
+            if math.isinf(speed):
+                yield 0.0, data
+                continue
+            if session_start is None:
+                session_start, replay_start = timestamp, time.monotonic()
+            yield replay_start + (timestamp - session_start) / 1e9 / speed - time.monotonic(), data
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
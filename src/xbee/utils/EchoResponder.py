@@ -0,0 +1,120 @@
+import os
+import selectors
+import threading
+
+from .EscapeCodec import EscapeCodec
+from .FrameParser import FrameParser
+
+
+class EchoResponder:
+    """
+    Stand-in XBee module for testing and benchmarking without hardware (Linux/macOS).
+
+    Opens a pseudo-terminal pair. XBee opens the slave side (port) like a real serial device, and the
+    responder answers on the master side:
+      - 0x00 Tx Request  -> 0x89 Tx Status (and optionally the payload looped back as a 0x90 Rx Packet)
+      - 0x08 AT Command  -> 0x88 AT Command Response with the value from at_values (a command with a value sets it)
+    """
+
+    def __init__(self, at_values: dict = None, status: int = 0x00, loopback: bool = False, escaped: bool = False):
+        """
+        Args:
+          at_values: AT command identifier -> response value (bytes). Unknown commands respond with b"\\x00".
+          status: Delivery status sent in every 0x89 frame.
+          loopback: Also send each transmitted payload back as a 0x90 Rx Packet from its destination address.
+          escaped: Use API escaped mode (AP=2) in both directions.
+        """
+        self.at_values = at_values or {}
+        self.status = status
+        self.loopback = loopback
+        self.escaped = escaped
+
+        self.port: str = None
+        self._master = None
+        self._slave = None
+        self._thread: threading.Thread = None
+        self._running = False
+
+        # Counters
+        self.frames_received = 0
+        self.frames_sent = 0
+
+    def start(self) -> str:
+        """Create the pseudo-terminal pair and start answering.
+
+        Returns:
+          Device name to pass as XBee port.
+        """
+        import pty
+        import tty
+
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="EchoResponder", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        """Stop answering and close the pseudo-terminal pair."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def _run(self):
+        parser = FrameParser(escaped=self.escaped)
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._master, selectors.EVENT_READ)
+            while self._running:
+                if not selector.select(0.05):
+                    continue
+                try:
+                    data = os.read(self._master, 65536)
+                except OSError:
+                    return
+
+                response = bytearray()
+                for frame_data in parser.feed(data):
+                    self.frames_received += 1
+                    response += self._respond(frame_data)
+                if response:
+                    os.write(self._master, response)
+
+    def _respond(self, frame_data: bytes) -> bytes:
+        frame_type = frame_data[0]
+        response = b""
+        if frame_type == 0x00:
+            frame_id = frame_data[1]
+            if frame_id:
+                response += self._frame(bytes((0x89, frame_id, self.status)))
+            if self.loopback:
+                # 0x90: frame type, 64-bit source, 16-bit source, options, data
+                response += self._frame(b"\x90" + bytes(frame_data[2:10]) + b"\xff\xfe\x01" + bytes(frame_data[11:]))
+        elif frame_type == 0x08:
+            frame_id = frame_data[1]
+            at_command = bytes(frame_data[2:4])
+            if len(frame_data) > 4:
+                # Set the parameter, the response has no value
+                self.at_values[at_command.decode("utf-8", "replace")] = bytes(frame_data[4:])
+                value = b""
+            else:
+                value = self.at_values.get(at_command.decode("utf-8", "replace"), b"\x00")
+            response += self._frame(bytes((0x88, frame_id)) + at_command + b"\x00" + value)
+        return response
+
+    def _frame(self, frame_data: bytes) -> bytes:
+        self.frames_sent += 1
+        frame = bytearray((0x7E, len(frame_data) >> 8, len(frame_data) & 0xFF))
+        frame += frame_data
+        frame.append(0xFF - (sum(frame_data) & 0xFF))
+        if self.escaped:
+            return b"\x7e" + EscapeCodec.escape(frame[1:])
+        return bytes(frame)
@@ -0,0 +1,38 @@
+class EscapeCodec:
+    """
+    Byte stuffing used by API escaped mode (AP=2).
+
+    0x7E, 0x7D, 0x11 and 0x13 are sent as 0x7D followed by the byte XOR 0x20. Everything after the start
+    delimiter is escaped, so 0x7E only ever marks the start of a frame.
+
+    Both directions work on whole buffers with bytes.replace (one C-level pass per special byte)
+    instead of looping over bytes in Python.
+    """
+    ESCAPE = 0x7D
+
+    @staticmethod
+    def escape(data) -> bytes:
+        """Escape a buffer (everything after the start delimiter)."""
+        data = bytes(data)
+        if not any(b in data for b in (b"\x7e", b"\x7d", b"\x11", b"\x13")):
+            return data
+        # 0x7D first, so the escape bytes added by the other replacements are not escaped again
+        return (data.replace(b"\x7d", b"\x7d\x5d")
+                    .replace(b"\x7e", b"\x7d\x5e")
+                    .replace(b"\x11", b"\x7d\x31")
+                    .replace(b"\x13", b"\x7d\x33"))
+
+    @staticmethod
+    def unescape(data) -> bytes:
+        """Unescape a buffer. A trailing 0x7D (incomplete escape) is dropped, callers keep it for the next read."""
+        data = bytes(data)
+        if b"\x7d" not in data:
+            return data
+        if data[-1] == EscapeCodec.ESCAPE:
+            data = data[:-1]
+        # Every 0x7D is an escape and escaped bytes are never 0x7D, so each pair can be replaced independently.
+        # 0x7D 0x5D last, so the 0x7D it produces cannot pair with the following byte.
+        return (data.replace(b"\x7d\x5e", b"\x7e")
+                    .replace(b"\x7d\x31", b"\x11")
+                    .replace(b"\x7d\x33", b"\x13")
+                    .replace(b"\x7d\x5d", b"\x7d"))
@@ -0,0 +1,127 @@
+import time
+
+
+class Fragmenter:
+    """
+    Splits payloads larger than one RF packet into numbered fragments and reassembles them on the receive side.
+
+    Fragment format:
+        marker      (1 byte) = 0xFF (never appears in UTF-8 text)
+        message_id  (1 byte)
+        index       (1 byte)
+        count       (1 byte)
+        data        (up to fragment_size bytes)
+
+    Both ends must have fragmentation enabled. Payloads that do not start with the marker are passed through.
+    """
+    MARKER = 0xFF
+    HEADER_SIZE = 4
+
+    def __init__(self, max_payload: int = 99, timeout: float = 5.0, max_messages_per_source: int = 4, max_message_bytes: int = 0xFF * 95):
+        """
+        Args:
+          max_payload: Max RF payload of one frame (including the fragment header).
+          timeout: Seconds before an incomplete message is dropped.
+          max_messages_per_source: Max incomplete messages kept per source address. The oldest is dropped first.
+          max_message_bytes: Max size of a reassembled message.
+        """
+        self.fragment_size = max_payload - self.HEADER_SIZE
+        self.timeout = timeout
+        self.max_messages_per_source = max_messages_per_source
+        self.max_message_bytes = max_message_bytes
+
+        self._message_id = 0
+        self._buffers: dict[bytes, dict[int, dict]] = {}    # source -> message_id -> reassembly state
+        self._next_expiry = 0.0
+
+        # Counters
+        self.messages = 0
+        self.dropped = 0
+
+    def fragments(self, data: bytes):
+        """Split a payload into fragments.
+
+        Args:
+          data: Payload to send.
+
+        Yields:
+          (header, chunk) for each fragment. chunk is a memoryview into data, so the payload is never copied.
+        """
+        view = memoryview(data)
+        count = max(1, -(-len(view) // self.fragment_size))
+        if count > 0xFF or len(view) > self.max_message_bytes:
+            raise ValueError(f"Error: Data should not exceed {min(0xFF * self.fragment_size, self.max_message_bytes)} bytes. Current size: {len(view)} bytes")
+
+        self._message_id = (self._message_id + 1) & 0xFF
+        for index in range(count):
+            start = index * self.fragment_size
+            header = bytes((self.MARKER, self._message_id, index, count))
+            yield header, view[start:start + self.fragment_size]
+
+    def is_fragment(self, payload) -> bool:
+        return len(payload) >= self.HEADER_SIZE and payload[0] == self.MARKER
+
+    def add(self, source: bytes, payload: bytes) -> bytes | None:
+        """Store one received fragment.
+
+        Args:
+          source: Source address of the frame.
+          payload: Received RF payload (starting with the fragment header).
+
+        Returns:
+          The complete message once every fragment has arrived, None otherwise.
+        """
+        now = time.monotonic()
+        if now >= self._next_expiry:
+            self._expire(now)
+
+        message_id, index, count = payload[1], payload[2], payload[3]
+        if index >= count:
+            self.dropped += 1
+            return None
+
+        data = bytes(payload[self.HEADER_SIZE:])
+        if count == 1:
+            self.messages += 1
+            return data
+
+        messages = self._buffers.setdefault(source, {})
+        state = messages.get(message_id)
+        if state is None or state["count"] != count:
+            # Bound the number of incomplete messages kept for this source
+            if len(messages) >= self.max_messages_per_source:
+                oldest = min(messages, key=lambda key: messages[key]["deadline"])
+                del messages[oldest]
+                self.dropped += 1
+            state = {"count": count, "parts": [None] * count, "received": 0, "size": 0, "deadline": now + self.timeout}
+            messages[message_id] = state
+
+        if state["parts"][index] is None:
+            state["parts"][index] = data
+            state["received"] += 1
+            state["size"] += len(data)
+
+        if state["size"] > self.max_message_bytes:
+            del messages[message_id]
+            self.dropped += 1
+            return None
+
+        if state["received"] < count:
+            return None
+
+        del messages[message_id]
+        if not messages:
+            del self._buffers[source]
+        self.messages += 1
+        return b"".join(state["parts"])
+
+    def _expire(self, now: float):
+        """Drop incomplete messages whose timeout has passed."""
+        self._next_expiry = now + min(self.timeout, 1.0)
+        for source in list(self._buffers):
+            messages = self._buffers[source]
+            for message_id in [key for key, state in messages.items() if state["deadline"] <= now]:
+                del messages[message_id]
+                self.dropped += 1
+            if not messages:
+                del self._buffers[source]
@@ -0,0 +1,97 @@
+import itertools
+import threading
+
+
+class FrameDispatcher:
+    """
+    Delivers received frames to subscriber callbacks.
+
+    Subscriptions are indexed by frame type, so publishing a frame only looks at the callbacks
+    interested in that type. Callbacks run on the publishing (reader) thread unless the
+    subscription was given an executor (e.g. a concurrent.futures.ThreadPoolExecutor).
+    """
+
+    def __init__(self, on_error=None):
+        """
+        Args:
+          on_error: Called with (callback, exception) when a callback raises.
+        """
+        self.on_error = on_error
+
+        self._lock = threading.Lock()
+        self._handles = itertools.count(1)
+        self._subscriptions: dict[int, tuple] = {}  # handle -> (frame_types, ...)
+        # frame_type (None = every type) -> tuple of (handle, callback, source, executor). Replaced, never mutated.
+        self._index: dict[int, tuple] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._index)
+
+    def subscribe(self, callback, frame_types=None, source_address=None, executor=None) -> int:
+        """Register a callback for received frames.
+
+        Args:
+          callback: Called with each matching frame.
+          frame_types: Frame type or iterable of frame types to receive (e.g. 0x90). Every type if None.
+          source_address: Only frames from this source address (hex str or bytes). Every source if None.
+          executor: Executor used to run the callback. Runs on the reader thread if None.
+
+        Returns:
+          Handle to pass to unsubscribe().
+        """
+        if isinstance(frame_types, int):
+            frame_types = (frame_types,)
+        keys = tuple(frame_types) if frame_types is not None else (None,)
+        if isinstance(source_address, str):
+            source_address = bytes.fromhex(source_address)
+
+        with self._lock:
+            handle = next(self._handles)
+            entry = (handle, callback, source_address, executor)
+            self._subscriptions[handle] = (keys, entry)
+            for key in keys:
+                self._index[key] = self._index.get(key, ()) + (entry,)
+        return handle
+
+    def unsubscribe(self, handle: int) -> bool:
+        """Remove a subscription.
+
+        Returns:
+          True if the subscription existed.
+        """
+        with self._lock:
+            subscription = self._subscriptions.pop(handle, None)
+            if subscription is None:
+                return False
+            keys, entry = subscription
+            for key in keys:
+                remaining = tuple(e for e in self._index.get(key, ()) if e is not entry)
+                if remaining:
+                    self._index[key] = remaining
+                else:
+                    self._index.pop(key, None)
+        return True
+
+    def publish(self, frame, source: bytes = None):
+        """Deliver a frame to every matching subscription.
+
+        Args:
+          frame: Received frame.
+          source: Source address of the frame (bytes), None if the frame type has no source.
+        """
+        index = self._index
+        for key in (frame.frame_type, None):
+            for _, callback, source_address, executor in index.get(key, ()):
+                if source_address is not None and (source is None or source_address != source):
+                    continue
+                if executor is not None:
+                    executor.submit(self._call, callback, frame)
+                else:
+                    self._call(callback, frame)
+
+    def _call(self, callback, frame):
+        try:
+            callback(frame)
+        except Exception as e:
+            if self.on_error is not None:
+                self.on_error(callback, e)
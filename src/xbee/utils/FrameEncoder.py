@@ -0,0 +1,103 @@
+from functools import lru_cache
+
+from .EscapeCodec import EscapeCodec
+
+
+# Offsets in a 0x00 (Tx Request: 64-bit address) frame
+_LENGTH = 1
+_FRAME_ID = 4
+_HEADER_SIZE = 14   # Start delimiter, length (2), frame type, frame ID, address (8), options
+_LENGTH_OVERHEAD = 11   # Frame type, frame ID, address (8), options
+
+
+@lru_cache(maxsize=256)
+def _header_template(address: str) -> tuple[bytes, int]:
+    """Parse a destination address once and build its frame header.
+
+    Args:
+      address: 16 hex character 64-bit destination address.
+
+    Returns:
+      (header with length and frame ID left as 0, sum of the header bytes covered by the checksum)
+    """
+    address_bytes = bytes.fromhex(address)
+    if len(address_bytes) != 8:
+        raise ValueError(f"address must be 16 hex chars (got {address!r})")
+
+    header = bytearray(_HEADER_SIZE)
+    header[0] = 0x7E            # Start delimiter
+    header[3] = 0x00            # Frame type (Tx Request: 64-bit address)
+    header[5:13] = address_bytes
+    header[13] = 0x00           # Options
+    return bytes(header), sum(header[3:])
+
+
+class FrameEncoder:
+    """
+    Encodes 0x00 (Tx Request: 64-bit address) frames.
+
+    The header of each destination is built once and cached (LRU), so encoding a frame
+    only fills in the length, frame ID, payload and checksum.
+    """
+
+    def __init__(self, escaped: bool = False):
+        """
+        Args:
+          escaped: Encode API escaped mode (AP=2) frames.
+        """
+        self.escaped = escaped
+
+    def encode(self, data: bytes, address: str, frame_id: int, prefix: bytes = b"") -> bytearray:
+        """Encode one frame.
+
+        Args:
+          data: Payload bytes.
+          address: 16 hex character destination address.
+          frame_id: Frame ID (0 disables the transmit status).
+          prefix: Bytes sent before data in the same payload (e.g. a fragment header).
+
+        Returns:
+          Encoded frame.
+        """
+        frame = bytearray()
+        self._append(frame, data, address, frame_id, prefix)
+        return frame
+
+    def encode_many(self, messages) -> bytearray:
+        """Encode a batch of frames into one contiguous buffer.
+
+        Args:
+          messages: Iterable of (data, address, frame_id).
+
+        Returns:
+          Encoded frames, back to back.
+        """
+        buffer = bytearray()
+        for data, address, frame_id in messages:
+            self._append(buffer, data, address, frame_id)
+        return buffer
+
+    def escape_frame(self, frame: bytearray) -> bytearray:
+        """Escape an encoded frame in escaped mode (returned unchanged otherwise)."""
+        if not self.escaped:
+            return frame
+        escaped = bytearray(frame[:1])
+        escaped += EscapeCodec.escape(memoryview(frame)[1:])
+        return escaped
+
+    def _append(self, buffer: bytearray, data: bytes, address: str, frame_id: int, prefix: bytes = b""):
+        header, header_sum = _header_template(address)
+        start = len(buffer)
+        length = len(prefix) + len(data) + _LENGTH_OVERHEAD
+
+        buffer += header
+        buffer[start + _LENGTH] = length >> 8
+        buffer[start + _LENGTH + 1] = length & 0xFF
+        buffer[start + _FRAME_ID] = frame_id
+        buffer += prefix
+        buffer += data
+        # FF - sum of bytes between length & checksum field
+        buffer.append(0xFF - ((header_sum + frame_id + sum(prefix) + sum(data)) & 0xFF))
+
+        if self.escaped:
+            buffer[start + 1:] = EscapeCodec.escape(buffer[start + 1:])
@@ -0,0 +1,182 @@
+from .EscapeCodec import EscapeCodec
+
+
+class FrameParser:
+    """
+    Incremental XBee API frame parser.
+
+    Bytes are fed in whatever chunks the serial port hands back. Partial frames
+    are kept between calls and every complete frame found is returned at once.
+
+    Frame layout:
+        start delimiter (1 byte) = 0x7E
+        length          (2 bytes)
+        frame data      (length bytes)
+        checksum        (1 byte)
+
+    In API escaped mode (AP=2) everything after the start delimiter is escaped (see EscapeCodec).
+    """
+    START_DELIMITER = 0x7E
+
+    def __init__(self, max_frame_length: int = 512, escaped: bool = False):
+        """
+        Args:
+          escaped: Parse API escaped mode (AP=2) frames.
+          max_frame_length: Largest accepted length field. A 0x7E followed by a larger length is treated as noise,
+            so a corrupted delimiter does not stall the parser waiting for bytes that will never arrive.
+        """
+        self.max_frame_length = max_frame_length
+        self.escaped = escaped
+        self._buffer = bytearray()
+        self._switch_escaped = None     # Mode requested by set_escaped(), applied by the next feed()
+
+        # Counters (never reset by the parser)
+        self.frames = 0
+        self.checksum_errors = 0
+        self.skipped_bytes = 0
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Append received bytes and extract all complete frames.
+
+        Args:
+          data: Bytes read from the serial port.
+
+        Returns:
+          List of frame data (bytes between length and checksum fields) for every valid frame.
+        """
+        switch = self._switch_escaped
+        if switch is not None:
+            self._switch_escaped = None
+            self.escaped = switch
+            self.reset()    # Bytes buffered in the old mode cannot be parsed in the new one
+        if data:
+            self._buffer += data
+        return self._extract()
+
+    def set_escaped(self, escaped: bool):
+        """Switch API mode from any thread. Takes effect at the next feed(), which drops the partial frame."""
+        self._switch_escaped = escaped
+
+    def pending(self) -> int:
+        """Number of buffered bytes that do not yet form a complete frame."""
+        return len(self._buffer)
+
+    def reset(self):
+        """Discard any partially received frame."""
+        del self._buffer[:]
+
+    def _extract(self) -> list[bytes]:
+        if self.escaped:
+            return self._extract_escaped()
+
+        frames = []
+        buf = self._buffer
+        pos = 0
+        end = len(buf)
+
+        while pos < end:
+            # 1) Resync on the next start delimiter
+            if buf[pos] != self.START_DELIMITER:
+                start = buf.find(self.START_DELIMITER, pos)
+                if start < 0:
+                    self.skipped_bytes += end - pos
+                    pos = end
+                    break
+                self.skipped_bytes += start - pos
+                pos = start
+
+            # 2) Wait for the length field
+            if end - pos < 3:
+                break
+            length = (buf[pos + 1] << 8) | buf[pos + 2]
+            if length == 0 or length > self.max_frame_length:
+                # Cannot be a real frame, the 0x7E was part of something else
+                self.skipped_bytes += 1
+                pos += 1
+                continue
+
+            # 3) Wait for frame data and checksum
+            frame_end = pos + 3 + length
+            if frame_end >= end:
+                break
+
+            # 4) Validate checksum (sum of frame data + checksum == 0xFF)
+            frame_data = bytes(buf[pos + 3:frame_end])
+            if (sum(frame_data) + buf[frame_end]) & 0xFF != 0xFF:
+                # Skip this delimiter and resync on the next 0x7E
+                self.checksum_errors += 1
+                self.skipped_bytes += 1
+                pos += 1
+                continue
+
+            frames.append(frame_data)
+            self.frames += 1
+            pos = frame_end + 1
+
+        # Drop consumed bytes, keep the partial frame for the next call
+        if pos:
+            del buf[:pos]
+        return frames
+
+    def _extract_escaped(self) -> list[bytes]:
+        """
+        Escaped mode: 0x7E never appears inside a frame, so each frame is the data between one
+        start delimiter and the next. Each candidate is unescaped as a whole.
+        """
+        frames = []
+        buf = self._buffer
+        pos = 0
+        end = len(buf)
+
+        while pos < end:
+            # 1) Resync on the next start delimiter
+            start = buf.find(self.START_DELIMITER, pos)
+            if start < 0:
+                self.skipped_bytes += end - pos
+                pos = end
+                break
+            self.skipped_bytes += start - pos
+            pos = start
+
+            # 2) Unescape up to the next start delimiter (or everything received so far)
+            next_start = buf.find(self.START_DELIMITER, pos + 1)
+            segment_end = end if next_start < 0 else next_start
+            data = EscapeCodec.unescape(buf[pos + 1:segment_end])
+
+            if len(data) < 2:
+                if next_start < 0:
+                    break   # Wait for the length field
+                self.skipped_bytes += segment_end - pos
+                pos = segment_end
+                continue
+
+            length = (data[0] << 8) | data[1]
+            if length == 0 or length > self.max_frame_length:
+                self.skipped_bytes += segment_end - pos
+                pos = segment_end
+                continue
+
+            if len(data) < length + 3:
+                if next_start < 0:
+                    break   # Wait for the rest of the frame
+                # Truncated frame, the next frame already started
+                self.checksum_errors += 1
+                self.skipped_bytes += segment_end - pos
+                pos = segment_end
+                continue
+
+            # 3) Validate checksum (sum of frame data + checksum == 0xFF)
+            frame_data = data[2:2 + length]
+            if (sum(frame_data) + data[2 + length]) & 0xFF != 0xFF:
+                self.checksum_errors += 1
+                self.skipped_bytes += segment_end - pos
+            else:
+                frames.append(frame_data)
+                self.frames += 1
+            # Anything between the checksum and the next delimiter is noise (not counted)
+            pos = segment_end
+
+        # Drop consumed bytes, keep the partial frame for the next call
+        if pos:
+            del buf[:pos]
+        return frames
@@ -0,0 +1,170 @@
+import heapq
+import math
+import random
+import threading
+import time
+
+# 802.15.4 (2.4 GHz O-QPSK) timing
+_SYMBOL = 16e-6                 # Seconds per symbol
+_BACKOFF_PERIOD = 20 * _SYMBOL  # aUnitBackoffPeriod
+_TURNAROUND = 12 * _SYMBOL      # aTurnaroundTime (RX <-> TX)
+_ACK_WAIT = 54 * _SYMBOL        # macAckWaitDuration
+_PHY_OVERHEAD = 6               # Preamble (4), SFD, PHY header
+_MAC_OVERHEAD = 23              # Frame control (2), sequence, PAN ID (2), 64-bit destination and source (16), FCS (2)
+_ACK_BYTES = 11                 # PHY overhead + frame control, sequence, FCS
+_BACKOFF_EXPONENTS = (3, 4, 5, 5, 5)    # macMinBE 3, macMaxBE 5, macMaxCSMABackoffs 4
+
+
+class LinkModel:
+    """
+    RF link model for emulated radios sharing one process (see XBeeEmulator link_model).
+
+    Every transmission occupies the PAN's channel for its 802.15.4 airtime (frame, turnaround and ACK).
+    Before sending, a radio performs CSMA-CA: random backoffs, giving up with a CCA failure (0x02) if the
+    channel stays busy. The RSSI at the receiver follows a log-distance path loss model with random
+    shadowing, and the chance of receiving a frame falls off around the receiver sensitivity. Unicasts are
+    retried by the MAC and fail with no ACK (0x01) when every attempt is lost.
+    """
+    NO_ACK = 0x01
+    CCA_FAILURE = 0x02
+
+    def __init__(self, data_rate: int = 250_000, tx_power: float = 0.0, path_loss_exponent: float = 2.7,
+                 reference_loss: float = 40.0, shadowing: float = 4.0, sensitivity: float = -92.0,
+                 fade_width: float = 2.0, retries: int = 3, default_distance: float = 10.0, seed: int = None):
+        """
+        Args:
+          data_rate: RF data rate in bits per second.
+          tx_power: Transmit power in dBm.
+          path_loss_exponent: Path loss exponent (2 in free space, 2.7 - 3.5 outdoors with obstacles).
+          reference_loss: Path loss at 1 m in dB.
+          shadowing: Standard deviation of the random shadowing in dB.
+          sensitivity: RSSI (dBm) at which half of the frames are received.
+          fade_width: dB over which the reception chance goes from about 27% to 73% around the sensitivity.
+          retries: MAC retries of a unicast frame (XBee RR).
+          default_distance: Distance in meters between radios without a position.
+          seed: Random seed (for reproducible runs).
+        """
+        self.data_rate = data_rate
+        self.tx_power = tx_power
+        self.path_loss_exponent = path_loss_exponent
+        self.reference_loss = reference_loss
+        self.shadowing = shadowing
+        self.sensitivity = sensitivity
+        self.fade_width = fade_width
+        self.retries = retries
+        self.default_distance = default_distance
+        self.random = random.Random(seed)
+
+        self.positions: dict = {}   # MAC address -> (x, y, z) in meters
+        self._lock = threading.Lock()
+        self._channel_busy_until: dict = {}     # PAN ID -> time.monotonic() the channel is free
+        self._radio_free_at: dict = {}          # MAC address -> time.monotonic() the radio finished its queued frames
+
+        # Delayed deliveries
+        self._events: list = []     # Heap of (time, sequence, callback)
+        self._sequence = 0
+        self._events_ready = threading.Condition(self._lock)
+        self._thread: threading.Thread = None
+
+        # Counters
+        self.frames = 0
+        self.attempts = 0
+        self.no_ack = 0
+        self.cca_failures = 0
+        self.airtime_total = 0.0
+
+    def place(self, mac_address: str, x: float, y: float, z: float = 0.0):
+        """Set the position of a radio in meters."""
+        self.positions[mac_address.upper()] = (x, y, z)
+
+    def distance(self, source: str, destination: str) -> float:
+        a = self.positions.get(source.upper())
+        b = self.positions.get(destination.upper())
+        if a is None or b is None:
+            return self.default_distance
+        return max(math.dist(a, b), 0.1)
+
+    def rssi(self, source: str, destination: str) -> float:
+        """RSSI in dBm of one frame from source received at destination."""
+        path_loss = self.reference_loss + 10 * self.path_loss_exponent * math.log10(self.distance(source, destination))
+        return self.tx_power - path_loss + self.random.gauss(0.0, self.shadowing)
+
+    def received(self, rssi: float) -> bool:
+        """Random reception outcome of a frame with this RSSI."""
+        x = (rssi - self.sensitivity) / self.fade_width
+        return self.random.random() < 1.0 / (1.0 + math.exp(-x))
+
+    def airtime(self, payload_length: int, ack: bool = False) -> float:
+        """Seconds the channel is busy for one attempt of a frame (with the ACK exchange for unicasts)."""
+        seconds = (_PHY_OVERHEAD + _MAC_OVERHEAD + payload_length) * 8 / self.data_rate
+        if ack:
+            seconds += _TURNAROUND + _ACK_BYTES * 8 / self.data_rate
+        return seconds
+
+    def transmit(self, pan_id, source: str, destination: str, payload_length: int, broadcast: bool):
+        """
+        Simulate sending one frame.
+
+        Returns:
+          (0x89 status, time.monotonic() when the transmission ends). Broadcasts are not acknowledged and
+          always succeed (each receiver decides on reception with received()).
+        """
+        source = source.upper()
+        with self._lock:
+            now = time.monotonic()
+            pan_id = str(pan_id)
+            # The radio sends its own frames one after the other
+            t = max(now, self._radio_free_at.get(source, now))
+            busy_until = self._channel_busy_until.get(pan_id, 0.0)
+            self.frames += 1
+
+            status = 0x00
+            attempts = 1 if broadcast else self.retries + 1
+            for attempt in range(attempts):
+                # CSMA-CA
+                for exponent in _BACKOFF_EXPONENTS:
+                    t += self.random.randrange(2 ** exponent) * _BACKOFF_PERIOD
+                    if t >= busy_until:
+                        break
+                else:
+                    self.cca_failures += 1
+                    status = self.CCA_FAILURE
+                    break
+
+                self.attempts += 1
+                airtime = self.airtime(payload_length, ack=not broadcast)
+                self.airtime_total += airtime
+                t += airtime
+                busy_until = t
+                if broadcast or self.received(self.rssi(source, destination)):
+                    status = 0x00
+                    break
+                t += _ACK_WAIT
+                status = self.NO_ACK
+            else:
+                self.no_ack += 1
+
+            self._channel_busy_until[pan_id] = max(busy_until, self._channel_busy_until.get(pan_id, 0.0))
+            self._radio_free_at[source] = t
+            return status, t
+
+    def schedule(self, at: float, callback):
+        """Call callback (on the model's thread) at time.monotonic() at."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="LinkModel", daemon=True)
+                self._thread.start()
+            self._sequence += 1
+            heapq.heappush(self._events, (at, self._sequence, callback))
+            self._events_ready.notify()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._events or self._events[0][0] > time.monotonic():
+                    self._events_ready.wait(self._events[0][0] - time.monotonic() if self._events else None)
+                _, _, callback = heapq.heappop(self._events)
+            try:
+                callback()
+            except Exception:
+                pass    # Callbacks report their own errors, keep delivering the others
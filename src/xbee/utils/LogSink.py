@@ -0,0 +1,74 @@
+import queue
+import threading
+
+
+class LogSink:
+    """
+    Writes log records to a Logger from a background thread.
+
+    Records are (write, message, args) tuples. The message is only formatted (message % args) on the
+    sink thread, so the caller never pays for formatting or disk I/O. The queue is bounded: when it is
+    full the record is dropped and counted instead of blocking the caller.
+    """
+    _STOP = object()    # Sentinel record ending the sink thread
+
+    def __init__(self, maxsize: int = 10000):
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self.dropped = 0
+        self.closed = False
+
+        self._thread = threading.Thread(target=self._run, name="XBeeLogSink", daemon=True)
+        self._thread.start()
+
+    def put(self, write, message: str, args: tuple = ()):
+        """Queue a record.
+
+        Args:
+          write: Callable receiving the formatted message (e.g. a bound Logger.write).
+          message: %-style format string.
+          args: Format arguments.
+        """
+        if self.closed:
+            self.dropped += 1
+            return
+        try:
+            self._queue.put_nowait((write, message, args))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Block until every queued record has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write the queued records and stop the sink thread. Records put afterwards are dropped."""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(self._STOP)    # Waits for room, the sentinel must not be dropped
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            if record is self._STOP:
+                self._queue.task_done()
+                return
+            write, message, args = record
+            try:
+                write(message % args if args else message)
+            except Exception:
+                pass
+            finally:
+                self._queue.task_done()
+
+
+class HexDump:
+    """Formats bytes as "7e 00 04 ..." only when the log record is actually written."""
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return bytes(self.data).hex(" ")
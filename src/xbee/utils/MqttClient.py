@@ -8,6 +8,8 @@ class MqttClient:
 
         self.connected = False
         self._subscriptions: list[tuple[str, int]] = []
+        self._rx_topics: dict[str, str] = {}    # Destination address -> topic
+        self._broadcast_topic = f"xbee/pan/{self.pan_id}/broadcast"
 
         self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
         self.client.on_connect = self._on_connect
@@ -21,10 +23,13 @@ class MqttClient:
             self.default_port = 1883
 
     def _topic_rx(self, dest64: str) -> str:
-        return f"xbee/pan/{self.pan_id}/rx/{dest64.upper()}"
+        topic = self._rx_topics.get(dest64)
+        if topic is None:
+            topic = self._rx_topics[dest64] = f"xbee/pan/{self.pan_id}/rx/{dest64.upper()}"
+        return topic
 
     def _topic_broadcast(self) -> str:
-        return f"xbee/pan/{self.pan_id}/broadcast"
+        return self._broadcast_topic
 
     def set_username_pw(self, username: str | None = None, password: str | None = None):
         self.client.username_pw_set(username, password)
@@ -47,7 +52,17 @@ class MqttClient:
         return self.client.publish(self._topic_rx(dest64), payload, qos=qos, retain=retain)
 
     def publish_broadcast(self, payload: bytes, *, qos: int = 0, retain: bool = False):
-        return self.client.publish(self._topic_broadcast(), payload, qos=qos, retain=retain)
+        return self.client.publish(self._broadcast_topic, payload, qos=qos, retain=retain)
+
+    def publish_many(self, messages, *, qos: int = 0) -> list:
+        """Publish a batch of messages.
+
+        Args:
+          messages: Iterable of (destination address, payload). A destination of None is a broadcast.
+        """
+        publish = self.client.publish
+        return [publish(self._broadcast_topic if dest64 is None else self._topic_rx(dest64), payload, qos=qos)
+                for dest64, payload in messages]
 
     def _subscribe(self, topic: str, qos: int = 0):
         self._subscriptions.append((topic, qos))
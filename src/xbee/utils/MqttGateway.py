@@ -0,0 +1,146 @@
+import threading
+
+from .MqttClient import MqttClient
+
+
+class MqttGateway:
+    """
+    One MQTT connection shared by many XBeeEmulator endpoints of the same PAN.
+
+    The gateway subscribes once with a wildcard (xbee/pan/<id>/rx/+) and to the PAN's broadcast topic,
+    and hands each message to the endpoint registered under the destination MAC address (broadcasts
+    to every endpoint). Endpoints publish through the same connection.
+
+    Example:
+        gateway = MqttGateway(3332, host, 8883, username="gateway", password="...")
+        vehicles = [XBeeEmulator(mac_address=mac, transport=gateway) for mac in macs]
+    """
+
+    def __init__(self, pan_id, host: str, port: int | str | None = None, keepalive: int | str = 60,
+                 use_tls: bool = True, username: str = None, password: str = None, qos: int = 0):
+        """
+        Args:
+          pan_id: PAN ID of every endpoint.
+          host: MQTT broker address.
+          port: MQTT broker port (8883 with TLS, 1883 without if None).
+          keepalive: MQTT keepalive in seconds.
+          use_tls: Connect with TLS.
+          username: Broker username (also used as password if password is None).
+          qos: QoS of the subscriptions.
+        """
+        self.pan_id = str(pan_id)
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+
+        self.mqtt = MqttClient(self.pan_id, "", on_rf=self._on_message, use_tls=use_tls)
+        if username is not None:
+            self.mqtt.set_username_pw(username, password if password is not None else username)
+
+        self._rx_prefix = f"xbee/pan/{self.pan_id}/rx/"
+        self._broadcast_topic = f"xbee/pan/{self.pan_id}/broadcast"
+        self.mqtt._subscribe(self._rx_prefix + "+", qos=qos)
+        self.mqtt._subscribe(self._broadcast_topic, qos=qos)
+
+        self._endpoints: dict = {}  # MAC address -> GatewayClient (replaced on change, read without the lock)
+        self._lock = threading.Lock()
+        self._connected = False
+
+        # Counters
+        self.received = 0
+        self.unrouted = 0   # Unicasts to a MAC address without an endpoint (e.g. served by another gateway)
+
+    def client(self, pan_id, mac_address: str, on_rf=None) -> "GatewayClient":
+        """Create an endpoint (MqttClient interface) on this gateway."""
+        if str(pan_id) != self.pan_id:
+            raise ValueError(f"Gateway serves PAN {self.pan_id}, not {pan_id}")
+        return GatewayClient(self, mac_address, on_rf)
+
+    def connect(self):
+        """Connect to the broker (done by the first endpoint that connects)."""
+        with self._lock:
+            if self._connected:
+                return
+            self.mqtt.connect(self.host, self.port, self.keepalive)
+            self._connected = True
+
+    def disconnect(self):
+        """Disconnect from the broker. Endpoints stop receiving."""
+        with self._lock:
+            if not self._connected:
+                return
+            self.mqtt.disconnect()
+            self._connected = False
+
+    def endpoints(self) -> list[str]:
+        """MAC addresses of the attached endpoints."""
+        return list(self._endpoints)
+
+    def _attach(self, endpoint: "GatewayClient"):
+        with self._lock:
+            endpoints = dict(self._endpoints)
+            endpoints[endpoint.mac_address] = endpoint
+            self._endpoints = endpoints
+
+    def _detach(self, endpoint: "GatewayClient"):
+        with self._lock:
+            endpoints = dict(self._endpoints)
+            if endpoints.get(endpoint.mac_address) is endpoint:
+                del endpoints[endpoint.mac_address]
+            self._endpoints = endpoints
+
+    def _on_message(self, topic: str, payload: bytes):
+        """Called on the MQTT network thread."""
+        self.received += 1
+        if topic == self._broadcast_topic:
+            for endpoint in self._endpoints.values():
+                if endpoint.subscribed:
+                    endpoint.on_rf(topic, payload)
+            return
+
+        endpoint = self._endpoints.get(topic[len(self._rx_prefix):])
+        if endpoint is None or not endpoint.subscribed:
+            self.unrouted += 1
+            return
+        endpoint.on_rf(topic, payload)
+
+
+class GatewayClient:
+    """
+    MqttGateway endpoint with the MqttClient interface used by XBeeEmulator.
+    """
+
+    def __init__(self, gateway: MqttGateway, mac_address: str, on_rf=None):
+        self.gateway = gateway
+        self.pan_id = gateway.pan_id
+        self.mac_address = (mac_address or "").upper()
+        self.on_rf = on_rf
+
+        self.connected = False
+        self.subscribed = False
+
+    def set_username_pw(self, username: str | None = None, password: str | None = None):
+        """Ignored, the gateway's connection is authenticated once."""
+
+    def connect(self, host: str = None, port: int | str | None = None, keepalive: int | str = 60):
+        """Attach to the gateway (host, port and keepalive are ignored)."""
+        self.gateway.connect()
+        self.gateway._attach(self)
+        self.connected = True
+
+    def disconnect(self):
+        self.gateway._detach(self)
+        self.connected = False
+        self.subscribed = False
+
+    def subscribe_rf(self, qos: int = 0):
+        self.subscribed = True
+
+    def publish_unicast(self, dest64: str, payload: bytes, *, qos: int = 0, retain: bool = False):
+        return self.gateway.mqtt.publish_unicast(dest64, payload, qos=qos, retain=retain)
+
+    def publish_broadcast(self, payload: bytes, *, qos: int = 0, retain: bool = False):
+        return self.gateway.mqtt.publish_broadcast(payload, qos=qos, retain=retain)
+
+    def publish_many(self, messages, *, qos: int = 0) -> list:
+        return self.gateway.mqtt.publish_many(messages, qos=qos)
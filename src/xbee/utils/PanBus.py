@@ -0,0 +1,121 @@
+import threading
+
+
+class PanBus:
+    """
+    In-process replacement for the MQTT broker used by XBeeEmulator.
+
+    Emulated radios attached to the same bus exchange envelopes by direct function calls:
+    unicast goes to the radio registered under the destination MAC address, broadcast is
+    fanned out to every other radio on the PAN. Delivery runs on the sender's thread, so
+    on_rf callbacks must return quickly (XBeeEmulator only queues the frame).
+    """
+
+    def __init__(self):
+        self._pans: dict = {}   # PAN ID -> {MAC address -> PanBusClient}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.unicasts = 0
+        self.broadcasts = 0
+        self.undeliverable = 0  # Unicasts to a MAC address that is not attached
+
+    def client(self, pan_id, mac_address: str, on_rf=None) -> "PanBusClient":
+        """Create a client (MqttClient interface) on this bus."""
+        return PanBusClient(pan_id, mac_address, on_rf, bus=self)
+
+    def nodes(self, pan_id) -> list[str]:
+        """MAC addresses attached to a PAN."""
+        return list(self._pans.get(str(pan_id), {}))
+
+    def _attach(self, client: "PanBusClient"):
+        with self._lock:
+            nodes = dict(self._pans.get(client.pan_id, {}))
+            nodes[client.mac_address] = client
+            # Copy on write, senders iterate without the lock
+            self._pans[client.pan_id] = nodes
+
+    def _detach(self, client: "PanBusClient"):
+        with self._lock:
+            nodes = dict(self._pans.get(client.pan_id, {}))
+            if nodes.get(client.mac_address) is client:
+                del nodes[client.mac_address]
+            self._pans[client.pan_id] = nodes
+
+    def _unicast(self, pan_id: str, dest64: str, topic: str, payload: bytes):
+        node = self._pans.get(pan_id, {}).get(dest64)
+        if node is None or not node.subscribed:
+            self.undeliverable += 1
+            return
+        self.unicasts += 1
+        node.on_rf(topic, payload)
+
+    def _broadcast(self, pan_id: str, sender: "PanBusClient", topic: str, payload: bytes):
+        self.broadcasts += 1
+        for node in self._pans.get(pan_id, {}).values():
+            if node is not sender and node.subscribed:
+                node.on_rf(topic, payload)
+
+
+class _PublishResult:
+    """Stands in for paho's MQTTMessageInfo."""
+    rc = 0
+
+    def wait_for_publish(self, timeout: float = None):
+        return True
+
+    def is_published(self) -> bool:
+        return True
+
+
+_PUBLISHED = _PublishResult()
+
+
+class PanBusClient:
+    """
+    PanBus transport with the MqttClient interface used by XBeeEmulator.
+    Topics passed to on_rf have the same format as with MqttClient.
+    """
+
+    def __init__(self, pan_id, mac_address: str, on_rf=None, bus: PanBus = None):
+        self.pan_id = str(pan_id)
+        self.mac_address = (mac_address or "").upper()
+        self.on_rf = on_rf
+        self.bus = bus if bus is not None else PanBus()
+
+        self.connected = False
+        self.subscribed = False
+        self._topic_broadcast = f"xbee/pan/{self.pan_id}/broadcast"
+        self._rx_topics: dict[str, str] = {}    # Destination address -> topic
+
+    def set_username_pw(self, username: str | None = None, password: str | None = None):
+        pass
+
+    def connect(self, host: str = None, port: int | str | None = None, keepalive: int | str = 60):
+        """Attach to the bus (host, port and keepalive are ignored)."""
+        self.bus._attach(self)
+        self.connected = True
+
+    def disconnect(self):
+        self.bus._detach(self)
+        self.connected = False
+        self.subscribed = False
+
+    def subscribe_rf(self, qos: int = 0):
+        self.subscribed = True
+
+    def publish_unicast(self, dest64: str, payload: bytes, *, qos: int = 0, retain: bool = False):
+        topic = self._rx_topics.get(dest64)
+        if topic is None:
+            topic = self._rx_topics[dest64] = f"xbee/pan/{self.pan_id}/rx/{dest64.upper()}"
+        self.bus._unicast(self.pan_id, dest64.upper(), topic, payload)
+        return _PUBLISHED
+
+    def publish_broadcast(self, payload: bytes, *, qos: int = 0, retain: bool = False):
+        self.bus._broadcast(self.pan_id, self, self._topic_broadcast, payload)
+        return _PUBLISHED
+
+    def publish_many(self, messages, *, qos: int = 0) -> list:
+        """Publish a batch of (destination address or None for broadcast, payload)."""
+        return [self.publish_broadcast(payload) if dest64 is None else self.publish_unicast(dest64, payload)
+                for dest64, payload in messages]
@@ -0,0 +1,62 @@
+import json
+import os
+import time
+
+
+class ParameterCache:
+    """
+    On-disk snapshots of XBee module parameters (AT command identifier -> value).
+
+    A snapshot is keyed by the module's serial number (SH/SL) and firmware version (VR) and stored as
+    one JSON file per module. A snapshot is only trusted if the fingerprint parameters, read from the
+    module on every open, still have the values recorded in it.
+    """
+    KEY_PARAMETERS = ("SH", "SL", "VR")
+    FINGERPRINT_PARAMETERS = ("ID", "CH", "MY", "AP", "CE")   # Cheap to read, change when the module is reconfigured
+
+    def __init__(self, directory: str, fingerprint=FINGERPRINT_PARAMETERS):
+        """
+        Args:
+          directory: Directory of the snapshot files (created if missing).
+          fingerprint: Parameters compared between the module and a snapshot before it is used.
+        """
+        self.directory = directory
+        self.fingerprint = tuple(fingerprint)
+
+    @classmethod
+    def key(cls, values: dict) -> str | None:
+        """Snapshot key from SH, SL and VR values (bytes), None if one of them is missing."""
+        if any(values.get(parameter) is None for parameter in cls.KEY_PARAMETERS):
+            return None
+        return "_".join(values[parameter].hex().upper() for parameter in cls.KEY_PARAMETERS)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"xbee_{key}.json")
+
+    def load(self, key: str) -> dict | None:
+        """Parameters of a snapshot, None if there is no (readable) snapshot."""
+        try:
+            with open(self.path(key), "r") as file:
+                snapshot = json.load(file)
+            return {parameter: None if value is None else bytes.fromhex(value)
+                    for parameter, value in snapshot["parameters"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def save(self, key: str, parameters: dict):
+        """Write a snapshot (replacing the previous one atomically)."""
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot = {
+            "saved": time.time(),
+            "parameters": {parameter: None if value is None else bytes(value).hex()
+                           for parameter, value in parameters.items()},
+        }
+        path = self.path(key)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(snapshot, file, indent=1)
+        os.replace(temporary, path)
+
+    def matches(self, snapshot: dict, values: dict) -> bool:
+        """True if the module's fingerprint values (read just now) equal the snapshot's."""
+        return all(values.get(parameter) == snapshot.get(parameter) for parameter in self.fingerprint)
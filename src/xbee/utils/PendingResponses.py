@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+
+class PendingResponses:
+    """
+    Outstanding requests (0x08 AT commands, 0x00 transmits) indexed by frame ID.
+
+    Each request gets its own Future. The reader thread completes the matching Future
+    when the 0x88/0x89 response arrives, so concurrent callers never steal each other's responses.
+    Entries that are never answered are reclaimed once their deadline passes.
+    """
+
+    def __init__(self, reap_interval: float = 1.0, future_factory=Future):
+        """
+        Args:
+          reap_interval: Min seconds between scans for expired entries.
+          future_factory: Callable creating the Future for each request (e.g. loop.create_future for asyncio).
+        """
+        self.reap_interval = reap_interval
+        self.future_factory = future_factory
+
+        self._lock = threading.Lock()
+        self._pending: dict[int, tuple[Future, float]] = {}  # frame_id -> (future, deadline)
+        self._next_reap = 0.0
+
+        self.expired = 0    # Number of entries reclaimed without a response
+
+    def __contains__(self, frame_id: int) -> bool:
+        return frame_id in self._pending
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def register(self, frame_id: int, timeout: float):
+        """Create the Future for a request that is about to be sent.
+
+        Args:
+          frame_id: Frame ID of the request.
+          timeout: Seconds after which the entry may be reclaimed.
+
+        Returns:
+          Future completed with the response frame.
+        """
+        now = time.monotonic()
+        if now >= self._next_reap:
+            self.reap(now)
+
+        future = self.future_factory()
+        with self._lock:
+            self._pending[frame_id] = (future, now + timeout)
+        return future
+
+    def resolve(self, frame_id: int, frame) -> bool:
+        """Complete the request waiting for this frame ID.
+
+        Returns:
+          True if a request was waiting, False otherwise.
+        """
+        with self._lock:
+            entry = self._pending.pop(frame_id, None)
+        if entry is None:
+            return False
+        future = entry[0]
+        if future.done():
+            return False
+        future.set_result(frame)
+        return True
+
+    def wait(self, frame_id: int, future: Future, timeout: float):
+        """Block until the response for a registered request arrives, then forget the request.
+
+        Args:
+          frame_id: Frame ID of the request.
+          future: Future returned by register().
+          timeout: Max time to wait for the response.
+
+        Returns:
+          Response frame, None if no response arrived within timeout.
+        """
+        try:
+            return future.result(timeout)
+        except Exception:
+            return None
+        finally:
+            self.discard(frame_id, future)
+
+    def discard(self, frame_id: int, future: Future = None):
+        """Forget a request without completing it.
+
+        Args:
+          frame_id: Frame ID of the request.
+          future: Only discard the entry if it still belongs to this Future (the ID may have been reused).
+        """
+        with self._lock:
+            entry = self._pending.get(frame_id)
+            if entry is not None and (future is None or entry[0] is future):
+                del self._pending[frame_id]
+
+    def reap(self, now: float = None) -> int:
+        """Reclaim entries whose deadline has passed. Their Futures fail with TimeoutError.
+
+        Returns:
+          Number of reclaimed entries.
+        """
+        now = time.monotonic() if now is None else now
+        self._next_reap = now + self.reap_interval
+        with self._lock:
+            expired = [frame_id for frame_id, (_, deadline) in self._pending.items() if deadline <= now]
+            futures = [self._pending.pop(frame_id)[0] for frame_id in expired]
+        for future in futures:
+            if not future.done():
+                future.set_exception(TimeoutError("No response received"))
+        self.expired += len(futures)
+        return len(futures)
@@ -0,0 +1,219 @@
+import asyncio
+import heapq
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from .TransmitScheduler import TransmitScheduler
+
+
+class _Message:
+    __slots__ = ("data", "address", "priority", "future", "attempts", "frame_id", "status_future", "status")
+
+    def __init__(self, data, address: str, priority: int, future: Future):
+        self.data = data
+        self.address = address
+        self.priority = priority
+        self.future = future
+        self.attempts = 0
+        self.frame_id = None        # Frame ID of the transmission in flight
+        self.status_future = None
+        self.status = None          # Last 0x89 frame received
+
+
+class ReliableSender:
+    """
+    Sliding-window reliable delivery over XBee transmit statuses (0x89).
+
+    Up to window messages are in flight at once, each with its own frame ID. A failed status
+    (e.g. 0x01 no ACK, 0x02 CCA failure) or a missing status triggers a retransmission after an
+    exponential backoff, up to retries times. Each message gets a Future completed with its final status.
+    """
+    # 0x89 statuses worth retrying: no ACK, CCA failure, purged, network ACK failure, internal/resource errors
+    RETRY_STATUSES = frozenset((0x01, 0x02, 0x03, 0x21, 0x31, 0x32))
+
+    def __init__(self, xbee, window: int = 8, retries: int = 3, backoff: float = 0.02, status_timeout: float = None,
+                 retry_statuses=RETRY_STATUSES):
+        """
+        Args:
+          xbee: Open XBee used to send (each attempt goes through xbee._send_attempt).
+          window: Max messages in flight (frame IDs in use) at once.
+          retries: Max retransmissions per message.
+          backoff: Delay before the first retransmission, doubled for each further retransmission.
+          status_timeout: Max time to wait for a status before retransmitting. xbee.status_timeout if None.
+          retry_statuses: 0x89 statuses that trigger a retransmission. Any other non-zero status fails the message.
+        """
+        if not 1 <= window <= 0xFF:
+            raise ValueError("window must be between 1 and 255")
+        self.xbee = xbee
+        self.window = window
+        self.retries = retries
+        self.backoff = backoff
+        self.status_timeout = status_timeout if status_timeout is not None else xbee.status_timeout
+        self.retry_statuses = retry_statuses
+
+        self._lock = threading.Condition()
+        self._waiting: deque = deque()      # Messages not sent yet
+        self._in_flight = 0                 # Messages sent and not completed (including those waiting to be resent)
+        self._timers: list = []             # Heap of (deadline, sequence, action, message, frame_id)
+        self._sequence = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="XBeeReliableSender", daemon=True)
+        self._thread.start()
+
+        # Counters
+        self.sent = 0
+        self.retransmissions = 0
+        self.delivered = 0
+        self.failed = 0
+
+    def send(self, data, address: str = "0000000000000000", priority: int = TransmitScheduler.NORMAL) -> Future:
+        """Queue a message for reliable delivery.
+
+        Args:
+          data: String or bytes data (less than 100 bytes).
+          address: Address of destination XBee module.
+          priority: Transmit queue class of every attempt.
+
+        Returns:
+          Future completed with the final 0x89 status (status 0 on success, last failure status otherwise),
+          or None if no status was received after every retry.
+        """
+        if len(data) >= 100:
+            raise Exception(f"Error: Data should not exceed 100 bytes. Current size: {len(data)} bytes")
+
+        future = Future()
+        with self._lock:
+            if not self._running:
+                raise Exception("Error: ReliableSender is closed")
+            self._waiting.append(_Message(data, address, priority, future))
+            self._lock.notify()
+        return future
+
+    @staticmethod
+    async def retry_async(transmit, retries: int = 3, backoff: float = 0.02, retry_statuses=RETRY_STATUSES):
+        """Await transmit attempts with the sender's retry policy, for asyncio versions of XBee.
+
+        Args:
+          transmit: Coroutine function sending one attempt and returning its 0x89 frame, None without status.
+          retries: Max retransmissions.
+          backoff: Delay before the first retransmission, doubled for each further retransmission.
+          retry_statuses: 0x89 statuses that trigger a retransmission. Any other non-zero status fails the message.
+
+        Returns:
+          Final 0x89 status (status 0 on success, last failure status otherwise), None if no status was received.
+        """
+        status = None
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(backoff * (2 ** (attempt - 1)))
+            result = await transmit()
+            if result is None:
+                continue
+            status = result
+            if status.status not in retry_statuses:
+                break
+        return status
+
+    def pending(self) -> int:
+        """Number of messages not completed yet."""
+        with self._lock:
+            return len(self._waiting) + self._in_flight
+
+    def close(self):
+        """Stop the sender. Messages not completed yet are cancelled."""
+        with self._lock:
+            self._running = False
+            self._lock.notify()
+        self._thread.join()
+
+        for message in self._waiting:
+            message.future.cancel()
+        for _, _, _, message, _ in self._timers:
+            message.future.cancel()
+        self._waiting.clear()
+        self._timers.clear()
+
+    def _run(self):
+        with self._lock:
+            while self._running:
+                # 1) Fill the window
+                while self._waiting and self._in_flight < self.window:
+                    message = self._waiting.popleft()
+                    self._in_flight += 1
+                    self._transmit(message)
+
+                # 2) Run due timers (status timeouts, retransmissions)
+                now = time.monotonic()
+                while self._timers and self._timers[0][0] <= now:
+                    _, _, action, message, frame_id = heapq.heappop(self._timers)
+                    if action == "timeout":
+                        if message.frame_id == frame_id:
+                            self.xbee.pending.discard(frame_id, message.status_future)
+                            self._failed_attempt(message, None)
+                    else:
+                        self._transmit(message)
+
+                # 3) Sleep until the next timer or a notification
+                timeout = self._timers[0][0] - time.monotonic() if self._timers else None
+                if timeout is None or timeout > 0:
+                    self._lock.wait(timeout)
+
+    def _transmit(self, message: _Message):
+        """Send one attempt of a message. Called with the lock held."""
+        try:
+            frame_id, status_future = self.xbee._send_attempt(message.data, message.address, message.priority,
+                                                              self.status_timeout * 2)
+        except Exception as e:
+            self._complete(message, exception=e)
+            return
+
+        if message.attempts:
+            self.retransmissions += 1
+        message.attempts += 1
+        message.frame_id = frame_id
+        message.status_future = status_future
+        self.sent += 1
+
+        self._schedule(self.status_timeout, "timeout", message, frame_id)
+        status_future.add_done_callback(lambda f, message=message, frame_id=frame_id: self._on_status(message, frame_id, f))
+
+    def _on_status(self, message: _Message, frame_id: int, status_future: Future):
+        """Status callback (runs on the XBee I/O thread)."""
+        if status_future.cancelled() or status_future.exception() is not None:
+            return  # Handled by the timeout timer
+        status = status_future.result()
+        with self._lock:
+            if message.frame_id != frame_id or message.future.done():
+                return  # Late status of an attempt that already timed out
+            message.frame_id = None
+            if status.status == 0x00:
+                self.delivered += 1
+                self._complete(message, status)
+            else:
+                self._failed_attempt(message, status)
+            self._lock.notify()
+
+    def _failed_attempt(self, message: _Message, status):
+        """Retransmit after a backoff, or fail the message. Called with the lock held."""
+        message.frame_id = None
+        if status is not None:
+            message.status = status
+        if (status is None or status.status in self.retry_statuses) and message.attempts <= self.retries:
+            self._schedule(self.backoff * (2 ** (message.attempts - 1)), "retransmit", message, None)
+        else:
+            self.failed += 1
+            self._complete(message, message.status)
+
+    def _complete(self, message: _Message, status=None, exception: Exception = None):
+        """Called with the lock held."""
+        self._in_flight -= 1
+        if exception is not None:
+            message.future.set_exception(exception)
+        else:
+            message.future.set_result(status)
+
+    def _schedule(self, delay: float, action: str, message: _Message, frame_id):
+        self._sequence += 1
+        heapq.heappush(self._timers, (time.monotonic() + delay, self._sequence, action, message, frame_id))
@@ -0,0 +1,160 @@
+import queue
+import threading
+import time
+from collections import deque
+
+
+class TransmitScheduler:
+    """
+    Priority transmit queue with optional token-bucket rate limiting.
+
+    Frames are queued in priority classes (lower value first, FIFO within a class). With a rate set,
+    a frame is only handed out when the bucket holds enough bytes, so frames are released at the radio's
+    RF rate instead of overflowing the module's serial buffer.
+
+    Drop-in for the queue.Queue used before: put(), get(), get_nowait(), empty() and qsize() behave
+    the same, except that get_nowait() also raises queue.Empty while the rate limit holds frames back.
+    """
+    COMMAND = 0     # Commands and AT commands (e.g. EMERGENCY_STOP)
+    NORMAL = 1      # Default
+    BULK = 2        # Telemetry, large transfers
+
+    def __init__(self, classes: int = 3, rate: float = None, burst: int = 512):
+        """
+        Args:
+          classes: Number of priority classes (0 is the highest).
+          rate: Max bytes per second handed out, None for no limit.
+          burst: Bytes that can be handed out at once after the link was idle (bucket size).
+        """
+        self.rate = rate
+        self.burst = burst
+        self._queues = [deque() for _ in range(classes)]
+        self._size = 0
+        self._bytes = 0     # Queued bytes
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._not_empty = threading.Condition()
+
+        # Stats per class
+        self.sent = [0] * classes
+        self.wait_total = [0.0] * classes   # Seconds
+        self.wait_max = [0.0] * classes
+
+    def put(self, item, block: bool = True, timeout: float = None, priority: int = NORMAL):
+        """Queue an encoded frame. block and timeout are accepted for queue.Queue compatibility (never blocks)."""
+        if not 0 <= priority < len(self._queues):
+            raise ValueError(f"priority must be between 0 and {len(self._queues) - 1} (got {priority})")
+        with self._not_empty:
+            self._queues[priority].append((item, time.monotonic()))
+            self._size += 1
+            self._bytes += len(item)
+            self._not_empty.notify()
+
+    def put_nowait(self, item, priority: int = NORMAL):
+        self.put(item, False, priority=priority)
+
+    def get(self, block: bool = True, timeout: float = None):
+        """Remove and return the highest priority frame, waiting for a frame (and for tokens) if block is True.
+
+        Raises:
+          queue.Empty if no frame can be handed out within timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._not_empty:
+            while True:
+                item = self._pop()
+                if item is not None or not block:
+                    break
+                delay = self._delay()
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    delay = remaining if delay is None else min(delay, remaining)
+                self._not_empty.wait(delay)
+        if item is None:
+            raise queue.Empty
+        return item
+
+    def get_nowait(self):
+        return self.get(False)
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def qsize(self) -> int:
+        return self._size
+
+    def delay(self) -> float | None:
+        """Seconds until the next queued frame can be handed out (0 if now), None if the queue is empty."""
+        with self._not_empty:
+            return self._delay()
+
+    def pacing(self, size: int = 0) -> float:
+        """Seconds until the queued frames and size more bytes are handed out at the rate limit (0 without a limit)."""
+        if self.rate is None:
+            return 0.0
+        with self._not_empty:
+            self._refill(time.monotonic())
+            return max(0.0, self._bytes + size - self._tokens) / self.rate
+
+    def depths(self) -> list[int]:
+        """Number of queued frames per class."""
+        return [len(frames) for frames in self._queues]
+
+    def stats(self) -> dict:
+        """Queue depth, frames sent and queue wait times (seconds) per class."""
+        with self._not_empty:
+            return {priority: {"depth": len(self._queues[priority]),
+                               "sent": self.sent[priority],
+                               "wait_avg": self.wait_total[priority] / self.sent[priority] if self.sent[priority] else 0.0,
+                               "wait_max": self.wait_max[priority]}
+                    for priority in range(len(self._queues))}
+
+    def _head(self):
+        for priority, frames in enumerate(self._queues):
+            if frames:
+                return priority, frames
+        return None, None
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _cost(self, item) -> int:
+        # A frame larger than the bucket goes out once the bucket is full (and leaves it in debt)
+        return min(len(item), self.burst)
+
+    def _pop(self):
+        """Called with the lock held. Returns None if there is no frame or not enough tokens."""
+        priority, frames = self._head()
+        if frames is None:
+            return None
+        item, queued = frames[0]
+        now = time.monotonic()
+        if self.rate is not None:
+            self._refill(now)
+            if self._tokens < self._cost(item):
+                return None
+            self._tokens -= len(item)
+
+        frames.popleft()
+        self._size -= 1
+        self._bytes -= len(item)
+        wait = now - queued
+        self.sent[priority] += 1
+        self.wait_total[priority] += wait
+        if wait > self.wait_max[priority]:
+            self.wait_max[priority] = wait
+        return item
+
+    def _delay(self) -> float | None:
+        """Called with the lock held."""
+        _, frames = self._head()
+        if frames is None:
+            return None
+        if self.rate is None:
+            return 0.0
+        self._refill(time.monotonic())
+        missing = self._cost(frames[0][0]) - self._tokens
+        return missing / self.rate if missing > 0 else 0.0
@@ -1,4 +1,21 @@
 from .MqttClient import MqttClient
 from .FakeSerial import FakeSerial
+from .EchoResponder import EchoResponder
+from .EscapeCodec import EscapeCodec
+from .FrameParser import FrameParser
+from .FrameEncoder import FrameEncoder
+from .FrameDispatcher import FrameDispatcher
+from .PendingResponses import PendingResponses
+from .Fragmenter import Fragmenter
+from .LogSink import LogSink
+from .ReliableSender import ReliableSender
+from .TransmitScheduler import TransmitScheduler
+from .BoundedQueue import BoundedQueue, LatestMailbox, AwaitableQueue
+from .ParameterCache import ParameterCache
+from .Capture import CaptureWriter, CaptureReader
+from .PanBus import PanBus, PanBusClient
+from .LinkModel import LinkModel
+from .MqttGateway import MqttGateway, GatewayClient
+from .Metrics import Metrics
 __all__ = []
-__all__ += ["MqttClient", "FakeSerial"]
\ No newline at end of file
+__all__ += ["MqttClient", "FakeSerial", "EchoResponder", "EscapeCodec", "FrameParser", "FrameEncoder", "FrameDispatcher", "PendingResponses", "Fragmenter", "LogSink", "ReliableSender", "TransmitScheduler", "BoundedQueue", "LatestMailbox", "AwaitableQueue", "ParameterCache", "CaptureWriter", "CaptureReader", "PanBus", "PanBusClient", "LinkModel", "MqttGateway", "GatewayClient", "Metrics"]
@@ -0,0 +1,33 @@
+import pytest
+
+from xbee.utils import EchoResponder
+
+pytest.importorskip("pty")
+
+
+class RecordingResponder(EchoResponder):
+    """EchoResponder keeping the frame data of every request it answered."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.received = []
+
+    def _respond(self, frame_data: bytes) -> bytes:
+        self.received.append(bytes(frame_data))
+        return super()._respond(frame_data)
+
+
+@pytest.fixture
+def module():
+    """Factory of started RecordingResponder stand-in modules, stopped after the test."""
+    responders = []
+
+    def create(**kwargs) -> RecordingResponder:
+        responder = RecordingResponder(**kwargs)
+        responder.start()
+        responders.append(responder)
+        return responder
+
+    yield create
+    for responder in responders:
+        responder.stop()
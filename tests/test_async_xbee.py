@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+from xbee import AsyncXBee
+from xbee.utils import CaptureWriter
+
+DESTINATION = "0013A200428396C0"
+
+
+def run(module, test, **kwargs):
+    """Open an AsyncXBee on a stand-in module, run test(xbee) on a new event loop and close it."""
+    async def main():
+        xbee = AsyncXBee(module(**kwargs).port)
+        await xbee.open()
+        try:
+            return await test(xbee)
+        finally:
+            await xbee.close()
+    return asyncio.run(main())
+
+
+def test_transmit_status(module):
+    async def test(xbee):
+        status = await xbee.transmit("hello", DESTINATION)
+        assert status is not None and status.status == 0x00
+        assert await xbee.transmit("hello", DESTINATION, retrieve_status=False) is None
+    run(module, test)
+
+
+def test_at_command(module):
+    async def test(xbee):
+        response = await xbee.at_command("MY")
+        assert bytes(response.data) == b"\x12\x34"
+    run(module, test, at_values={"MY": b"\x12\x34"})
+
+
+def test_received_frames(module):
+    async def test(xbee):
+        await xbee.transmit("hello", DESTINATION, retrieve_status=False)
+        frame = await xbee.retrieve_data()
+        assert bytes(frame.received_data) == b"hello"
+    run(module, test, loopback=True)
+
+
+def test_more_concurrent_requests_than_frame_ids(module):
+    async def test(xbee):
+        statuses = await asyncio.gather(*(xbee.transmit(f"message {i}", DESTINATION) for i in range(600)))
+        assert all(status is not None and status.status == 0x00 for status in statuses)
+        assert len(xbee.pending) == 0
+    run(module, test)
+
+
+def test_close_ends_frames(module):
+    async def test(xbee):
+        async def consume():
+            return [frame async for frame in xbee.frames()]
+        consumers = [asyncio.ensure_future(consume()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        await xbee.close()
+        assert await asyncio.wait_for(asyncio.gather(*consumers), 1) == [[], [], []]
+    run(module, test)
+
+
+def test_set_parameter(module):
+    async def test(xbee):
+        assert await xbee.request_at_command_data("PL", value=b"\x02") is not None
+        response = await xbee.request_at_command_data("PL")
+        assert bytes(response.data) == b"\x02"
+    run(module, test)
+
+
+def test_write_linger_groups_frames(module):
+    async def test(xbee):
+        xbee.flush_frame_counts.clear()
+        for i in range(3):
+            await xbee.transmit(f"message {i}", DESTINATION, retrieve_status=False)
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.1)
+        assert dict(xbee.flush_frame_counts) == {3: 1}
+    async def main():
+        xbee = AsyncXBee(module().port, write_linger=0.05)
+        await xbee.open()
+        try:
+            await test(xbee)
+        finally:
+            await xbee.close()
+    asyncio.run(main())
+
+
+def test_realtime_replay_does_not_block(module, tmp_path):
+    path = str(tmp_path / "capture.bin")
+    writer = CaptureWriter(path)
+    for frame_id in (1, 2):
+        frame_data = bytes((0x88, frame_id)) + b"MY\x00"
+        writer.write(CaptureWriter.RX, bytes((0x7E, 0, len(frame_data))) + frame_data + bytes((0xFF - sum(frame_data) & 0xFF,)))
+        time.sleep(0.1)
+    writer.close()
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        frames = await AsyncXBee().replay_capture(path, realtime=True)
+        ticker.cancel()
+        return frames, ticks
+
+    frames, ticks = asyncio.run(main())
+    assert frames == 2 and ticks >= 5
@@ -0,0 +1,23 @@
+import importlib.util
+import os
+
+BENCH_FILE = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "bench_xbee.py")
+
+
+def load_bench():
+    spec = importlib.util.spec_from_file_location("bench_xbee", BENCH_FILE)
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    return bench
+
+
+def test_percentiles():
+    bench = load_bench()
+    result = bench._percentiles([0.003, 0.001, 0.002], lost=1)
+    assert result["count"] == 3 and result["lost"] == 1
+    assert result["p50_ms"] == 2.0 and result["max_ms"] == 3.0
+
+
+def test_percentiles_without_samples():
+    result = load_bench()._percentiles([], lost=5)
+    assert result == {"count": 0, "lost": 5, "p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None}
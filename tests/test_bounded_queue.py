@@ -0,0 +1,127 @@
+import asyncio
+import queue
+
+import pytest
+
+from xbee import AsyncXBee, XBee
+from xbee.utils import BoundedQueue, LatestMailbox
+
+DESTINATION = "0013A200428396C0"
+OTHER = "0013A200424366C7"
+
+
+def test_drop_oldest():
+    q = BoundedQueue(2, BoundedQueue.DROP_OLDEST)
+    for item in (1, 2, 3):
+        q.put(item)
+    assert [q.get_nowait(), q.get_nowait()] == [2, 3]
+    assert q.dropped == 1
+
+
+def test_drop_newest():
+    q = BoundedQueue(2, BoundedQueue.DROP_NEWEST)
+    for item in (1, 2, 3):
+        q.put(item)
+    assert [q.get_nowait(), q.get_nowait()] == [1, 2]
+    assert q.dropped == 1
+
+
+def test_block():
+    q = BoundedQueue(1, BoundedQueue.BLOCK)
+    q.put(1)
+    with pytest.raises(queue.Full):
+        q.put(2, timeout=0.01)
+    assert q.dropped == 0
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        BoundedQueue(1, "drop_all")
+
+
+def test_latest_mailbox_replaces_in_place():
+    mailbox = LatestMailbox(key=lambda item: item[0])
+    for item in (("a", 1), ("b", 1), ("a", 2)):
+        mailbox.put(item)
+    assert mailbox.qsize() == 2
+    assert mailbox.dropped == 1
+    assert mailbox.peek("a") == ("a", 2)
+    assert [mailbox.get_nowait(), mailbox.get_nowait()] == [("a", 2), ("b", 1)]
+    assert mailbox.peek("a") is None
+
+
+def test_latest_mailbox_maxsize():
+    mailbox = LatestMailbox(key=lambda item: item[0], maxsize=2)
+    for item in (("a", 1), ("b", 1), ("c", 1)):
+        mailbox.put(item)
+    assert [mailbox.get_nowait(), mailbox.get_nowait()] == [("b", 1), ("c", 1)]
+    assert mailbox.dropped == 1
+
+
+def received(xbee: XBee) -> list:
+    """Payloads of the frames waiting in the receive queue (an AT command round trip first, so every loopback is in)."""
+    xbee.request_at_command_data("MY")
+    frames = []
+    while not xbee.x81x90_queue.empty():
+        frames.append(bytes(xbee.retrieve_data().received_data))
+    return frames
+
+
+def test_xbee_receive_queue_drops_oldest(module):
+    xbee = XBee(module(loopback=True).port, rx_queue_size=2)
+    xbee.open()
+    try:
+        for i in range(5):
+            xbee.transmit_data(f"message {i}", DESTINATION, retrieveStatus=True)
+        assert received(xbee) == [b"message 3", b"message 4"]
+        assert xbee.x81x90_queue.dropped == 3
+    finally:
+        xbee.close()
+
+
+def test_xbee_latest_per_source(module):
+    xbee = XBee(module(loopback=True).port, rx_latest_per_source=True)
+    xbee.open()
+    try:
+        for i in range(3):
+            xbee.transmit_data(f"{DESTINATION} {i}", DESTINATION, retrieveStatus=True)
+            xbee.transmit_data(f"{OTHER} {i}", OTHER, retrieveStatus=True)
+        assert received(xbee) == [f"{DESTINATION} 2".encode(), f"{OTHER} 2".encode()]
+    finally:
+        xbee.close()
+
+
+def test_async_xbee_receive_queue_drops_oldest(module):
+    async def main():
+        xbee = AsyncXBee(module(loopback=True).port, rx_queue_size=2)
+        await xbee.open()
+        try:
+            for i in range(5):
+                await xbee.transmit(f"message {i}", DESTINATION)
+            await xbee.at_command("MY")
+            assert xbee.metrics.snapshot()["rx_queue_depth"] == 2
+            assert xbee.dropped_frames()["x81x90"] == 3
+            return [bytes((await xbee.retrieve_data()).received_data) for _ in range(2)]
+        finally:
+            await xbee.close()
+    assert asyncio.run(main()) == [b"message 3", b"message 4"]
+
+
+def test_async_xbee_latest_per_source(module):
+    async def main():
+        xbee = AsyncXBee(module(loopback=True).port, rx_latest_per_source=True)
+        await xbee.open()
+        try:
+            for i in range(3):
+                await xbee.transmit(f"{DESTINATION} {i}", DESTINATION)
+                await xbee.transmit(f"{OTHER} {i}", OTHER)
+            await xbee.at_command("MY")
+            return [bytes((await xbee.retrieve_data()).received_data) for _ in range(2)]
+        finally:
+            await xbee.close()
+    assert asyncio.run(main()) == [f"{DESTINATION} 2".encode(), f"{OTHER} 2".encode()]
+
+
+def test_async_xbee_rejects_block_policy():
+    with pytest.raises(ValueError):
+        AsyncXBee(rx_queue_size=2, rx_queue_policy=BoundedQueue.BLOCK)
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+
+from xbee import AsyncXBee, XBee
+from xbee.utils import CaptureReader, CaptureWriter
+
+DESTINATION = "0013A200428396C0"
+
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    writer = CaptureWriter(path)
+    writer.write(CaptureWriter.RX, b"\x7e\x00")
+    writer.write(CaptureWriter.TX, bytearray(b"tx"))
+    writer.close()
+    writer.write(CaptureWriter.RX, b"after close")
+
+    with CaptureReader(path) as reader:
+        records = [(direction, bytes(data)) for _, direction, data in reader.records()]
+    assert records == [(CaptureWriter.SESSION, b""), (CaptureWriter.RX, b"\x7e\x00"), (CaptureWriter.TX, b"tx")]
+    assert writer.records == 3 and writer.bytes == 4
+
+
+def test_truncated_record_is_ignored(tmp_path):
+    path = tmp_path / "capture.bin"
+    writer = CaptureWriter(str(path))
+    writer.write(CaptureWriter.RX, b"complete")
+    writer.write(CaptureWriter.RX, b"truncated")
+    writer.close()
+    path.write_bytes(path.read_bytes()[:-3])
+
+    with CaptureReader(str(path)) as reader:
+        assert [bytes(data) for _, _, data in reader.records()][1:] == [b"complete"]
+
+
+def test_not_a_capture_file(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"something else")
+    with pytest.raises(ValueError):
+        CaptureReader(str(path))
+
+
+def test_replay_directions_and_pace(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    writer = CaptureWriter(path)
+    writer.write(CaptureWriter.RX, b"one")
+    writer.write(CaptureWriter.TX, b"sent")
+    time.sleep(0.05)
+    writer.write(CaptureWriter.RX, b"two")
+    writer.close()
+
+    chunks = []
+    with CaptureReader(path) as reader:
+        assert reader.replay(lambda data: chunks.append(bytes(data))) == 6
+        assert reader.replay(lambda data: None, direction=CaptureWriter.TX) == 4
+        start = time.monotonic()
+        reader.replay(lambda data: None, realtime=True, speed=2.0)
+        assert time.monotonic() - start >= 0.02
+    assert chunks == [b"one", b"two"]
+
+
+def test_xbee_capture_and_replay(module, tmp_path):
+    path = str(tmp_path / "capture.bin")
+    xbee = XBee(module(loopback=True).port, capture_file=path)
+    xbee.open()
+    try:
+        for i in range(3):
+            assert xbee.transmit_data(f"message {i}", DESTINATION, retrieveStatus=True) is not None
+        xbee.request_at_command_data("MY")
+    finally:
+        xbee.close()
+
+    replayed = XBee()
+    # 3 statuses, 3 loopbacks and the AT command response
+    assert replayed.replay_capture(path) == 7
+    assert [bytes(replayed.x81x90_queue.get_nowait().received_data) for _ in range(3)] == \
+        [b"message 0", b"message 1", b"message 2"]
+
+    with CaptureReader(path) as reader:
+        sent = b"".join(bytes(data) for _, direction, data in reader.records() if direction == CaptureWriter.TX)
+    assert sent.count(b"message") == 3
+
+
+def test_async_xbee_capture(module, tmp_path):
+    path = str(tmp_path / "capture.bin")
+    responder = module()
+
+    async def main():
+        xbee = AsyncXBee(responder.port, capture_file=path)
+        await xbee.open()
+        try:
+            assert await xbee.transmit("hello", DESTINATION) is not None
+        finally:
+            await xbee.close()
+
+    asyncio.run(main())
+    assert XBee().replay_capture(path) == 1
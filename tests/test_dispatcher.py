@@ -0,0 +1,101 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from xbee import XBee
+from xbee.frames import x89, x90
+from xbee.frames.FrameInterface import FrameInterface
+from xbee.utils import FrameDispatcher
+
+SOURCE = "0013A200424366C7"
+OTHER = "0013A200428396C0"
+
+
+def rx(source: str = SOURCE) -> x90:
+    return x90(0x90, bytes.fromhex(source), b"\xff\xfe", 0x01, b"data")
+
+
+def test_subscriptions_filter_by_type_and_source():
+    dispatcher = FrameDispatcher()
+    every, statuses, from_source = [], [], []
+    dispatcher.subscribe(every.append)
+    dispatcher.subscribe(statuses.append, 0x89)
+    dispatcher.subscribe(from_source.append, (0x81, 0x90), source_address=SOURCE)
+
+    status = x89(0x89, 1, 0)
+    dispatcher.publish(status)
+    dispatcher.publish(rx(), bytes.fromhex(SOURCE))
+    dispatcher.publish(rx(OTHER), bytes.fromhex(OTHER))
+
+    assert len(every) == 3
+    assert statuses == [status]
+    assert len(from_source) == 1 and bytes(from_source[0].address_64) == bytes.fromhex(SOURCE)
+
+
+def test_unsubscribe():
+    dispatcher = FrameDispatcher()
+    received = []
+    handle = dispatcher.subscribe(received.append, 0x89)
+    assert dispatcher
+    assert dispatcher.unsubscribe(handle)
+    assert not dispatcher.unsubscribe(handle)
+    assert not dispatcher
+    dispatcher.publish(x89(0x89, 1, 0))
+    assert received == []
+
+
+def test_callback_errors_are_reported():
+    errors = []
+    dispatcher = FrameDispatcher(on_error=lambda callback, e: errors.append(e))
+    received = []
+    dispatcher.subscribe(lambda frame: 1 / 0)
+    dispatcher.subscribe(received.append)
+    dispatcher.publish(x89(0x89, 1, 0))
+    assert isinstance(errors[0], ZeroDivisionError)
+    assert len(received) == 1
+
+
+def test_executor():
+    dispatcher = FrameDispatcher()
+    threads = []
+    done = threading.Event()
+    with ThreadPoolExecutor(1) as executor:
+        dispatcher.subscribe(lambda frame: (threads.append(threading.current_thread()), done.set()), executor=executor)
+        dispatcher.publish(x89(0x89, 1, 0))
+        assert done.wait(1)
+    assert threads[0] is not threading.current_thread()
+
+
+class x97(FrameInterface):
+    __slots__ = ("frame_id",)
+    _fields = ("frame_type", "frame_id")
+
+    def __init__(self, frame_type, frame_id):
+        self._set("frame_type", frame_type)
+        self._set("frame_id", frame_id)
+
+
+def test_registered_frame_parser():
+    xbee = XBee()
+    received = []
+    xbee.register_frame_parser(0x97, lambda frame_data: x97(frame_data[0], frame_data[1]))
+    xbee.subscribe(received.append, 0x97)
+    frame = xbee._handle_frame(b"\x97\x05\x00")
+    assert isinstance(frame, x97) and received == [frame]
+    assert xbee._handle_frame(b"\x8a\x06").status == 0x06
+    assert xbee._handle_frame(b"\x42\x00") is None
+
+
+def test_xbee_subscribers_receive_frames(module):
+    xbee = XBee(module(loopback=True).port)
+    received, statuses = [], []
+    arrived = threading.Event()
+    xbee.subscribe(lambda frame: (received.append(frame), arrived.set()), 0x90, source_address=OTHER)
+    xbee.subscribe(statuses.append, 0x89)
+    xbee.open()
+    try:
+        status = xbee.transmit_data("hello", OTHER, retrieveStatus=True)
+        assert arrived.wait(1)
+        assert received[0].received_data == b"hello"
+        assert statuses == [status]
+    finally:
+        xbee.close()
@@ -0,0 +1,46 @@
+import os
+import time
+
+from xbee.utils import EchoResponder, FrameEncoder, FrameParser
+
+DESTINATION = "0013A200428396C0"
+
+
+def exchange(responder: EchoResponder, request: bytes, frames: int, escaped: bool = False) -> list:
+    """Write request to the responder's port and read frames answers back."""
+    fd = os.open(responder.port, os.O_RDWR | os.O_NOCTTY)
+    parser = FrameParser(escaped=escaped)
+    received = []
+    try:
+        os.write(fd, request)
+        deadline = time.monotonic() + 1
+        while len(received) < frames and time.monotonic() < deadline:
+            received += parser.feed(os.read(fd, 4096))
+    finally:
+        os.close(fd)
+    return received
+
+
+def test_status_and_loopback():
+    responder = EchoResponder(status=0x21, loopback=True)
+    responder.start()
+    try:
+        status, rx = exchange(responder, FrameEncoder().encode(b"hello", DESTINATION, 7), 2)
+    finally:
+        responder.stop()
+    assert status == b"\x89\x07\x21"
+    assert rx == b"\x90" + bytes.fromhex(DESTINATION) + b"\xff\xfe\x01hello"
+    assert (responder.frames_received, responder.frames_sent) == (1, 2)
+
+
+def test_at_values_escaped():
+    responder = EchoResponder(at_values={"NI": b"\x7eNODE"}, escaped=True)
+    responder.start()
+    try:
+        request = bytes((0x7E, 0x00, 0x04, 0x08, 0x11)) + b"NI"
+        request += bytes((0xFF - (sum(request[3:]) & 0xFF),))
+        request = b"\x7e" + bytes(request[1:4]) + b"\x7d\x31" + request[5:]
+        (response,) = exchange(responder, request, 1, escaped=True)
+    finally:
+        responder.stop()
+    assert response == b"\x88\x11NI\x00\x7eNODE"
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from xbee import AsyncXBeeEmulator, XBeeEmulator
+from xbee.XBeeEmulator import _build_envelope
+from xbee.utils import LinkModel, PanBus
+
+A = "0013A20000000001"
+B = "0013A20000000002"
+MISSING = "0013A200000000FF"
+
+
+def open_radios(*macs, **kwargs) -> list:
+    bus = PanBus()
+    radios = [XBeeEmulator(mac_address=mac, transport=bus, **kwargs) for mac in macs]
+    for radio in radios:
+        radio.open()
+    return radios
+
+
+def test_acknowledged_unicast_reports_rtt():
+    a, b = open_radios(A, B, ack_timeout=0.2)
+    try:
+        status = a.transmit_data("hello", B, retrieveStatus=True)
+        assert status.status == 0x00 and 0 <= status.rtt < 0.2
+        assert str(b.retrieve_data().received_data) == "hello"
+    finally:
+        a.close()
+        b.close()
+
+
+def test_missing_receiver_is_no_ack():
+    (a,) = open_radios(A, ack_timeout=0.05)
+    try:
+        start = time.monotonic()
+        status = a.transmit_data("hello", MISSING, retrieveStatus=True)
+        assert status.status == LinkModel.NO_ACK and status.rtt is None
+        assert time.monotonic() - start >= 0.05
+        # Broadcasts are not acknowledged
+        assert a.transmit_data("everyone", retrieveStatus=True).status == 0x00
+    finally:
+        a.close()
+
+
+def test_ack_from_another_radio_is_ignored():
+    (a,) = open_radios(A, ack_timeout=0.05)
+    try:
+        frame_id, status, done_at, ack = a._transmit("hello", MISSING, retrieveStatus=True)
+        assert ack is not None
+        # ACK envelope (flag bit1) with the right frame ID from the wrong address
+        forged = bytearray(_build_envelope(B, b"", frame_id, broadcast=False))
+        forged[1] |= 0x02
+        a._on_mqtt(f"xbee/pan/3332/rx/{A}", bytes(forged))
+        assert not ack.done()
+    finally:
+        a.close()
+
+
+def test_without_ack_timeout_publish_succeeds():
+    (a,) = open_radios(A, ack_timeout=None)
+    try:
+        status = a.transmit_data("hello", MISSING, retrieveStatus=True)
+        assert status.status == 0x00 and status.rtt is None
+    finally:
+        a.close()
+
+
+def test_reliable_attempts_wait_for_the_ack():
+    a, b = open_radios(A, B, ack_timeout=0.05)
+    try:
+        assert a.transmit_reliable("hello", B).result(timeout=5).status == 0x00
+        # Attempts without an acknowledgement time out after ack_timeout and are sent again
+        assert a.transmit_reliable("hello", MISSING).result(timeout=5) is None
+        assert a.reliable_sender.retransmissions == a.reliable_sender.retries
+    finally:
+        a.close()
+        b.close()
+
+
+def test_async_emulator_ack():
+    bus = PanBus()
+    a = AsyncXBeeEmulator(mac_address=A, transport=bus, ack_timeout=0.05)
+    b = AsyncXBeeEmulator(mac_address=B, transport=bus, ack_timeout=0.05)
+
+    async def main():
+        await a.open()
+        await b.open()
+        try:
+            status = await a.transmit("hello", B)
+            assert status.status == 0x00 and status.rtt is not None
+            assert (await a.transmit("hello", MISSING)).status == LinkModel.NO_ACK
+            assert (await a.transmit_reliable("hello", B)).status == 0x00
+            start = time.monotonic()
+            assert (await a.transmit_reliable("hello", MISSING, retries=2, backoff=0.0)).status == LinkModel.NO_ACK
+            # Three attempts, each waiting ack_timeout for the acknowledgement
+            assert time.monotonic() - start >= 0.15
+        finally:
+            await a.close()
+            await b.close()
+
+    asyncio.run(main())
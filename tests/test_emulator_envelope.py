@@ -0,0 +1,51 @@
+from xbee import XBeeEmulator
+from xbee.XBeeEmulator import _build_envelope, _parse_envelope
+from xbee.utils import PanBus
+
+A = "0013A20000000001"
+B = "0013A20000000002"
+C = "0013A20000000003"
+
+
+def test_envelope_round_trip():
+    packet = _build_envelope(A, b"payload", 0x105, broadcast=True)
+    broadcast, frame_id, src64, payload = _parse_envelope(packet)
+    assert (broadcast, frame_id) == (True, 0x05)
+    assert isinstance(payload, memoryview)
+    assert bytes(src64) == bytes.fromhex(A) and bytes(payload) == b"payload"
+
+
+def open_radios(*macs, **kwargs) -> list:
+    bus = PanBus()
+    radios = [XBeeEmulator(mac_address=mac, transport=bus, **kwargs) for mac in macs]
+    for radio in radios:
+        radio.open()
+    return radios
+
+
+def test_receive_packet_type():
+    a, b = open_radios(A, B, receive_packet_type="81")
+    try:
+        a.transmit_data("hello", B)
+        frame = b.retrieve_data()
+        assert frame.frame_type == 0x81 and frame.data == "hello"
+        assert bytes(frame.source_address) == bytes.fromhex(A)[-2:] and frame.rssi == -40
+    finally:
+        a.close()
+        b.close()
+
+
+def test_transmit_many_and_ffff_broadcast():
+    a, b, c = open_radios(A, B, C)
+    try:
+        a.transmit_many(["one", "two", "three"], B)
+        assert [str(b.retrieve_data().received_data) for _ in range(3)] == ["one", "two", "three"]
+        assert c.x81x90_queue.empty()
+
+        a.transmit_data("everyone", "000000000000FFFF")
+        assert str(b.retrieve_data().received_data) == "everyone"
+        assert str(c.retrieve_data().received_data) == "everyone"
+        assert a.x81x90_queue.empty()
+    finally:
+        for radio in (a, b, c):
+            radio.close()
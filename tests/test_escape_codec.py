@@ -0,0 +1,37 @@
+import pytest
+
+from xbee.utils import EscapeCodec
+
+
+@pytest.mark.parametrize("byte, escaped", [
+    (b"\x7e", b"\x7d\x5e"),
+    (b"\x7d", b"\x7d\x5d"),
+    (b"\x11", b"\x7d\x31"),
+    (b"\x13", b"\x7d\x33"),
+])
+def test_special_bytes(byte, escaped):
+    assert EscapeCodec.escape(b"a" + byte + b"b") == b"a" + escaped + b"b"
+    assert EscapeCodec.unescape(b"a" + escaped + b"b") == b"a" + byte + b"b"
+
+
+def test_plain_data_unchanged():
+    assert EscapeCodec.escape(b"hello") == b"hello"
+    assert EscapeCodec.unescape(b"hello") == b"hello"
+
+
+def test_round_trip_every_byte():
+    data = bytes(range(256)) * 2
+    escaped = EscapeCodec.escape(data)
+    assert b"\x7e" not in escaped
+    assert b"\x11" not in escaped and b"\x13" not in escaped
+    assert EscapeCodec.unescape(escaped) == data
+
+
+def test_escape_bytes_are_not_escaped_twice():
+    assert EscapeCodec.escape(b"\x7d\x7e") == b"\x7d\x5d\x7d\x5e"
+    assert EscapeCodec.unescape(b"\x7d\x5d\x7d\x5e") == b"\x7d\x7e"
+    assert EscapeCodec.unescape(b"\x7d\x5d\x5e") == b"\x7d\x5e"
+
+
+def test_trailing_escape_dropped():
+    assert EscapeCodec.unescape(b"ab\x7d") == b"ab"
@@ -0,0 +1,156 @@
+import asyncio
+import time
+
+import pytest
+
+from xbee import AsyncXBee, XBee
+from xbee.utils import EchoResponder, Fragmenter
+
+SOURCE = b"\x00\x13\xa2\x00\x42\x43\x66\xc7"
+DESTINATION = "0013A200428396C0"
+
+
+class FailingFragmentResponder(EchoResponder):
+    """EchoResponder reporting a failed delivery (0x01, no ACK) for the second fragment of each message."""
+
+    def _respond(self, frame_data: bytes) -> bytes:
+        # 0x00 frame data: frame type, frame ID, 64-bit destination, options, fragment header
+        self.status = 0x01 if frame_data[0] == 0x00 and frame_data[13] == 1 else 0x00
+        return super()._respond(frame_data)
+
+
+def payloads(fragmenter: Fragmenter, data: bytes) -> list[bytes]:
+    return [header + bytes(chunk) for header, chunk in fragmenter.fragments(data)]
+
+
+def test_reassembly():
+    sender, receiver = Fragmenter(max_payload=20), Fragmenter(max_payload=20)
+    data = bytes(range(256)) * 2
+    parts = payloads(sender, data)
+    assert len(parts) == -(-len(data) // 16)
+    assert all(len(part) <= 20 and receiver.is_fragment(part) for part in parts)
+
+    results = [receiver.add(SOURCE, part) for part in parts]
+    assert results[:-1] == [None] * (len(parts) - 1)
+    assert results[-1] == data
+    assert receiver.messages == 1
+
+
+def test_out_of_order_and_duplicates():
+    sender, receiver = Fragmenter(max_payload=10), Fragmenter(max_payload=10)
+    data = b"0123456789" * 5
+    parts = payloads(sender, data)
+    assert receiver.add(SOURCE, parts[0]) is None
+    assert receiver.add(SOURCE, parts[0]) is None
+    complete = [receiver.add(SOURCE, part) for part in reversed(parts[1:])]
+    assert complete[-1] == data
+
+
+def test_interleaved_sources():
+    sender, receiver = Fragmenter(max_payload=10), Fragmenter(max_payload=10)
+    a, b = payloads(sender, b"a" * 20), payloads(sender, b"b" * 20)
+    other = b"\x00" * 8
+    results = []
+    for part_a, part_b in zip(a, b):
+        results.append(receiver.add(SOURCE, part_a))
+        results.append(receiver.add(other, part_b))
+    assert results[-2:] == [b"a" * 20, b"b" * 20]
+
+
+def test_fragment_loss():
+    sender, receiver = Fragmenter(max_payload=10), Fragmenter(max_payload=10)
+    parts = payloads(sender, b"x" * 30)
+    for part in parts[:-1]:
+        assert receiver.add(SOURCE, part) is None
+    # The next message completes on its own, the incomplete one stays buffered
+    assert [receiver.add(SOURCE, part) for part in payloads(sender, b"y" * 12)][-1] == b"y" * 12
+    assert receiver.messages == 1
+
+
+def test_incomplete_message_expires():
+    sender, receiver = Fragmenter(max_payload=10, timeout=0.05), Fragmenter(max_payload=10, timeout=0.05)
+    parts = payloads(sender, b"x" * 30)
+    receiver.add(SOURCE, parts[0])
+    time.sleep(0.1)
+    receiver._next_expiry = 0.0     # Do not wait for the next scan
+    # The late fragments start a new message instead of completing the expired one
+    for part in parts[1:]:
+        assert receiver.add(SOURCE, part) is None
+    assert receiver.dropped == 1
+
+
+def test_max_messages_per_source():
+    sender, receiver = Fragmenter(max_payload=10, max_messages_per_source=2), Fragmenter(max_payload=10, max_messages_per_source=2)
+    for _ in range(3):
+        receiver.add(SOURCE, payloads(sender, b"x" * 30)[0])
+    assert receiver.dropped == 1
+
+
+def test_too_large():
+    with pytest.raises(ValueError):
+        list(Fragmenter(max_payload=10).fragments(b"x" * (0xFF * 6 + 1)))
+
+
+def test_xbee_fragments_round_trip(module):
+    xbee = XBee(module(loopback=True).port, fragmentation=True)
+    xbee.open()
+    try:
+        data = bytes(range(256)) + b"end"
+        status = xbee.transmit_data(data, "0013A200428396C0", retrieveStatus=True)
+        assert status is not None and status.status == 0x00
+        frame = xbee.retrieve_data()
+        assert bytes(frame.received_data) == data
+        assert xbee.fragmenter.messages == 1
+    finally:
+        xbee.close()
+
+
+def test_async_xbee_fragments_round_trip(module):
+    async def main():
+        xbee = AsyncXBee(module(loopback=True).port, fragmentation=True)
+        await xbee.open()
+        try:
+            await xbee.transmit(b"x" * 400, "0013A200428396C0")
+            frame = await xbee.retrieve_data()
+            assert bytes(frame.received_data) == b"x" * 400
+        finally:
+            await xbee.close()
+    asyncio.run(main())
+
+
+def test_paced_fragments_get_a_status(module):
+    xbee = XBee(module().port, fragmentation=True, transmit_rate=10000)
+    xbee.open()
+    try:
+        # 33 fragments, about 0.35 s at the rate limit
+        status = xbee.transmit_data(b"x" * 3000, DESTINATION, retrieveStatus=True)
+        assert status is not None and status.status == 0x00
+        assert len(xbee.pending) == 0
+    finally:
+        xbee.close()
+
+
+def test_failed_fragment_status_is_returned():
+    responder = FailingFragmentResponder()
+    responder.start()
+    xbee = XBee(responder.port, fragmentation=True)
+    xbee.open()
+    try:
+        status = xbee.transmit_data(b"x" * 300, DESTINATION, retrieveStatus=True)
+        assert status is not None and status.status == 0x01
+        assert xbee.transmit_data(b"x" * 50, DESTINATION, retrieveStatus=True).status == 0x00
+    finally:
+        xbee.close()
+        responder.stop()
+
+
+def test_async_paced_fragments(module):
+    async def main():
+        xbee = AsyncXBee(module().port, fragmentation=True, transmit_rate=10000)
+        await xbee.open()
+        try:
+            statuses = await asyncio.gather(*(xbee.transmit(b"x" * 3000, DESTINATION) for _ in range(2)))
+            assert all(status is not None and status.status == 0x00 for status in statuses)
+        finally:
+            await xbee.close()
+    asyncio.run(main())
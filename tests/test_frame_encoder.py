@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from xbee import AsyncXBee, XBee
+from xbee.utils import FrameEncoder, FrameParser
+
+DESTINATION = "0013A200428396C0"
+
+
+def reference_frame(data: bytes, address: str, frame_id: int) -> bytes:
+    """0x00 Tx Request built field by field."""
+    frame_data = bytes((0x00, frame_id)) + bytes.fromhex(address) + b"\x00" + data
+    return bytes((0x7E, len(frame_data) >> 8, len(frame_data) & 0xFF)) + frame_data + bytes((0xFF - (sum(frame_data) & 0xFF),))
+
+
+@pytest.mark.parametrize("data, frame_id", [(b"", 1), (b"hello", 0), (bytes(range(99)), 0xFF)])
+def test_encode_matches_reference(data, frame_id):
+    assert FrameEncoder().encode(data, DESTINATION, frame_id) == reference_frame(data, DESTINATION, frame_id)
+
+
+def test_prefix_is_part_of_the_payload():
+    assert FrameEncoder().encode(b"data", DESTINATION, 3, prefix=b"\xff\x01") == reference_frame(b"\xff\x01data", DESTINATION, 3)
+
+
+def test_encode_many_is_back_to_back():
+    messages = [(b"one", DESTINATION, 1), (b"two", "000000000000FFFF", 2), (b"", DESTINATION, 0)]
+    encoded = FrameEncoder().encode_many(messages)
+    assert encoded == b"".join(reference_frame(*message) for message in messages)
+    assert len(FrameParser().feed(encoded)) == 3
+
+
+def test_escaped_frames_parse_back():
+    data = b"\x7e\x7d\x11\x13"
+    encoded = FrameEncoder(escaped=True).encode(data, DESTINATION, 0x7D)
+    assert b"\x7e" not in encoded[1:]
+    assert FrameParser(escaped=True).feed(encoded) == [reference_frame(data, DESTINATION, 0x7D)[3:-1]]
+
+
+def test_invalid_address():
+    with pytest.raises(ValueError):
+        FrameEncoder().encode(b"data", "0013A200", 1)
+
+
+def test_transmit_many_sends_one_write(module):
+    responder = module()
+    xbee = XBee(responder.port)
+    xbee.open()
+    try:
+        xbee.transmit_many([f"message {i}" for i in range(20)], DESTINATION)
+        assert xbee.transmit_data("last", DESTINATION, retrieveStatus=True) is not None
+        assert [bytes(frame[11:]) for frame in responder.received[:20]] == [f"message {i}".encode() for i in range(20)]
+        assert sum(xbee.flush_frame_counts.values()) <= 2
+    finally:
+        xbee.close()
+
+
+def test_async_transmit_many_is_written(module):
+    responder = module()
+
+    async def main():
+        xbee = AsyncXBee(responder.port)
+        await xbee.open()
+        try:
+            xbee.transmit_many(["one", "two", "three"], DESTINATION)
+            assert await xbee.transmit("last", DESTINATION) is not None
+            assert [bytes(frame[11:]) for frame in responder.received] == [b"one", b"two", b"three", b"last"]
+        finally:
+            await xbee.close()
+    asyncio.run(main())
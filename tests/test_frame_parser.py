@@ -0,0 +1,131 @@
+from xbee import XBee
+from xbee.utils import EscapeCodec, FrameParser
+
+
+def frame(frame_data: bytes, escaped: bool = False) -> bytes:
+    raw = bytes((0x7E, len(frame_data) >> 8, len(frame_data) & 0xFF)) + frame_data + bytes((0xFF - (sum(frame_data) & 0xFF),))
+    if escaped:
+        return b"\x7e" + EscapeCodec.escape(raw[1:])
+    return raw
+
+
+class ChunkedSerial:
+    """Serial port stand-in handing back the given chunks, one per read."""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def read(self, size: int = 1) -> bytes:
+        return self.chunks.pop(0)
+
+
+def test_single_frame():
+    parser = FrameParser()
+    assert parser.feed(frame(b"\x89\x01\x00")) == [b"\x89\x01\x00"]
+    assert parser.frames == 1
+    assert parser.pending() == 0
+
+
+def test_frame_split_across_reads():
+    parser = FrameParser()
+    data = frame(b"\x90" + bytes(11) + b"hello")
+    for i in range(len(data) - 1):
+        assert parser.feed(data[i:i + 1]) == []
+    assert parser.pending() == len(data) - 1
+    assert parser.feed(data[-1:]) == [b"\x90" + bytes(11) + b"hello"]
+    assert parser.pending() == 0
+
+
+def test_several_frames_in_one_read():
+    parser = FrameParser()
+    data = frame(b"\x89\x01\x00") + frame(b"\x89\x02\x01") + frame(b"\x88\x03MY\x00")[:4]
+    assert parser.feed(data) == [b"\x89\x01\x00", b"\x89\x02\x01"]
+    assert parser.pending() == 4
+
+
+def test_corrupted_checksum_then_resync():
+    parser = FrameParser()
+    bad = bytearray(frame(b"\x89\x01\x00"))
+    bad[-1] ^= 0xFF
+    good = frame(b"\x89\x02\x00")
+    assert parser.feed(b"\x01\x02" + bytes(bad) + good) == [b"\x89\x02\x00"]
+    assert parser.checksum_errors == 1
+    assert parser.skipped_bytes == 2 + len(bad)
+    assert parser.frames == 1
+
+
+def test_oversized_length_is_noise():
+    parser = FrameParser(max_frame_length=16)
+    good = frame(b"\x89\x01\x00")
+    assert parser.feed(b"\x7e\xff\xff" + good) == [b"\x89\x01\x00"]
+    assert parser.skipped_bytes == 3
+
+
+def test_xbee_reassembles_frames_across_reads():
+    rx = frame(b"\x90" + bytes.fromhex("0013A200424366C7") + b"\xff\xfe\x01hello")
+    xbee = XBee()
+    xbee.ser = ChunkedSerial([rx[:5], rx[5:] + frame(b"\x89\x01\x00")[:2], frame(b"\x89\x01\x00")[2:]])
+
+    assert xbee._retrieve_data() == []
+    received = xbee._retrieve_data()
+    assert len(received) == 1 and bytes(received[0].received_data) == b"hello"
+    status = xbee._retrieve_data()
+    assert len(status) == 1 and status[0].frame_id == 0x01
+    assert xbee.x81x90_queue.get_nowait() is received[0]
+
+
+def test_escaped_frames():
+    parser = FrameParser(escaped=True)
+    frame_data = b"\x90" + bytes(11) + b"\x7e\x7d\x11\x13"
+    data = frame(frame_data, escaped=True)
+    # Split inside an escape sequence
+    split = data.index(b"\x7d", 1) + 1
+    assert parser.feed(data[:split]) == []
+    assert parser.feed(data[split:] + frame(b"\x89\x01\x00", escaped=True)) == [frame_data, b"\x89\x01\x00"]
+    assert parser.pending() == 0
+
+
+def test_escaped_corrupted_checksum_then_resync():
+    parser = FrameParser(escaped=True)
+    bad = bytearray(frame(b"\x89\x01\x00", escaped=True))
+    bad[-1] ^= 0x01
+    data = bytes(bad) + frame(b"\x89\x02\x00", escaped=True) + frame(b"\x89\x03\x00", escaped=True)
+    assert parser.feed(data) == [b"\x89\x02\x00", b"\x89\x03\x00"]
+    assert parser.checksum_errors == 1
+
+
+def test_set_escaped_keeps_counters():
+    parser = FrameParser()
+    parser.feed(frame(b"\x89\x01\x00") + b"\x7e\x00")
+    parser.set_escaped(True)
+    assert parser.feed(frame(b"\x89\x02\x00", escaped=True) + frame(b"\x89\x03\x00", escaped=True)) == [b"\x89\x02\x00", b"\x89\x03\x00"]
+    assert parser.escaped
+    assert parser.frames == 3
+
+
+def test_xbee_escaped_mode(module):
+    peer = module(escaped=True, loopback=True)
+    xbee = XBee(peer.port, api_mode=2)
+    xbee.open()
+    try:
+        status = xbee.transmit_data(b"\x7e\x7d\x11\x13", "0013A200428396C0", retrieveStatus=True)
+        assert status is not None and status.status == 0
+        received = xbee.x81x90_queue.get(timeout=1)
+        assert bytes(received.received_data) == b"\x7e\x7d\x11\x13"
+    finally:
+        xbee.close()
+
+
+def test_xbee_detects_api_mode_on_open(module):
+    peer = module(escaped=True, at_values={"AP": b"\x02"})
+    xbee = XBee(peer.port, api_mode=None)
+    xbee.open()
+    try:
+        assert xbee.api_mode == 2 and xbee.encoder.escaped
+        assert xbee.request_at_command_data("AP").data == b"\x02"
+    finally:
+        xbee.close()
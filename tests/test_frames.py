@@ -0,0 +1,58 @@
+import pytest
+
+from xbee import XBee
+from xbee.frames import x81, x88, x89, x90
+
+SOURCE_64 = bytes.fromhex("0013A200424366C7")
+
+
+@pytest.fixture(scope="module")
+def xbee():
+    return XBee()
+
+
+def test_frames_are_immutable():
+    frame = x89(0x89, 1, 0x00)
+    with pytest.raises(AttributeError):
+        frame.status = 0x01
+    with pytest.raises(AttributeError):
+        del frame.frame_id
+    assert not hasattr(frame, "__dict__")
+
+
+def test_0x90_fields_are_views_of_the_frame_data(xbee):
+    frame_data = bytearray(b"\x90" + SOURCE_64 + b"\xff\xfe\x01hello")
+    frame = xbee._0x90(frame_data)
+    assert isinstance(frame.address_64, memoryview) and bytes(frame.address_64) == SOURCE_64
+    assert bytes(frame.address_16) == b"\xff\xfe"
+    assert frame.receive_options == 0x01
+    assert frame.payload.obj is frame_data
+    # Copied to bytes once, then cached
+    assert frame.received_data == b"hello"
+    assert frame.received_data is frame.received_data
+
+
+def test_0x81_payload_is_decoded_on_access(xbee):
+    frame = xbee._0x81(b"\x81\x12\x34\x28\x00hello")
+    assert bytes(frame.source_address) == b"\x12\x34"
+    assert frame.rssi == -40
+    assert frame.data == "hello"
+    assert xbee._0x81(b"\x81\x12\x34\x28\x00\xff\xfe").data == b"\xff\xfe"
+
+
+def test_0x88_data(xbee):
+    frame = xbee._0x88(b"\x88\x05MY\x00\x12\x34")
+    assert frame.frame_id == 5
+    assert frame.status == 0x00
+    assert frame.data == b"\x12\x34"
+
+
+def test_frames_built_from_values():
+    assert x81(0x81, b"\x12\x34", -40, 0, "text").data == "text"
+    assert x88(0x88, 1, "MY", 0, b"\x12\x34").data == b"\x12\x34"
+    assert x90(0x90, SOURCE_64, b"\xff\xfe", 1, b"data").received_data == b"data"
+
+
+def test_repr_shows_views_as_hex(xbee):
+    frame = xbee._0x90(b"\x90" + SOURCE_64 + b"\xff\xfe\x01hi")
+    assert "address_64=0013a200424366c7" in repr(frame)
@@ -0,0 +1,43 @@
+import threading
+import time
+
+import pytest
+
+from xbee import XBee
+
+DESTINATION = "0013A200428396C0"
+
+
+@pytest.fixture
+def xbee(module):
+    responder = module(at_values={"MY": b"\x12\x34"})
+    xbee = XBee(responder.port)
+    xbee.open()
+    yield xbee
+    xbee.close()
+
+
+def test_transmit_status_round_trip(xbee):
+    status = xbee.transmit_data("hello", DESTINATION, retrieveStatus=True)
+    assert status is not None and status.status == 0x00
+
+
+def test_at_command_round_trip(xbee):
+    response = xbee.request_at_command_data("MY")
+    assert response is not None and bytes(response.data) == b"\x12\x34"
+
+
+def test_idle_io_thread_does_not_spin(xbee):
+    start = time.process_time()
+    time.sleep(0.3)
+    assert time.process_time() - start < 0.1
+
+
+def test_close_stops_io_thread(module):
+    xbee = XBee(module().port)
+    threads = threading.active_count()
+    xbee.open()
+    assert threading.active_count() == threads + 1
+    xbee.close()
+    assert threading.active_count() == threads
+    assert xbee.ser is None
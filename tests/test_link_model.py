@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from xbee import XBeeEmulator
+from xbee.utils import LinkModel, PanBus
+
+GCS = "0013A200424366C7"
+NEAR = "0013A20042435EE5"
+FAR = "0013A20042435EE6"
+
+
+def model(**kwargs) -> LinkModel:
+    link = LinkModel(shadowing=0.0, seed=1, **kwargs)
+    link.place(GCS, 0, 0)
+    link.place(NEAR, 10, 0)
+    link.place(FAR, 5000, 0)
+    return link
+
+
+def test_airtime():
+    link = LinkModel()
+    assert link.airtime(10) == pytest.approx((6 + 23 + 10) * 8 / 250_000)
+    assert link.airtime(10, ack=True) > link.airtime(10)
+    assert LinkModel(data_rate=125_000).airtime(10) == pytest.approx(2 * link.airtime(10))
+
+
+def test_rssi_falls_with_distance():
+    link = model()
+    assert link.rssi(GCS, NEAR) > link.rssi(GCS, FAR)
+    assert link.rssi(GCS, NEAR) == pytest.approx(-40.0 - 27.0)
+    assert link.distance(GCS, "0013A20000000000") == link.default_distance
+
+
+def test_unicast_statuses():
+    link = model()
+    assert link.transmit(3332, GCS, NEAR, 10, broadcast=False)[0] == 0x00
+    status, _ = link.transmit(3332, GCS, FAR, 10, broadcast=False)
+    assert status == LinkModel.NO_ACK
+    assert link.no_ack == 1
+    assert link.attempts == 1 + link.retries + 1
+
+
+def test_frames_of_a_radio_queue_up():
+    link = model()
+    ends = [link.transmit(3332, GCS, NEAR, 80, broadcast=False)[1] for _ in range(5)]
+    assert ends == sorted(ends)
+    assert ends[-1] - time.monotonic() >= 4 * link.airtime(80, ack=True)
+
+
+def test_busy_channel_fails_with_cca_failure():
+    link = model()
+    link._channel_busy_until["3332"] = time.monotonic() + 10
+    assert link.transmit(3332, GCS, NEAR, 10, broadcast=False)[0] == LinkModel.CCA_FAILURE
+    assert link.cca_failures == 1
+
+
+def test_schedule():
+    link = model()
+    called = threading.Event()
+    start = time.monotonic()
+    link.schedule(start + 0.05, called.set)
+    assert called.wait(1)
+    assert time.monotonic() - start >= 0.05
+
+
+@pytest.fixture
+def radios():
+    bus = PanBus()
+    link = model()
+    created = {mac: XBeeEmulator(mac_address=mac, transport=bus, link_model=link) for mac in (GCS, NEAR, FAR)}
+    for radio in created.values():
+        radio.open()
+    yield created
+    for radio in created.values():
+        radio.close()
+
+
+def test_emulators_over_the_model(radios):
+    gcs = radios[GCS]
+    start = time.monotonic()
+    assert gcs.transmit_data("hello", NEAR, retrieveStatus=True).status == 0x00
+    assert time.monotonic() - start >= gcs.link_model.airtime(5, ack=True)
+    assert str(radios[NEAR].retrieve_data().received_data) == "hello"
+
+    assert gcs.transmit_data("hello", FAR, retrieveStatus=True).status == LinkModel.NO_ACK
+    assert radios[FAR].retrieve_data() is None
+
+
+def test_reliable_attempts_get_the_model_status(radios):
+    gcs = radios[GCS]
+    assert gcs.transmit_reliable("hello", NEAR).result(timeout=5).status == 0x00
+    status = gcs.transmit_reliable("hello", FAR).result(timeout=5)
+    assert status.status == LinkModel.NO_ACK
+    assert gcs.reliable_sender.retransmissions == gcs.reliable_sender.retries
@@ -0,0 +1,99 @@
+import logging
+import threading
+
+from xbee import XBee
+from xbee.utils import LogSink
+from xbee.utils.LogSink import HexDump
+
+
+class RecordingLogger:
+    """Logger stand-in keeping every written message."""
+    DEBUG, INFO, WARNING, ERROR = "DEBUG", "INFO", "WARNING", "ERROR"
+
+    def __init__(self):
+        self.messages = []
+
+    def write(self, message, level=None):
+        self.messages.append(message)
+
+
+class Formatted:
+    """Format argument recording the thread that formats it."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread())
+        return "formatted"
+
+
+def sink_threads() -> int:
+    return sum(thread.name == "XBeeLogSink" for thread in threading.enumerate())
+
+
+def test_records_are_formatted_on_the_sink_thread():
+    written = []
+    argument = Formatted()
+    sink = LogSink()
+    sink.put(written.append, "value: %s", (argument,))
+    sink.put(written.append, "plain")
+    sink.flush()
+    assert written == ["value: formatted", "plain"]
+    assert argument.threads[0].name == "XBeeLogSink"
+    sink.close()
+
+
+def test_full_queue_drops_records():
+    release = threading.Event()
+    sink = LogSink(maxsize=2)
+    sink.put(lambda text: release.wait(), "blocks the sink thread")
+    written = []
+    for i in range(10):
+        sink.put(written.append, "record %d", (i,))
+    assert sink.dropped >= 7
+    release.set()
+    sink.close()
+    assert len(written) + sink.dropped == 10
+
+
+def test_close_stops_the_thread():
+    threads = sink_threads()
+    written = []
+    sink = LogSink()
+    sink.put(written.append, "before close")
+    sink.close()
+    assert written == ["before close"]
+    assert sink_threads() == threads
+    sink.put(written.append, "after close")
+    assert sink.dropped == 1
+    sink.close()
+
+
+def test_hex_dump_is_formatted_lazily():
+    assert str(HexDump(b"\x7e\x00\x04")) == "7e 00 04"
+    assert str(HexDump(memoryview(b"\x01\xff"))) == "01 ff"
+
+
+def test_messages_below_log_level_are_not_formatted():
+    argument = Formatted()
+    logger = RecordingLogger()
+    xbee = XBee(logger=logger, log_level=logging.INFO)
+    xbee._log(logging.DEBUG, "skipped: %s", argument)
+    assert argument.threads == []
+    xbee._log(logging.WARNING, "written: %s", argument)
+    assert logger.messages[-1] == "written: formatted"
+
+
+def test_xbee_stops_the_sink_on_close(module):
+    threads = sink_threads()
+    logger = RecordingLogger()
+    xbee = XBee(module().port, logger=logger, log_async=True)
+    for _ in range(2):
+        xbee.open()
+        assert sink_threads() == threads + 1
+        xbee._log(logging.WARNING, "queued: %d", 1)
+        xbee.close()
+        assert sink_threads() == threads
+        assert "queued: 1" in logger.messages
+        logger.messages.clear()
@@ -0,0 +1,83 @@
+import asyncio
+import math
+
+import pytest
+
+from xbee import AsyncXBee, XBee
+from xbee.utils import Metrics
+
+DESTINATION = "0013A200428396C0"
+
+
+def test_snapshot():
+    metrics = Metrics()
+    frames = metrics.counter("frames", "Frames.", label="frame_type")
+    depth = metrics.gauge("depth", "Depth.", function=lambda: 7)
+    latency = metrics.histogram("latency", "Latency.", buckets=(0.1, 1.0))
+    frames.inc(2, "0x90")
+    frames.inc(1, "0x89")
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["frames"] == {"0x90": 2, "0x89": 1}
+    assert snapshot["depth"] == 7 and depth.value() == 7
+    assert snapshot["latency"] == {"count": 2, "sum": 0.55, "buckets": {0.1: 1, 1.0: 2, math.inf: 2}}
+    assert 0.1 < latency.quantile(0.99) <= 1.0
+    assert metrics.histogram("empty").quantile(0.5) is None
+
+    with pytest.raises(ValueError):
+        metrics.counter("frames")
+
+
+def test_prometheus():
+    metrics = Metrics(labels={"radio": "north"})
+    metrics.counter("frames", 'Received "frames".', label="frame_type").inc(3, "0x90")
+    metrics.histogram("latency", "Latency.", buckets=(0.1,)).observe(0.05)
+
+    lines = metrics.prometheus().splitlines()
+    assert '# HELP xbee_frames_total Received "frames".' in lines
+    assert "# TYPE xbee_frames_total counter" in lines
+    assert 'xbee_frames_total{radio="north",frame_type="0x90"} 3' in lines
+    assert 'xbee_latency_bucket{radio="north",le="0.1"} 1' in lines
+    assert 'xbee_latency_bucket{radio="north",le="+Inf"} 1' in lines
+    assert 'xbee_latency_count{radio="north"} 1' in lines
+
+
+def test_xbee_counts_frames_and_latency(module):
+    xbee = XBee(module(loopback=True).port)
+    xbee.open()
+    try:
+        for i in range(3):
+            assert xbee.transmit_data(f"message {i}", DESTINATION, retrieveStatus=True) is not None
+        assert xbee.request_at_command_data("MY") is not None
+        for _ in range(3):
+            xbee.retrieve_data()
+    finally:
+        xbee.close()
+
+    snapshot = xbee.metrics.snapshot()
+    assert snapshot["tx_frames"] == {"0x00": 3, "0x08": 1}
+    assert snapshot["tx_status"] == {"0x00": 3}
+    assert snapshot["at_retries"] == 0 and snapshot["at_timeouts"] == 0
+    assert snapshot["tx_bytes"] > 0 and snapshot["rx_bytes"] > 0
+    assert snapshot["transmit_status_seconds"]["count"] == 3
+    assert snapshot["at_command_seconds"]["count"] == 1
+
+
+def test_async_xbee_counts_frames(module):
+    async def main():
+        xbee = AsyncXBee(module().port)
+        await xbee.open()
+        try:
+            assert await xbee.transmit("hello", DESTINATION) is not None
+            assert await xbee.at_command("MY") is not None
+        finally:
+            await xbee.close()
+        return xbee.metrics.snapshot()
+
+    snapshot = asyncio.run(main())
+    assert snapshot["tx_frames"] == {"0x00": 1, "0x08": 1}
+    assert snapshot["tx_status"] == {"0x00": 1}
+    assert snapshot["transmit_status_seconds"]["count"] == 1
+    assert snapshot["at_command_seconds"]["count"] == 1
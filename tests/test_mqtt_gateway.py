@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+
+from xbee import XBeeEmulator
+from xbee.utils import MqttGateway
+
+A = "0013A20000000001"
+B = "0013A20000000002"
+C = "0013A20000000003"
+
+
+class LoopbackBroker:
+    """Stands in for the paho client of the gateway's MqttClient: every publish is received back at once."""
+
+    def __init__(self, mqtt):
+        self.mqtt = mqtt
+        self.connects = 0
+        self.published = []
+
+    def connect(self, host, port, keepalive):
+        self.connects += 1
+        self.mqtt._on_connect(self, None, None, 0, None)
+
+    def loop_start(self):
+        pass
+
+    def loop_stop(self):
+        pass
+
+    def disconnect(self):
+        self.mqtt._on_disconnect(self, None, None, 0, None)
+
+    def subscribe(self, topic, qos=0):
+        pass
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        self.published.append(topic)
+        self.mqtt._on_message(self, None, SimpleNamespace(topic=topic, payload=payload))
+
+
+@pytest.fixture
+def gateway():
+    gateway = MqttGateway(3332, "broker.invalid", use_tls=False, username="gateway")
+    gateway.mqtt.client = LoopbackBroker(gateway.mqtt)
+    return gateway
+
+
+def test_emulators_share_one_connection(gateway):
+    radios = [XBeeEmulator(mac_address=mac, transport=gateway) for mac in (A, B, C)]
+    for radio in radios:
+        radio.open()
+    a, b, c = radios
+    try:
+        assert gateway.mqtt.client.connects == 1
+        assert sorted(gateway.endpoints()) == [A, B, C]
+
+        assert a.transmit_data("hello", B, retrieveStatus=True).status == 0x00
+        assert str(b.retrieve_data().received_data) == "hello"
+        assert c.x81x90_queue.empty()
+
+        a.transmit_data("everyone")
+        assert str(b.retrieve_data().received_data) == "everyone"
+        assert str(c.retrieve_data().received_data) == "everyone"
+        assert a.x81x90_queue.empty()
+
+        a.transmit_many(["one", "two"], C)
+        assert [str(c.retrieve_data().received_data) for _ in range(2)] == ["one", "two"]
+        assert gateway.mqtt.client.published[0] == f"xbee/pan/3332/rx/{B}"
+    finally:
+        for radio in radios:
+            radio.close()
+    assert gateway.endpoints() == []
+
+
+def test_unrouted_unicast(gateway):
+    a = XBeeEmulator(mac_address=A, transport=gateway)
+    a.open()
+    try:
+        a.transmit_data("lost", "0013A200000000FF")
+        assert gateway.unrouted == 1 and gateway.received == 1
+    finally:
+        a.close()
+
+
+def test_other_pan_rejected(gateway):
+    with pytest.raises(ValueError):
+        XBeeEmulator(mac_address=A, pan_id=1, transport=gateway)
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from xbee import AsyncXBeeEmulator, XBeeEmulator
+from xbee.utils import PanBus
+
+A = "0013A20000000001"
+B = "0013A20000000002"
+C = "0013A20000000003"
+
+
+def test_unicast_broadcast_and_detach():
+    bus = PanBus()
+    received = {mac: [] for mac in (A, B, C)}
+    clients = {mac: bus.client(3332, mac, on_rf=lambda topic, payload, mac=mac: received[mac].append((topic, payload)))
+               for mac in (A, B, C)}
+    other_pan = bus.client(1, "0013A200000000FF", on_rf=lambda topic, payload: pytest.fail("other PAN"))
+    for client in (*clients.values(), other_pan):
+        client.connect()
+        client.subscribe_rf()
+
+    clients[A].publish_unicast(B.lower(), b"unicast")
+    clients[A].publish_broadcast(b"broadcast")
+    assert received[B] == [(f"xbee/pan/3332/rx/{B}", b"unicast"), ("xbee/pan/3332/broadcast", b"broadcast")]
+    assert received[C] == [("xbee/pan/3332/broadcast", b"broadcast")]
+    assert received[A] == []
+
+    clients[B].disconnect()
+    clients[A].publish_unicast(B, b"lost")
+    assert bus.nodes(3332) == [A, C]
+    assert (bus.unicasts, bus.broadcasts, bus.undeliverable) == (1, 1, 1)
+
+
+@pytest.fixture
+def radios():
+    bus = PanBus()
+    opened = []
+
+    def create(*macs, cls=XBeeEmulator):
+        created = [cls(mac_address=mac, transport=bus) for mac in macs]
+        opened.extend(radio for radio in created if cls is XBeeEmulator)
+        return created
+
+    yield create
+    for radio in opened:
+        radio.close()
+
+
+def test_emulators_exchange_frames(radios):
+    a, b, c = radios(A, B, C)
+    for radio in (a, b, c):
+        radio.open()
+
+    assert a.transmit_data("hello", B, retrieveStatus=True).status == 0x00
+    assert str(b.retrieve_data().received_data) == "hello"
+    assert c.x81x90_queue.empty()
+
+    a.transmit_data("everyone")
+    assert str(b.retrieve_data().received_data) == "everyone"
+    assert str(c.retrieve_data().received_data) == "everyone"
+    assert a.x81x90_queue.empty()
+
+
+def test_async_emulators(radios):
+    a, b = radios(A, B, cls=AsyncXBeeEmulator)
+
+    async def main():
+        await a.open()
+        await b.open()
+        try:
+            status = await a.transmit("hello", B)
+            assert status is not None and status.status == 0x00
+            frame = await asyncio.wait_for(b.retrieve_data(), 1)
+            assert str(frame.received_data) == "hello"
+        finally:
+            await a.close()
+            await b.close()
+
+    asyncio.run(main())
@@ -0,0 +1,163 @@
+import asyncio
+import os
+
+import pytest
+
+from xbee import AsyncXBee, XBee
+from xbee.utils import EchoResponder, ParameterCache
+
+VALUES = {"SH": b"\x00\x13\xa2\x00", "SL": b"\x42\x43\x66\xc7", "VR": b"\x20\x0f",
+          "ID": b"\x0d\x04", "CH": b"\x0c", "MY": b"\xff\xfe", "AP": b"\x01", "CE": b"\x00", "NI": None}
+
+
+def test_key():
+    assert ParameterCache.key(VALUES) == "0013A200_424366C7_200F"
+    assert ParameterCache.key({"SH": b"\x00", "SL": b"\x00"}) is None
+
+
+def test_save_and_load(tmp_path):
+    cache = ParameterCache(str(tmp_path / "cache"))
+    key = ParameterCache.key(VALUES)
+    assert cache.load(key) is None
+    cache.save(key, VALUES)
+    assert os.path.exists(cache.path(key))
+    assert not os.path.exists(cache.path(key) + ".tmp")
+    assert cache.load(key) == VALUES
+
+
+def test_corrupted_snapshot(tmp_path):
+    cache = ParameterCache(str(tmp_path))
+    with open(cache.path("key"), "w") as file:
+        file.write("{not json")
+    assert cache.load("key") is None
+
+
+def test_matches(tmp_path):
+    cache = ParameterCache(str(tmp_path))
+    assert cache.matches(VALUES, dict(VALUES))
+    assert not cache.matches(VALUES, dict(VALUES, CH=b"\x0d"))
+    # Only the fingerprint parameters are compared
+    assert cache.matches(VALUES, dict(VALUES, NI=b"radio"))
+
+
+def at_values() -> dict:
+    values = {id: value for id, value in VALUES.items() if value is not None}
+    values.update(PL=b"\x04", RR=b"\x03")
+    return values
+
+
+def write_config(tmp_path) -> str:
+    path = tmp_path / "config.txt"
+    path.write_text("* CH - Channel\n* ID - Network PAN ID\n* PL - TX Power Level\n* RR - XBee Retries\n")
+    return str(path)
+
+
+def commands(responder) -> list:
+    return [bytes(frame_data[2:4]).decode() for frame_data in responder.received if frame_data[0] == 0x08]
+
+
+def test_xbee_serves_config_from_cache(module, tmp_path):
+    config_file = write_config(tmp_path)
+    cache = str(tmp_path / "cache")
+    for expected_requests in (2, 0):
+        responder = module(at_values=at_values())
+        xbee = XBee(responder.port, config_file=config_file, parameter_cache=cache, open_delay=0)
+        xbee.open()
+        try:
+            assert xbee.config["CH"] == b"\x0c" and xbee.config["SL"] == VALUES["SL"]
+            probe = set(ParameterCache.KEY_PARAMETERS + xbee.parameter_cache.fingerprint)
+            assert len([id for id in commands(responder) if id not in probe]) == expected_requests
+        finally:
+            xbee.close()
+
+
+def test_xbee_applies_only_changed_parameters(module, tmp_path):
+    responder = module(at_values=at_values())
+    xbee = XBee(responder.port, config_file=write_config(tmp_path), open_delay=0,
+                desired_config={"CH": 0x0C, "ID": 0x3332, "NI": "NODE"})
+    xbee.open()
+    try:
+        sent = commands(responder)
+        assert sorted(sent[-4:-2]) == ["ID", "NI"] and sent[-2:] == ["AC", "WR"]
+        assert responder.at_values["ID"] == b"\x33\x32" and responder.at_values["NI"] == b"NODE"
+        assert xbee.apply_config({"ID": 0x3332, "CH": b"\x0c"}) == {}
+    finally:
+        xbee.close()
+
+
+def test_async_xbee_applies_config(module, tmp_path):
+    responder = module(at_values=at_values())
+    config_file = write_config(tmp_path)
+
+    async def main():
+        xbee = AsyncXBee(responder.port, config_file=config_file, parameter_cache=str(tmp_path / "cache"),
+                         open_delay=0, desired_config={"CH": 0x0F})
+        await xbee.open()
+        try:
+            assert responder.at_values["CH"] == b"\x0f"
+            assert xbee.config["CH"] == b"\x0f"
+            assert commands(responder)[-2:] == ["AC", "WR"]
+            assert await xbee.apply_config({"CH": 0x0F}) == {}
+        finally:
+            await xbee.close()
+
+    asyncio.run(main())
+    assert ParameterCache(str(tmp_path / "cache")).load(ParameterCache.key(VALUES))["CH"] == b"\x0f"
+
+
+def test_async_xbee_rereads_stale_snapshot(module, tmp_path):
+    config_file = write_config(tmp_path)
+    cache = str(tmp_path / "cache")
+
+    async def load(values: dict) -> list:
+        responder = module(at_values=values)
+        xbee = AsyncXBee(responder.port, config_file=config_file, parameter_cache=cache, open_delay=0)
+        await xbee.open()
+        await xbee.close()
+        probe = set(ParameterCache.KEY_PARAMETERS + xbee.parameter_cache.fingerprint)
+        return [id for id in commands(responder) if id not in probe]
+
+    assert asyncio.run(load(at_values())) == ["PL", "RR"]
+    assert asyncio.run(load(at_values())) == []
+    # The channel changed since the snapshot was saved
+    assert sorted(asyncio.run(load(dict(at_values(), CH=b"\x0d")))) == ["PL", "RR"]
+
+
+class RejectingResponder(EchoResponder):
+    """EchoResponder answering one AT command with an error status (0x01)."""
+
+    def __init__(self, rejected: str, **kwargs):
+        super().__init__(**kwargs)
+        self.rejected = rejected.encode()
+
+    def _respond(self, frame_data: bytes) -> bytes:
+        if frame_data[0] == 0x08 and bytes(frame_data[2:4]) == self.rejected:
+            return self._frame(bytes((0x88, frame_data[1])) + self.rejected + b"\x01")
+        return super()._respond(frame_data)
+
+
+@pytest.mark.parametrize("rejected, message", [("PL", "Unable to set parameters PL"), ("AC", "Command failed: AC")])
+def test_rejected_parameter_raises(rejected, message):
+    responder = RejectingResponder(rejected, at_values=at_values())
+    responder.start()
+
+    async def main():
+        xbee = AsyncXBee(responder.port, open_delay=0)
+        await xbee.open()
+        try:
+            with pytest.raises(Exception, match=message):
+                await xbee.apply_config({"PL": 0x03})   # The sync XBee may have set PL to 2
+        finally:
+            await xbee.close()
+
+    xbee = XBee(responder.port, open_delay=0)
+    try:
+        xbee.open()
+        try:
+            with pytest.raises(Exception, match=message):
+                xbee.apply_config({"PL": 0x02})
+        finally:
+            xbee.close()
+        asyncio.run(main())
+    finally:
+        responder.stop()
@@ -0,0 +1,79 @@
+import threading
+import time
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from xbee import XBee
+from xbee.utils import PendingResponses
+
+
+def test_resolve():
+    pending = PendingResponses()
+    future = pending.register(1, timeout=1.0)
+    assert 1 in pending
+    assert pending.resolve(1, "frame")
+    assert future.result(0) == "frame"
+    assert 1 not in pending
+    assert not pending.resolve(1, "late")
+
+
+def test_wait_from_another_thread():
+    pending = PendingResponses()
+    future = pending.register(7, timeout=1.0)
+    threading.Timer(0.01, pending.resolve, (7, "frame")).start()
+    assert pending.wait(7, future, timeout=1.0) == "frame"
+    assert len(pending) == 0
+
+
+def test_wait_timeout_discards():
+    pending = PendingResponses()
+    future = pending.register(2, timeout=1.0)
+    assert pending.wait(2, future, timeout=0.01) is None
+    assert 2 not in pending
+
+
+def test_discard_only_own_future():
+    pending = PendingResponses()
+    old = pending.register(3, timeout=1.0)
+    new = pending.register(3, timeout=1.0)
+    pending.discard(3, old)
+    assert 3 in pending
+    pending.discard(3, new)
+    assert 3 not in pending
+
+
+def test_reap_expired():
+    pending = PendingResponses()
+    expired = pending.register(4, timeout=0.0)
+    alive = pending.register(5, timeout=10.0)
+    assert pending.reap(time.monotonic()) == 1
+    assert pending.expired == 1
+    with pytest.raises(TimeoutError):
+        expired.result(0)
+    assert not alive.done()
+    assert 5 in pending
+
+
+def test_concurrent_requests_get_their_own_response(module):
+    xbee = XBee(module(at_values={"MY": b"\x12\x34"}).port)
+    xbee.open()
+    try:
+        results = {}
+
+        def transmit(i):
+            results[i] = xbee.transmit_data(f"message {i}", "0013A200428396C0", retrieveStatus=True)
+
+        threads = [threading.Thread(target=transmit, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        response = xbee.request_at_command_data("MY")
+        for thread in threads:
+            thread.join()
+
+        assert bytes(response.data) == b"\x12\x34"
+        assert all(status is not None and status.status == 0x00 for status in results.values())
+        assert len({status.frame_id for status in results.values()}) == 20
+        assert len(xbee.pending) == 0
+    finally:
+        xbee.close()
@@ -0,0 +1,74 @@
+import asyncio
+
+from xbee import AsyncXBee, XBee
+from xbee.utils import EchoResponder
+
+AT_VALUES = {"CH": b"\x0c", "ID": b"\x33\x32", "NI": b"NODE", "MY": b"\x12\x34"}
+
+
+class DroppingResponder(EchoResponder):
+    """Ignores the first AT command request for each identifier in drop."""
+
+    def __init__(self, drop, **kwargs):
+        super().__init__(**kwargs)
+        self.drop = set(drop)
+        self.requests = []
+
+    def _respond(self, frame_data: bytes) -> bytes:
+        if frame_data[0] == 0x08:
+            id = bytes(frame_data[2:4]).decode()
+            self.requests.append(id)
+            if id in self.drop:
+                self.drop.discard(id)
+                return b""
+        return super()._respond(frame_data)
+
+
+def write_config(tmp_path) -> str:
+    path = tmp_path / "config.txt"
+    path.write_text("#Networking\n* CH - Channel\n* ID - Network PAN ID\n\n#Addressing\n* MY - 16-bit Source Address\n* NI - Node Identifier\n")
+    return str(path)
+
+
+def test_request_at_commands_resends_only_unanswered():
+    responder = DroppingResponder({"ID"}, at_values=AT_VALUES)
+    xbee = XBee(responder.start())
+    xbee.open()
+    try:
+        responses = xbee.request_at_commands(["CH", "ID", "NI", "XX"], retry=1, window=2)
+        assert list(responses) == ["CH", "ID", "NI", "XX"]
+        assert {id: bytes(response.data) for id, response in responses.items()} == \
+            {"CH": b"\x0c", "ID": b"\x33\x32", "NI": b"NODE", "XX": b"\x00"}
+        assert sorted(responder.requests) == ["CH", "ID", "ID", "NI", "XX"]
+    finally:
+        xbee.close()
+        responder.stop()
+
+
+def test_read_config(module, tmp_path):
+    xbee = XBee(module(at_values=AT_VALUES).port)
+    xbee.open()
+    try:
+        config = xbee.read_config(write_config(tmp_path))
+        assert {id: bytes(value) for id, value in config.items()} == {id: AT_VALUES[id] for id in ("CH", "ID", "MY", "NI")}
+    finally:
+        xbee.close()
+
+
+def test_async_read_config(module, tmp_path):
+    responder = module(at_values=AT_VALUES)
+    filename = write_config(tmp_path)
+
+    async def main():
+        xbee = AsyncXBee(responder.port)
+        await xbee.open()
+        try:
+            config = await xbee.read_config(filename)
+            assert list(config) == ["CH", "ID", "MY", "NI"]
+            assert bytes(config["NI"]) == b"NODE"
+            responses = await xbee.request_at_commands(["CH", "CH", "MY"], window=1)
+            assert list(responses) == ["CH", "MY"]
+        finally:
+            await xbee.close()
+
+    asyncio.run(main())
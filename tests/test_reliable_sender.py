@@ -0,0 +1,153 @@
+import asyncio
+import logging
+
+import pytest
+
+from xbee import AsyncXBee, XBee
+from xbee.utils import EchoResponder
+
+pytest.importorskip("pty")
+
+DESTINATION = "0013A200428396C0"
+
+
+class FlakyResponder(EchoResponder):
+    """Ignores the first silent transmit requests, then answers the next failures with a no ACK status (0x01)."""
+
+    def __init__(self, failures: int, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.silent = 0
+
+    def _respond(self, frame_data: bytes) -> bytes:
+        if frame_data[0] == 0x00 and self.silent > 0:
+            self.silent -= 1
+            return b""
+        if frame_data[0] == 0x00 and self.failures > 0:
+            self.failures -= 1
+            return self._frame(bytes((0x89, frame_data[1], 0x01)))
+        return super()._respond(frame_data)
+
+
+@pytest.fixture
+def radio():
+    def start(responder: EchoResponder, **kwargs):
+        xbee = XBee(responder.start(), log_level=logging.WARNING, **kwargs)
+        xbee.open()
+        opened.append((xbee, responder))
+        return xbee
+
+    opened = []
+    yield start
+    for xbee, responder in opened:
+        xbee.close()
+        responder.stop()
+
+
+def test_round_trip(radio):
+    xbee = radio(EchoResponder())
+    status = xbee.transmit_data("hello", DESTINATION, retrieveStatus=True)
+    assert status is not None and status.status == 0x00
+
+
+def test_retry_then_success(radio):
+    responder = FlakyResponder(failures=2)
+    xbee = radio(responder)
+    xbee.reliable_window = 1
+
+    status = xbee.transmit_reliable("hello", DESTINATION).result(timeout=5)
+    assert status.status == 0x00
+    sender = xbee.reliable_sender
+    assert sender.sent == 3
+    assert sender.retransmissions == 2
+    assert sender.delivered == 1
+    assert sender.pending() == 0
+
+
+def test_retries_exhausted(radio):
+    xbee = radio(EchoResponder(status=0x01))
+    status = xbee.transmit_reliable("hello", DESTINATION).result(timeout=5)
+    assert status.status == 0x01
+    assert xbee.reliable_sender.sent == xbee.reliable_sender.retries + 1
+    assert xbee.reliable_sender.failed == 1
+
+
+def test_window(radio):
+    responder = FlakyResponder(failures=5)
+    xbee = radio(responder, reliable_window=4)
+    futures = [xbee.transmit_reliable(f"message {i}", DESTINATION) for i in range(20)]
+    assert all(future.result(timeout=5).status == 0x00 for future in futures)
+    assert xbee.reliable_sender.delivered == 20
+    assert xbee.reliable_sender.retransmissions == 5
+
+
+def test_missing_status_is_retransmitted(radio):
+    responder = FlakyResponder(failures=0)
+    responder.silent = 1
+    xbee = radio(responder)
+    xbee.status_timeout = 0.1
+    status = xbee.transmit_reliable("hello", DESTINATION).result(timeout=5)
+    assert status.status == 0x00
+    assert xbee.reliable_sender.retransmissions == 1
+
+
+def run_async(responder: EchoResponder, test, **kwargs):
+    """Open an AsyncXBee on responder, run test(xbee) on a new event loop and close both."""
+    async def main():
+        xbee = AsyncXBee(responder.start(), log_level=logging.WARNING, **kwargs)
+        await xbee.open()
+        try:
+            return await test(xbee)
+        finally:
+            await xbee.close()
+    try:
+        return asyncio.run(main())
+    finally:
+        responder.stop()
+
+
+def test_async_retry_then_success():
+    responder = FlakyResponder(failures=2)
+    responder.silent = 1
+
+    async def test(xbee):
+        xbee.status_timeout = 0.1
+        return await xbee.transmit_reliable("hello", DESTINATION)
+
+    assert run_async(responder, test).status == 0x00
+    assert responder.failures == 0 and responder.silent == 0
+
+
+def test_async_retries_exhausted_and_final_status():
+    async def test(xbee):
+        return await xbee.transmit_reliable("hello", DESTINATION, retries=2, backoff=0.0)
+
+    responder = EchoResponder(status=0x01)
+    assert run_async(responder, test).status == 0x01
+    assert responder.frames_sent == 3
+    # Not a retry status: no retransmission
+    responder = EchoResponder(status=0x04)
+    assert run_async(responder, test).status == 0x04
+    assert responder.frames_sent == 1
+
+
+def test_async_window():
+    async def test(xbee):
+        in_flight = peak = 0
+        transmit = xbee.transmit
+
+        async def counting_transmit(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await transmit(*args, **kwargs)
+            finally:
+                in_flight -= 1
+
+        xbee.transmit = counting_transmit
+        statuses = await asyncio.gather(*(xbee.transmit_reliable(f"message {i}", DESTINATION) for i in range(20)))
+        assert all(status.status == 0x00 for status in statuses)
+        return peak
+
+    assert run_async(FlakyResponder(failures=5), test, reliable_window=4) == 4
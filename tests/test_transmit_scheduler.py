@@ -0,0 +1,127 @@
+import asyncio
+import queue
+import time
+
+import pytest
+
+from xbee import AsyncXBee, XBee
+from xbee.utils import TransmitScheduler
+
+DESTINATION = "0013A200428396C0"
+
+
+def test_priority_order():
+    scheduler = TransmitScheduler()
+    scheduler.put(b"bulk", priority=TransmitScheduler.BULK)
+    scheduler.put(b"normal 1")
+    scheduler.put(b"command", priority=TransmitScheduler.COMMAND)
+    scheduler.put(b"normal 2")
+    assert scheduler.depths() == [1, 2, 1]
+    assert [scheduler.get_nowait() for _ in range(4)] == [b"command", b"normal 1", b"normal 2", b"bulk"]
+    assert scheduler.empty()
+    with pytest.raises(queue.Empty):
+        scheduler.get_nowait()
+    assert scheduler.delay() is None
+
+
+def test_invalid_priority():
+    with pytest.raises(ValueError):
+        TransmitScheduler().put(b"frame", priority=3)
+
+
+def test_token_bucket():
+    scheduler = TransmitScheduler(rate=1000, burst=100)
+    for _ in range(3):
+        scheduler.put(bytes(50))
+    # The burst covers two frames, the third waits for 50 bytes of tokens
+    assert scheduler.get_nowait() == bytes(50)
+    assert scheduler.get_nowait() == bytes(50)
+    with pytest.raises(queue.Empty):
+        scheduler.get_nowait()
+    assert 0.03 < scheduler.delay() <= 0.05
+
+    start = time.monotonic()
+    assert scheduler.get(timeout=1.0) == bytes(50)
+    assert time.monotonic() - start >= 0.03
+
+
+def test_frame_larger_than_burst():
+    scheduler = TransmitScheduler(rate=1000, burst=100)
+    scheduler.put(bytes(300))
+    scheduler.put(bytes(10))
+    assert len(scheduler.get_nowait()) == 300
+    # The bucket is in debt until 210 bytes of tokens have been refilled
+    assert scheduler.delay() > 0.15
+
+
+def test_pacing():
+    assert TransmitScheduler().pacing(10_000) == 0.0
+    scheduler = TransmitScheduler(rate=1000, burst=100)
+    scheduler.put(bytes(200))
+    # 200 queued and 300 more bytes, 100 covered by the burst
+    assert 0.39 < scheduler.pacing(300) <= 0.4
+    scheduler.get_nowait()
+    assert scheduler.pacing() <= 0.1
+
+def test_get_timeout():
+    scheduler = TransmitScheduler(rate=10, burst=10)
+    scheduler.put(bytes(10))
+    scheduler.put(bytes(10))
+    scheduler.get_nowait()
+    with pytest.raises(queue.Empty):
+        scheduler.get(timeout=0.01)
+
+
+def test_stats():
+    scheduler = TransmitScheduler()
+    scheduler.put(b"frame", priority=TransmitScheduler.BULK)
+    scheduler.get_nowait()
+    stats = scheduler.stats()
+    assert stats[TransmitScheduler.BULK]["sent"] == 1
+    assert stats[TransmitScheduler.NORMAL]["sent"] == 0
+
+
+def test_xbee_paces_writes(module):
+    responder = module()
+    # 26-byte frames (11 bytes of data): the burst covers one frame, each further one waits 26 ms
+    xbee = XBee(responder.port, transmit_rate=1000, transmit_burst=26)
+    xbee.open()
+    try:
+        start = time.monotonic()
+        xbee.transmit_many(["hello world"] * 4, DESTINATION)
+        assert xbee.transmit_data("hello world", DESTINATION, retrieveStatus=True) is not None
+        assert time.monotonic() - start >= 0.09
+    finally:
+        xbee.close()
+
+
+def test_xbee_at_commands_overtake_bulk(module):
+    responder = module(at_values={"MY": b"\x12\x34"})
+    xbee = XBee(responder.port, transmit_rate=1000, transmit_burst=26)
+    xbee.open()
+    try:
+        for i in range(10):
+            xbee.transmit_data(f"bulk {i:6d}", DESTINATION, priority=TransmitScheduler.BULK)
+        assert bytes(xbee.request_at_command_data("MY").data) == b"\x12\x34"
+        # The AT command was written before most of the bulk frames still held back by the rate limit
+        position = next(i for i, frame_data in enumerate(responder.received) if frame_data[0] == 0x08)
+        assert position < 5
+    finally:
+        xbee.close()
+
+
+def test_async_xbee_paces_writes(module):
+    responder = module()
+
+    async def main():
+        xbee = AsyncXBee(responder.port, transmit_rate=1000, transmit_burst=26)
+        await xbee.open()
+        try:
+            start = time.monotonic()
+            statuses = await asyncio.gather(*(xbee.transmit("hello world", DESTINATION) for _ in range(4)))
+            assert all(status is not None for status in statuses)
+            assert time.monotonic() - start >= 0.07
+        finally:
+            await xbee.close()
+
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+from xbee import AsyncXBee, XBee
+
+DESTINATION = "0013A200428396C0"
+
+
+class RecordingSerial:
+    """Serial port stand-in recording every write."""
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data) -> int:
+        self.writes.append(bytes(data))
+        return len(data)
+
+
+def queued_xbee(frames, **kwargs) -> XBee:
+    xbee = XBee(**kwargs)
+    xbee.ser = RecordingSerial()
+    for frame in frames:
+        xbee.transmit_queue.put(frame)
+    return xbee
+
+
+def test_queued_frames_share_one_write():
+    frames = [bytes([i]) * 10 for i in range(5)]
+    xbee = queued_xbee(frames)
+    xbee._write_queued()
+    assert xbee.ser.writes == [b"".join(frames)]
+    assert xbee.flush_frame_counts == {5: 1}
+
+
+def test_writes_are_capped_at_max_write_bytes():
+    frames = [bytes([i]) * 10 for i in range(5)]
+    xbee = queued_xbee(frames, max_write_bytes=25)
+    xbee._write_queued()
+    # A frame that does not fit is carried over to the next write, never split
+    assert xbee.ser.writes == [frames[0] + frames[1], frames[2] + frames[3], frames[4]]
+    assert xbee.flush_frame_counts == {2: 2, 1: 1}
+
+
+def test_frame_larger_than_cap_is_sent_alone():
+    xbee = queued_xbee([bytes(50), bytes(5)], max_write_bytes=20)
+    xbee._write_queued()
+    assert xbee.ser.writes == [bytes(50), bytes(5)]
+
+
+def test_linger_waits_for_more_frames():
+    xbee = queued_xbee([b"first"], write_linger=0.05)
+    xbee.transmit_queue.put(b"late")
+    start = time.monotonic()
+    xbee._write_queued()
+    assert xbee.ser.writes == [b"firstlate"]
+    assert time.monotonic() - start >= 0.05
+
+
+def test_burst_of_transmits_is_coalesced(module):
+    responder = module()
+    xbee = XBee(responder.port)
+    xbee.open()
+    try:
+        for i in range(50):
+            xbee.transmit_data(f"message {i}", DESTINATION)
+        assert xbee.transmit_data("last", DESTINATION, retrieveStatus=True).status == 0x00
+        assert len(responder.received) == 51
+        assert sum(frames * writes for frames, writes in xbee.flush_frame_counts.items()) == 51
+        assert sum(xbee.flush_frame_counts.values()) < 51
+    finally:
+        xbee.close()
+
+
+def test_async_frames_of_one_iteration_share_one_write(module):
+    responder = module()
+
+    async def main():
+        xbee = AsyncXBee(responder.port)
+        await xbee.open()
+        try:
+            for i in range(10):
+                await xbee.transmit(f"message {i}", DESTINATION, retrieve_status=False)
+            statuses = await asyncio.gather(*(xbee.transmit(f"status {i}", DESTINATION) for i in range(10)))
+            assert all(status.status == 0x00 for status in statuses)
+            assert xbee.flush_frame_counts == {10: 2}
+        finally:
+            await xbee.close()
+    asyncio.run(main())
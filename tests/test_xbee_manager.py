@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from xbee import XBee, XBeeManager
+from xbee.frames import x81, x90
+
+DESTINATION = "0013A200428396C0"
+
+
+@pytest.fixture
+def manager():
+    managers = []
+
+    def create(**radios) -> XBeeManager:
+        manager = XBeeManager()
+        for name, port in radios.items():
+            manager.add(name, XBee(port))
+        manager.open()
+        managers.append(manager)
+        return manager
+
+    yield create
+    for created in managers:
+        created.close()
+
+
+def test_one_io_thread_serves_every_radio(module, manager):
+    ports = {"a": module(loopback=True).port, "b": module(loopback=True).port, "c": module().port}
+    before = threading.active_count()
+    radios = manager(**ports)
+    assert threading.active_count() == before + 1
+    assert all(radio._io_thread is None for radio in radios.radios.values())
+
+    name, status = radios.transmit("hello", DESTINATION, retrieveStatus=True)
+    assert name == "a" and status.status == 0x00
+    assert radios.radios["b"].transmit_data("hi", DESTINATION, retrieveStatus=True).status == 0x00
+    received = {radios.retrieve_data(1)[0], radios.retrieve_data(1)[0]}
+    assert received == {"a", "b"}
+    assert radios.radios["c"].request_at_command_data("MY") is not None
+
+
+def test_routes_around_failing_radio(module, manager):
+    radios = manager(a=module(status=0x01).port, b=module(loopback=True).port)
+    # a only gets failed statuses, b hears from the destination
+    assert radios.transmit("hello", DESTINATION, retrieveStatus=True)[0] == "a"
+    radios.radios["b"].transmit_data("hi", DESTINATION, retrieveStatus=True)
+    assert radios.retrieve_data(1)[0] == "b"
+
+    name, status = radios.transmit("hello", DESTINATION, retrieveStatus=True)
+    assert name == "b" and status.status == 0x00
+    links = radios.links()[DESTINATION]
+    assert links["a"]["delivery"] < links["b"]["delivery"] == 1.0
+
+
+def test_rssi_ranks_16_bit_sources():
+    manager = XBeeManager()
+    manager.add("far", XBee())
+    manager.add("near", XBee())
+    for name, rssi in (("far", -90), ("near", -40)):
+        manager._deliver_rx(manager.radios[name], x81(0x81, b"\x12\x34", rssi, 0, b"data"))
+    assert manager.best_radio("1234") == "near"
+    assert manager.best_radio("5678") == "far"     # Unknown address: first added radio
+    assert manager.rx_queue.qsize() == 2
+
+
+def test_untried_radio_is_used_when_the_known_one_fails(module, manager):
+    radios = manager(a=module(status=0x01).port, b=module().port)
+    assert radios.transmit("hello", DESTINATION, retrieveStatus=True)[0] == "a"
+    # b never sent to or heard from the destination, it is tried instead of the failing radio
+    name, status = radios.transmit("hello", DESTINATION, retrieveStatus=True)
+    assert name == "b" and status.status == 0x00
+    assert radios.transmit("hello", DESTINATION, retrieveStatus=True)[0] == "b"
+
+
+def test_rssi_ranks_64_bit_destination():
+    manager = XBeeManager()
+    manager.add("far", XBee())
+    manager.add("near", XBee())
+    # 0x81 frames heard before the 16-bit address was mapped are merged into the 64-bit links
+    manager._deliver_rx(manager.radios["far"], x81(0x81, b"\x12\x34", -90, 0, b"data"))
+    manager._deliver_rx(manager.radios["far"], x90(0x90, bytes.fromhex(DESTINATION), b"\x12\x34", 0x01, b"data"))
+    manager._deliver_rx(manager.radios["near"], x81(0x81, b"\x12\x34", -40, 0, b"data"))
+    assert manager.best_radio(DESTINATION) == "near"
+    assert manager.best_radio("1234") == "near"
+    assert set(manager.links()) == {DESTINATION}
+
+    manager.map_address("5678", "0013A20000000002")
+    manager._deliver_rx(manager.radios["far"], x81(0x81, b"\x56\x78", -30, 0, b"data"))
+    manager._deliver_rx(manager.radios["near"], x81(0x81, b"\x56\x78", -80, 0, b"data"))
+    assert manager.best_radio("0013a20000000002") == "far"
+
+
+def test_add_after_open_fails(module):
+    xbee = XBee(module().port)
+    xbee.open()
+    try:
+        with pytest.raises(ValueError):
+            XBeeManager().add("radio", xbee)
+    finally:
+        xbee.close()